@@ -5,19 +5,19 @@ from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-import uuid, os, json, cv2
+import asyncio, uuid, os, json, cv2
 import pandas as pd
 import numpy as np
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from pdf2image import convert_from_bytes
 
-from .modules.enhanced_vision import CNNChartClassifier, EnhancedImageProcessor
-from .modules.enhanced_eda import AutoEDAPipeline
-from .modules.enhanced_ml import EnhancedMLPipeline
-from .modules.enhanced_chat import IntelligentChatEngine
-from .modules.database import get_db, AnalysisSession, ChatMessage
+from .modules.engine_registry import get_engine
+from .modules.database import get_db, AnalysisSession
+from .modules import results_store
 from .utils.pdf_utils import analyze_pdf_charts
+from .utils.upload_utils import save_upload, UploadTooLargeError
+from .utils import json_utils
 
 
 UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
@@ -28,13 +28,6 @@ GROQ_MODEL = os.getenv('GROQ_MODEL')
 
 router = APIRouter()
 
-# Initialize engines
-chart_classifier = CNNChartClassifier()
-image_processor = EnhancedImageProcessor()
-eda_pipeline = AutoEDAPipeline()
-ml_pipeline = EnhancedMLPipeline()
-chat_engine = IntelligentChatEngine(GROQ_API_KEY, GROQ_API_URL, GROQ_MODEL)
-
 
 class ChatRequest(BaseModel):
     message: str
@@ -64,8 +57,7 @@ async def upload_dataset(
     try:
         session_id = str(uuid.uuid4())
         dataset_path = os.path.join(UPLOAD_FOLDER, f"{session_id}_{file.filename}")
-        with open(dataset_path, "wb") as buffer:
-            buffer.write(await file.read())
+        upload_info = {"dataset": await save_upload(file, dataset_path)}
 
         df = pd.read_csv(dataset_path)
         df.columns = df.columns.str.strip()
@@ -73,32 +65,34 @@ async def upload_dataset(
         if target_column not in df.columns:
             raise HTTPException(400, f"Target column '{target_column}' not found")
 
-        cleaned_df, eda_results = await eda_pipeline.run_analysis(df, task_type, target_column)
-        model_results = await ml_pipeline.train_and_evaluate(cleaned_df, task_type, target_column)
+        cleaned_df, eda_results = await get_engine("eda_pipeline").run_analysis(df, task_type, target_column)
+        model_results = await get_engine("ml_pipeline").train_and_evaluate(
+            cleaned_df, task_type, target_column, session_id=session_id
+        )
 
         pdf_insights = None
         if pdf_file:
             pdf_path = os.path.join(UPLOAD_FOLDER, f"{session_id}_{pdf_file.filename}")
-            with open(pdf_path, "wb") as buffer:
-                buffer.write(await pdf_file.read())
+            upload_info["pdf"] = await save_upload(pdf_file, pdf_path)
             pdf_insights = await analyze_pdf_charts(pdf_path, cleaned_df)
 
         session_data = AnalysisSession(
             id=session_id,
             task_type=task_type,
             target_column=target_column,
-            dataset_info=json.dumps({
+            dataset_info=json_utils.dumps({
                 "shape": cleaned_df.shape,
                 "columns": list(cleaned_df.columns),
                 "filename": file.filename
             }),
-            results=json.dumps({
-                "eda": eda_results,
-                "ml": model_results,
-                "pdf_insights": pdf_insights
-            })
+            upload_info=json.dumps(upload_info)
         )
         db.add(session_data)
+        results_store.save_sections(db, session_id, {
+            "eda": eda_results,
+            "ml": model_results,
+            "pdf_insights": pdf_insights
+        })
         db.commit()
 
         return {
@@ -108,6 +102,10 @@ async def upload_dataset(
             "pdf_insights": pdf_insights
         }
 
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(413, str(e))
     except Exception as e:
         raise HTTPException(500, f"Upload error: {str(e)}")
 
@@ -116,13 +114,12 @@ async def upload_dataset(
 async def analyze_chart(file: UploadFile = File(...)):
     try:
         image_path = os.path.join(UPLOAD_FOLDER, f"chart_{uuid.uuid4().hex}_{file.filename}")
-        with open(image_path, "wb") as buffer:
-            buffer.write(await file.read())
+        await save_upload(file, image_path)
 
         image = cv2.imread(image_path)
-        chart_type, confidence = chart_classifier.classify_chart(image)
-        extracted_data = image_processor.extract_chart_data(image, chart_type)
-        insights = await chat_engine.generate_chart_insights(chart_type, extracted_data)
+        chart_type, confidence = get_engine("chart_classifier").classify_chart(image)
+        extracted_data = get_engine("image_processor").extract_chart_data(image, chart_type)
+        insights = await get_engine("chat_engine").generate_chart_insights(chart_type, extracted_data)
 
         return ChartAnalysisResponse(
             chart_type=chart_type,
@@ -130,6 +127,8 @@ async def analyze_chart(file: UploadFile = File(...)):
             extracted_data=extracted_data,
             insights=insights
         )
+    except UploadTooLargeError as e:
+        raise HTTPException(413, str(e))
     except Exception as e:
         raise HTTPException(500, f"Chart error: {str(e)}")
 
@@ -144,19 +143,17 @@ async def chat_with_ai(request: ChatRequest, db: Session = Depends(get_db)):
                 context = {
                     "task_type": session.task_type,
                     "target_column": session.target_column,
-                    "results": json.loads(session.results)
+                    "results": results_store.assemble_results(results_store.load_sections(db, session.id))
                 }
 
-        response = await chat_engine.generate_response(request.message, context, request.context_type)
+        chat_engine = get_engine("chat_engine")
+        response = await chat_engine.generate_response(
+            request.message, context, request.context_type, session_id=request.session_id
+        )
 
-        chat_msg = ChatMessage(
-            session_id=request.session_id,
-            message=request.message,
-            response=response,
-            context_type=request.context_type
+        await asyncio.to_thread(
+            chat_engine.memory_store.record, request.session_id, request.message, response, request.context_type
         )
-        db.add(chat_msg)
-        db.commit()
 
         return {"response": response}
 
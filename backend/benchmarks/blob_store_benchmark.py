@@ -0,0 +1,170 @@
+# backend/benchmarks/blob_store_benchmark.py
+#
+# Stored size and read latency of large session payloads kept as JSON text in a result
+# section row versus in the compressed blob store, for synthetic payloads shaped like
+# analysis results, PDF chart extractions (bar/point lists) and chat transcripts.
+#
+#   python -m backend.benchmarks.blob_store_benchmark
+#   python -m backend.benchmarks.blob_store_benchmark --scales 1 10 100 --repeat 20 --save blobs.json
+#
+# Reads are measured as full loads (fetch + decompress + json.loads) and, for the blob
+# store, as time to the first streamed chunk. Database file sizes are taken after VACUUM.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from backend.benchmarks.startup_benchmark import WORK_DIR
+
+# database.py creates its engines (and schema) at import; keep that out of the caller's directory
+os.environ.setdefault("MONGO_URL", f"sqlite:///{os.path.join(WORK_DIR, 'import.db')}")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend.modules import blob_store  # noqa: E402
+from backend.modules.database import AnalysisResultSection, Base  # noqa: E402
+from backend.utils import json_utils  # noqa: E402
+
+
+def results_payload(scale: int, rng: random.Random) -> Dict[str, Any]:
+    columns = [f"feature_{i}" for i in range(50 * scale)]
+    return {
+        "statistics": {
+            "descriptive": {col: {stat: rng.gauss(0, 100) for stat in ("mean", "std", "min", "25%", "50%", "75%", "max")}
+                            for col in columns},
+        },
+        "data_quality": {"missing_percentage": {col: round(rng.random() * 10, 2) for col in columns}},
+        "feature_importance": {col: {"score": rng.random(), "rank": i} for i, col in enumerate(columns)},
+    }
+
+
+def pdf_charts_payload(scale: int, rng: random.Random) -> Dict[str, Any]:
+    charts = []
+    for page in range(5 * scale):
+        charts.append({
+            "page": page,
+            "chart_type": "bar_chart" if page % 2 else "line_chart",
+            "confidence": rng.random(),
+            "extracted_data": {
+                "bars": [{"label": f"category {i}", "value": rng.uniform(0, 1000), "x": i * 12, "height": rng.randint(1, 400)}
+                         for i in range(40)],
+                "points": [{"x": i, "y": rng.gauss(50, 15)} for i in range(200)],
+            },
+            "insights": "Values trend upward across categories with a dip in the middle of the range. " * 4,
+        })
+    return {"charts": charts, "total_charts": len(charts)}
+
+
+def chat_transcript_payload(scale: int, rng: random.Random) -> List[Dict[str, Any]]:
+    words = ("model feature accuracy target column distribution outlier missing value correlation "
+             "precision recall regression classification sample").split()
+    return [
+        {"message": " ".join(rng.choice(words) for _ in range(20)),
+         "response": " ".join(rng.choice(words) for _ in range(150)),
+         "context_type": "general", "timestamp": f"2025-01-01T00:{i % 60:02d}:00"}
+        for i in range(30 * scale)
+    ]
+
+
+PAYLOADS: Dict[str, Callable[[int, random.Random], Any]] = {
+    "results": results_payload,
+    "pdf_charts": pdf_charts_payload,
+    "chat_transcript": chat_transcript_payload,
+}
+
+
+def _median_ms(fn: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def _file_size(engine, path: str) -> int:
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+    return os.path.getsize(path)
+
+
+def run(scales: List[int], repeat: int) -> List[Dict[str, Any]]:
+    rng = random.Random(0)
+    results = []
+    for scale in scales:
+        for name, build in PAYLOADS.items():
+            data = json_utils.dumps(build(scale, rng))
+            content = data.encode("utf-8")
+            paths = {store: os.path.join(WORK_DIR, f"blob_bench_{store}.db") for store in ("text", "blob")}
+            engines = {store: create_engine(f"sqlite:///{path}") for store, path in paths.items()}
+            sessions = {}
+            for store, engine in engines.items():
+                Base.metadata.create_all(bind=engine)
+                sessions[store] = sessionmaker(bind=engine)()
+
+            db = sessions["text"]
+            db.add(AnalysisResultSection(session_id="bench", section=name, data=data, size_bytes=len(content)))
+            db.commit()
+
+            db = sessions["blob"]
+            key = blob_store.put(db, content)
+            db.add(AnalysisResultSection(session_id="bench", section=name, blob_key=key, size_bytes=len(content)))
+            db.commit()
+
+            def read_text():
+                row = sessions["text"].query(AnalysisResultSection.data).filter_by(session_id="bench").scalar()
+                return json.loads(row)
+
+            def read_blob():
+                row_key = sessions["blob"].query(AnalysisResultSection.blob_key).filter_by(session_id="bench").scalar()
+                return json.loads(blob_store.read(sessions["blob"], row_key))
+
+            def first_chunk():
+                return next(blob_store.iter_chunks(sessions["blob"], key))
+
+            for db in sessions.values():
+                db.expire_all()
+            results.append({
+                "payload": name,
+                "scale": scale,
+                "raw_bytes": len(content),
+                "blob_stored_bytes": sessions["blob"].get(blob_store.Blob, key).stored_size,
+                "text_db_file_bytes": _file_size(engines["text"], paths["text"]),
+                "blob_db_file_bytes": _file_size(engines["blob"], paths["blob"]),
+                "text_read_ms": _median_ms(read_text, repeat),
+                "blob_read_ms": _median_ms(read_blob, repeat),
+                "blob_first_chunk_ms": _median_ms(first_chunk, repeat),
+            })
+            for store, db in sessions.items():
+                db.close()
+                engines[store].dispose()
+                os.remove(paths[store])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON text column vs compressed blob store: size and read latency")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50], help="payload size multipliers")
+    parser.add_argument("--repeat", type=int, default=10, help="reads per measurement (median reported)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.repeat)
+
+    print(f"{'payload':<16} {'raw KB':>9} {'blob KB':>9} {'ratio':>6} {'text ms':>8} {'blob ms':>8} {'1st chunk':>9}")
+    for r in results:
+        print(f"{r['payload']:<16} {r['raw_bytes'] / 1024:>9.1f} {r['blob_stored_bytes'] / 1024:>9.1f} "
+              f"{r['raw_bytes'] / max(r['blob_stored_bytes'], 1):>6.1f} {r['text_read_ms']:>8} {r['blob_read_ms']:>8} "
+              f"{r['blob_first_chunk_ms']:>9}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
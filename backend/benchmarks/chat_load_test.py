@@ -0,0 +1,190 @@
+# backend/benchmarks/chat_load_test.py
+#
+# Drives /api/chat and /api/ws/chat/{session_id} at a fixed concurrency and reports
+# latency percentiles and throughput. Without --base-url it starts the mock LLM server and
+# a backend pointed at it, each in a scratch directory, so nothing touches Groq.
+#
+#   python -m backend.benchmarks.chat_load_test --concurrency 32 --requests 500
+#   python -m backend.benchmarks.chat_load_test --target ws --mock-latency-ms 800 --mock-rate-limit-rate 0.05
+#   python -m backend.benchmarks.chat_load_test --base-url http://127.0.0.1:8001 --target chat
+#
+# Prompts are unique per request unless --repeat-prompts is given, which instead measures
+# the response cache and request coalescing.
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import websockets
+
+from backend.benchmarks.startup_benchmark import WORK_DIR, _env, _free_port
+
+CHAT_ERROR_PREFIXES = ("API Error:", "Failed to get AI response:", "I apologize, but I encountered an error")
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return round(ordered[index], 4)
+
+
+def summarize(latencies: List[float], errors: int, wall_seconds: float, extra: Optional[Dict[str, List[float]]] = None) -> Dict[str, Any]:
+    summary = {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_seconds": {f"p{pct}": percentile(latencies, pct) for pct in (50, 95, 99)},
+    }
+    for name, values in (extra or {}).items():
+        summary[name] = {f"p{pct}": percentile(values, pct) for pct in (50, 95, 99)}
+    return summary
+
+
+def _prompt(i: int, repeat: bool) -> str:
+    base = "Which features matter most for this model, and what should we check next?"
+    return base if repeat else f"{base} (request {i} {uuid.uuid4().hex[:8]})"
+
+
+async def run_chat(base_url: str, total: int, concurrency: int, sessions: List[str], repeat: bool) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/api/chat", json={
+                        "message": _prompt(i, repeat), "session_id": sessions[i % len(sessions)]
+                    })
+                    ok = response.status_code == 200 and not response.json()["response"].startswith(CHAT_ERROR_PREFIXES)
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_ws(base_url: str, total: int, concurrency: int, sessions: List[str], repeat: bool) -> Dict[str, Any]:
+    latencies: List[float] = []
+    first_token: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+    ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
+
+    async def worker(n: int):
+        nonlocal errors
+        async with websockets.connect(f"{ws_url}/api/ws/chat/{sessions[n % len(sessions)]}", max_size=None) as ws:
+            for i in counter:
+                started = time.perf_counter()
+                ttft = None
+                await ws.send(json.dumps({"message": _prompt(i, repeat)}))
+                while True:
+                    frame = json.loads(await ws.recv())
+                    if frame["type"] == "delta" and ttft is None:
+                        ttft = time.perf_counter() - started
+                    if frame["type"] in ("done", "error"):
+                        break
+                if frame["type"] == "done":
+                    latencies.append(time.perf_counter() - started)
+                    if ttft is not None:
+                        first_token.append(ttft)
+                else:
+                    errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started, {"time_to_first_token_seconds": first_token})
+
+
+def _wait_for(url: str, timeout: float = 120.0) -> None:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"{url} did not answer within {timeout}s")
+
+
+def start_servers(args) -> Tuple[str, List[subprocess.Popen]]:
+    mock_port, backend_port = _free_port(), _free_port()
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "backend.benchmarks.mock_llm_server", "--port", str(mock_port),
+         "--latency-ms", str(args.mock_latency_ms), "--token-delay-ms", str(args.mock_token_delay_ms),
+         "--error-rate", str(args.mock_error_rate), "--rate-limit-rate", str(args.mock_rate_limit_rate)],
+        cwd=WORK_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    env = {**_env(), "GROQ_API_URL": f"http://127.0.0.1:{mock_port}/v1/chat/completions",
+           "GROQ_API_KEY": "mock", "GROQ_MODEL": "mock-model"}
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.server:app", "--host", "127.0.0.1", "--port", str(backend_port),
+         "--log-level", "warning"],
+        cwd=WORK_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    _wait_for(f"http://127.0.0.1:{mock_port}/stats")
+    _wait_for(f"http://127.0.0.1:{backend_port}/api/health")
+    return f"http://127.0.0.1:{backend_port}", [backend, mock]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat endpoint load test")
+    parser.add_argument("--base-url", help="running backend to test (default: start mock LLM + backend)")
+    parser.add_argument("--target", choices=["chat", "ws", "both"], default="both")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per target")
+    parser.add_argument("--sessions", type=int, default=8, help="distinct session ids to spread requests over")
+    parser.add_argument("--repeat-prompts", action="store_true", help="send the same prompt every time")
+    parser.add_argument("--mock-latency-ms", type=float, default=200)
+    parser.add_argument("--mock-token-delay-ms", type=float, default=10)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--save", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    processes = []
+    base_url = args.base_url
+    if not base_url:
+        base_url, processes = start_servers(args)
+
+    sessions = [f"loadtest-{uuid.uuid4().hex[:8]}" for _ in range(args.sessions)]
+    results: Dict[str, Any] = {"base_url": base_url, "concurrency": args.concurrency, "repeat_prompts": args.repeat_prompts}
+    try:
+        if args.target in ("chat", "both"):
+            results["chat"] = asyncio.run(run_chat(base_url, args.requests, args.concurrency, sessions, args.repeat_prompts))
+        if args.target in ("ws", "both"):
+            results["ws"] = asyncio.run(run_ws(base_url, args.requests, args.concurrency, sessions, args.repeat_prompts))
+        with urllib.request.urlopen(f"{base_url}/api/llm/stats", timeout=5) as response:
+            results["server_llm_stats"] = json.load(response)
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# backend/benchmarks/db_index_benchmark.py
+#
+# Times the session and chat queries the API runs against growing SQLite databases, once
+# with the pre-migration schema (no secondary indexes) and once after apply_migrations.
+#
+#   python -m backend.benchmarks.db_index_benchmark
+#   python -m backend.benchmarks.db_index_benchmark --sizes 10000 100000 500000 --save db_index.json
+#
+# Each size gets its own database file in a scratch directory; chat_messages holds
+# --messages-per-session rows per session.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from backend.benchmarks.startup_benchmark import WORK_DIR
+
+# database.py creates its engine (and schema) at import; keep that out of the caller's directory
+os.environ.setdefault("MONGO_URL", f"sqlite:///{os.path.join(WORK_DIR, 'import.db')}")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from backend.modules.database import Base, MIGRATIONS, apply_migrations  # noqa: E402
+
+QUERIES = {
+    # get_session
+    "chat_by_session": "SELECT message, response, timestamp, context_type FROM chat_messages WHERE session_id = :session_id",
+    # conversation memory warm-up
+    "recent_turns": "SELECT * FROM chat_messages WHERE session_id = :session_id ORDER BY timestamp DESC LIMIT 10",
+    # /api/sessions: first page, a later page and a filtered page
+    "list_sessions": "SELECT id, created_at, task_type, target_column, status FROM analysis_sessions "
+                     "ORDER BY created_at DESC, id DESC LIMIT 50",
+    "list_next_page": "SELECT id, created_at, task_type, target_column, status FROM analysis_sessions "
+                      "WHERE (created_at, id) < (:cursor_created_at, :cursor_id) ORDER BY created_at DESC, id DESC LIMIT 50",
+    "list_by_task": "SELECT id, created_at, task_type, target_column, status FROM analysis_sessions "
+                    "WHERE task_type = :task_type AND created_at >= :created_after ORDER BY created_at DESC, id DESC LIMIT 50",
+    # job status polling
+    "session_by_job": "SELECT id, status FROM analysis_sessions WHERE job_id = :job_id",
+}
+
+
+def _drop_migrated_indexes(engine) -> None:
+    with engine.begin() as conn:
+        for _, _, statements in MIGRATIONS:
+            for statement in statements:
+                if isinstance(statement, str) and statement.startswith("CREATE INDEX"):
+                    name = statement.split("IF NOT EXISTS ")[1].split()[0]
+                    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _populate(engine, sessions: int, messages_per_session: int) -> List[str]:
+    session_ids = [str(uuid.uuid4()) for _ in range(sessions)]
+    start = datetime(2024, 1, 1)
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO analysis_sessions (id, created_at, task_type, target_column, dataset_info, job_id, status) "
+            "VALUES (:id, :created_at, :task_type, 'target', '{}', :job_id, 'completed')"
+        ), [
+            {"id": sid, "created_at": start + timedelta(seconds=rng.randint(0, 10 ** 8)),
+             "task_type": rng.choice(["classification", "regression"]), "job_id": f"job-{sid}"}
+            for sid in session_ids
+        ])
+        conn.execute(text(
+            "INSERT INTO chat_messages (id, session_id, timestamp, message, response, context_type) "
+            "VALUES (:id, :session_id, :timestamp, 'question', 'answer', 'general')"
+        ), [
+            {"id": str(uuid.uuid4()), "session_id": sid, "timestamp": start + timedelta(seconds=i)}
+            for sid in session_ids for i in range(messages_per_session)
+        ])
+    return session_ids
+
+
+def _time_query(engine, sql: str, params: Callable[[], Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    timings = []
+    with engine.connect() as conn:
+        plan = " / ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params()))
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(text(sql), params()).fetchall()
+            timings.append(time.perf_counter() - started)
+    return {"median_ms": round(statistics.median(timings) * 1000, 3), "plan": plan}
+
+
+def run_size(sessions: int, messages_per_session: int, repeat: int) -> Dict[str, Any]:
+    path = os.path.join(WORK_DIR, f"sessions_{sessions}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    _drop_migrated_indexes(engine)
+    session_ids = _populate(engine, sessions, messages_per_session)
+    rng = random.Random(1)
+
+    def params():
+        sid = rng.choice(session_ids)
+        return {"session_id": sid, "job_id": f"job-{sid}", "cursor_created_at": "2025-06-01 00:00:00.000000",
+                "cursor_id": sid, "task_type": "regression", "created_after": "2024-06-01 00:00:00.000000"}
+
+    result: Dict[str, Any] = {"sessions": sessions, "chat_messages": sessions * messages_per_session}
+    result["before"] = {name: _time_query(engine, sql, params, repeat) for name, sql in QUERIES.items()}
+    started = time.perf_counter()
+    apply_migrations(engine)
+    result["migration_seconds"] = round(time.perf_counter() - started, 3)
+    result["after"] = {name: _time_query(engine, sql, params, repeat) for name, sql in QUERIES.items()}
+    engine.dispose()
+    os.remove(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session/chat query time vs table size, before and after indexes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="analysis_sessions rows")
+    parser.add_argument("--messages-per-session", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=50, help="runs per query (median reported)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = [run_size(size, args.messages_per_session, args.repeat) for size in args.sizes]
+
+    print(f"{'sessions':>9} {'query':<16} {'before ms':>10} {'after ms':>10}")
+    for result in results:
+        for name in QUERIES:
+            print(f"{result['sessions']:>9} {name:<16} {result['before'][name]['median_ms']:>10} "
+                  f"{result['after'][name]['median_ms']:>10}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
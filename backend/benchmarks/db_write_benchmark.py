@@ -0,0 +1,137 @@
+# backend/benchmarks/db_write_benchmark.py
+#
+# Concurrent chat-message write throughput against SQLite, comparing how the server has
+# written chat_messages:
+#
+#   inline      sync session committed inside the coroutine (blocks the event loop)
+#   thread      sync session in asyncio.to_thread, default rollback journal
+#   thread-wal  sync session in asyncio.to_thread, WAL + SQLITE_PRAGMAS
+#   async-wal   aiosqlite AsyncSession (ConversationMemoryStore.arecord), WAL + SQLITE_PRAGMAS
+#   batched     async-wal behind ChatWriteQueue; latency is time to queue, wall time
+#               includes the final flush
+#
+#   python -m backend.benchmarks.db_write_benchmark
+#   python -m backend.benchmarks.db_write_benchmark --concurrency 64 --writes 5000 --save db_write.json
+#
+# Alongside writes/second it reports event-loop lag: how late a 10 ms ticker wakes up
+# while the writers run, which is what other requests on the same worker feel.
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from backend.benchmarks.startup_benchmark import WORK_DIR
+from backend.benchmarks.chat_load_test import percentile
+
+# database.py creates its engines (and schema) at import; keep that out of the caller's directory
+os.environ.setdefault("MONGO_URL", f"sqlite:///{os.path.join(WORK_DIR, 'import.db')}")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend.modules.chat_write_queue import ChatWriteQueue  # noqa: E402
+from backend.modules.conversation_memory import ConversationMemoryStore  # noqa: E402
+from backend.modules.database import Base, SQLITE_PRAGMAS, make_async_engine, make_engine  # noqa: E402
+
+MODES = ["inline", "thread", "thread-wal", "async-wal", "batched"]
+ASYNC_MODES = ("async-wal", "batched")
+TICK_SECONDS = 0.01
+
+
+async def _ticker(lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - started - TICK_SECONDS)
+
+
+async def run_mode(mode: str, writes: int, concurrency: int, sessions: int) -> Dict[str, Any]:
+    path = os.path.join(WORK_DIR, f"writes_{mode}.db")
+    pragmas = None if mode in ("inline", "thread") else SQLITE_PRAGMAS
+    sync_engine = make_engine(f"sqlite:///{path}", pragmas=pragmas)
+    Base.metadata.create_all(bind=sync_engine)
+    async_engine = make_async_engine(f"sqlite+aiosqlite:///{path}", pragmas=pragmas) if mode in ASYNC_MODES else None
+    async_factory = async_sessionmaker(async_engine, expire_on_commit=False) if async_engine else None
+    store = ConversationMemoryStore(
+        sessionmaker(autoflush=False, bind=sync_engine), async_session_factory=async_factory,
+        write_queue=ChatWriteQueue(async_factory) if mode == "batched" else None
+    )
+
+    counter = iter(range(writes))
+    latencies: List[float] = []
+    errors = 0
+
+    async def writer():
+        nonlocal errors
+        for i in counter:
+            args = (f"bench-{i % sessions}", f"question {i}", "answer " * 40, "general")
+            started = time.perf_counter()
+            try:
+                if mode == "inline":
+                    store.record(*args)
+                elif mode in ASYNC_MODES:
+                    await store.arecord(*args)
+                else:
+                    await asyncio.to_thread(store.record, *args)
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors += 1
+                print(f"{mode}: write failed: {e}")
+            await asyncio.sleep(0)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(concurrency)))
+    await store.aclose()
+    wall = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    if async_engine is not None:
+        await async_engine.dispose()
+    sync_engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    return {
+        "mode": mode,
+        "writes": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "writes_per_second": round(len(latencies) / wall, 1) if wall else 0.0,
+        "latency_ms": {f"p{pct}": round(percentile(latencies, pct) * 1000, 2) for pct in (50, 95, 99)} if latencies else {},
+        "loop_lag_ms": {
+            "p50": round(percentile(lags, 50) * 1000, 2) if lags else None,
+            "max": round(max(lags) * 1000, 2) if lags else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent chat-message write throughput by DB access mode")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=50, help="distinct session ids to spread writes over")
+    parser.add_argument("--save", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    results = [asyncio.run(run_mode(mode, args.writes, args.concurrency, args.sessions)) for mode in args.modes]
+
+    print(f"{'mode':<11} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'lag p50':>8} {'lag max':>8} {'errors':>7}")
+    for r in results:
+        print(f"{r['mode']:<11} {r['writes_per_second']:>9} {r['latency_ms'].get('p50', '-'):>8} "
+              f"{r['latency_ms'].get('p99', '-'):>8} {r['loop_lag_ms']['p50']:>8} {r['loop_lag_ms']['max']:>8} {r['errors']:>7}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
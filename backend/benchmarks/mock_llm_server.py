@@ -0,0 +1,119 @@
+# backend/benchmarks/mock_llm_server.py
+#
+# Local stand-in for an OpenAI-style chat-completions API (the shape Groq serves), for
+# load tests that must not spend real quota.
+#
+#   python -m backend.benchmarks.mock_llm_server --port 9100 --latency-ms 300 --error-rate 0.02
+#   GROQ_API_URL=http://127.0.0.1:9100/v1/chat/completions uvicorn backend.server:app
+#
+# Supports "stream": true (server-sent events), fixed plus random latency, per-token delay
+# while streaming, injected 5xx errors and injected 429s with a Retry-After header.
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = ("revenue", "trend", "feature", "model", "variance", "outlier", "segment", "growth",
+         "correlation", "signal", "baseline", "forecast", "cohort", "driver", "metric")
+
+config: Dict[str, Any] = {
+    "latency_ms": 200.0,
+    "jitter_ms": 50.0,
+    "token_delay_ms": 10.0,
+    "tokens": 60,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "retry_after": 1,
+}
+stats = {"requests": 0, "streamed": 0, "errors_injected": 0, "rate_limited": 0}
+
+app = FastAPI(title="Mock LLM")
+
+
+def _answer(prompt: str) -> str:
+    # Deterministic per prompt, so response caching behaves as it would upstream
+    rng = random.Random(prompt)
+    lines = []
+    for _ in range(max(1, config["tokens"] // 10)):
+        lines.append("- " + " ".join(rng.choice(WORDS) for _ in range(9)))
+    return "\n".join(lines)
+
+
+def _completion(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": config["tokens"], "total_tokens": config["tokens"]},
+    }
+
+
+async def _stream(model: str, content: str):
+    for i, token in enumerate(content.split(" ")):
+        delta = token if i == 0 else " " + token
+        chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "model": model,
+                 "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(config["token_delay_ms"] / 1000)
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+
+    roll = random.random()
+    if roll < config["rate_limit_rate"]:
+        stats["rate_limited"] += 1
+        return JSONResponse({"error": {"message": "Rate limit reached", "type": "rate_limit"}}, status_code=429,
+                            headers={"Retry-After": str(config["retry_after"])})
+    if roll < config["rate_limit_rate"] + config["error_rate"]:
+        stats["errors_injected"] += 1
+        return JSONResponse({"error": {"message": "Injected upstream failure"}}, status_code=503)
+
+    await asyncio.sleep(max(0.0, config["latency_ms"] + random.uniform(-1, 1) * config["jitter_ms"]) / 1000)
+
+    model = body.get("model") or "mock-model"
+    content = _answer(body.get("messages", [{}])[-1].get("content", ""))
+    if body.get("stream"):
+        stats["streamed"] += 1
+        return StreamingResponse(_stream(model, content), media_type="text/event-stream")
+    return _completion(model, content)
+
+
+@app.get("/stats")
+async def get_stats():
+    return {"config": config, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-style chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=config["latency_ms"], help="time before the first byte")
+    parser.add_argument("--jitter-ms", type=float, default=config["jitter_ms"], help="+/- random latency")
+    parser.add_argument("--token-delay-ms", type=float, default=config["token_delay_ms"], help="delay between streamed tokens")
+    parser.add_argument("--tokens", type=int, default=config["tokens"], help="approximate words per answer")
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"], help="fraction of requests answered 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=config["rate_limit_rate"], help="fraction answered 429")
+    parser.add_argument("--retry-after", type=int, default=config["retry_after"], help="Retry-After seconds on 429")
+    args = parser.parse_args()
+
+    config.update({key: getattr(args, key) for key in config})
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
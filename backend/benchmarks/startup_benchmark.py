@@ -0,0 +1,156 @@
+# backend/benchmarks/startup_benchmark.py
+#
+# Measures backend cold start: import time per module (each in a fresh interpreter)
+# and the time from launching uvicorn to the first successful /api/health response.
+#
+#   python -m backend.benchmarks.startup_benchmark                       # print results
+#   python -m backend.benchmarks.startup_benchmark --save baseline.json  # record a baseline
+#   python -m backend.benchmarks.startup_benchmark --baseline baseline.json --tolerance 0.25
+#
+# With --baseline the script exits non-zero when any measurement is slower than the
+# baseline by more than the tolerance, so it can gate CI.
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, Any, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The server creates uploads/, outputs/, static/ and its SQLite file in the working
+# directory, so every run happens in a scratch directory.
+WORK_DIR = tempfile.mkdtemp(prefix="insightforge_bench_")
+
+MODULES = [
+    "backend.modules.database",
+    "backend.modules.engine_registry",
+    "backend.modules.job_queue",
+    "backend.modules.analysis_worker",
+    "backend.modules.dataset_store",
+    "backend.modules.result_cache",
+    "backend.modules.enhanced_chat",
+    "backend.modules.enhanced_vision",
+    "backend.modules.enhanced_eda",
+    "backend.modules.enhanced_ml",
+    "backend.server",
+]
+
+# Heavy libraries that must not be imported by `import backend.server`
+DEFERRED_DEPENDENCIES = [
+    "tensorflow", "xgboost", "lightgbm", "plotly", "seaborn", "statsmodels",
+    "pytesseract", "pdf2image", "cv2", "sklearn", "pandas", "pyarrow",
+]
+
+IMPORT_SNIPPET = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    return env
+
+
+def measure_import(module: str, repeat: int) -> Dict[str, Any]:
+    timings = []
+    loaded: List[str] = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(module=module, deferred=DEFERRED_DEPENDENCIES)],
+            cwd=WORK_DIR, env=_env(), capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        timings.append(result["seconds"])
+        loaded = result["loaded"]
+    return {"seconds": round(statistics.median(timings), 4), "heavy_modules_loaded": loaded}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_health(timeout: float = 120.0) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.server:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=WORK_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                    if response.status == 200:
+                        return round(time.perf_counter() - started, 4)
+            except OSError:
+                time.sleep(0.05)
+        raise TimeoutError(f"/api/health did not answer within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def run(repeat: int) -> Dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "imports": {module: measure_import(module, repeat) for module in MODULES},
+        "first_health_seconds": statistics.median(measure_first_health() for _ in range(repeat)),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for module, data in results["imports"].items():
+        base = baseline.get("imports", {}).get(module)
+        if base and data["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append(f"import {module}: {data['seconds']}s vs baseline {base['seconds']}s")
+
+    base_health = baseline.get("first_health_seconds")
+    if base_health and results["first_health_seconds"] > base_health * (1 + tolerance):
+        regressions.append(f"first /api/health: {results['first_health_seconds']}s vs baseline {base_health}s")
+
+    leaked = results["imports"]["backend.server"]["heavy_modules_loaded"]
+    if leaked:
+        regressions.append(f"backend.server imports heavy dependencies eagerly: {', '.join(leaked)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend startup benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (median is reported)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previously saved JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# backend/modules/analysis_worker.py
+
+import asyncio
+import os
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple
+
+from backend.modules.dataset_store import DatasetStore
+from backend.modules.engine_registry import get_engine
+
+# The server imports this module only to hand job functions to the pool, so pandas,
+# OpenCV and pdf2image are imported inside the functions that run in the workers.
+if TYPE_CHECKING:
+    import pandas as pd
+
+DATASET_STORE_DIR = os.getenv('DATASET_STORE_DIR', os.path.join(os.getenv('OUTPUT_FOLDER', 'outputs'), 'datasets'))
+
+# Bump whenever EDA or model training output changes, so cached results are not reused
+ANALYSIS_PIPELINE_VERSION = "2.2.0"
+
+# Worker processes are long-lived: engines come from the process-wide registry, so
+# each worker builds them once and reuses them for every job it picks up.
+dataset_store = DatasetStore(DATASET_STORE_DIR)
+
+
+def normalize_column_name(name: str) -> str:
+    """Normalize a column or target name the same way for the header check and the job"""
+    return name.strip().replace(" ", "").title()
+
+
+# ============================
+# Job Entry Points
+# ============================
+
+_status_engines: Dict[str, Any] = {}
+
+
+def mark_job_running(database_url: str, session_id: str) -> None:
+    """Flip a queued session to running with a plain UPDATE
+
+    Deliberately avoids backend.modules.database: importing the models module would make
+    every pool worker run ensure_schema() and the migrations.
+    """
+    from sqlalchemy import create_engine, text
+
+    if database_url not in _status_engines:
+        connect_args = {"timeout": 30} if database_url.startswith("sqlite") else {}
+        _status_engines[database_url] = create_engine(database_url, connect_args=connect_args)
+    with _status_engines[database_url].begin() as conn:
+        conn.execute(
+            text("UPDATE analysis_sessions SET status = 'running' WHERE id = :id AND status = 'queued'"),
+            {"id": session_id}
+        )
+
+
+def run_job(on_start: Callable[[], None], job_fn: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    """Pool entry point: report that a worker picked the job up (on_start), then run job_fn"""
+    on_start()
+    return job_fn(*args)
+
+
+def extract_pdf_charts(pdf_path: str) -> List[Dict[str, Any]]:
+    """Classify and extract every chart region in a PDF (CPU-bound, no LLM calls)"""
+    import cv2
+    import numpy as np
+    from pdf2image import convert_from_bytes
+
+    chart_classifier = get_engine("chart_classifier")
+    image_processor = get_engine("image_processor")
+
+    with open(pdf_path, 'rb') as f:
+        images = convert_from_bytes(f.read())
+
+    chart_data = []
+    for i, page in enumerate(images):
+        np_img = np.array(page)
+        img_cv = cv2.cvtColor(np_img, cv2.COLOR_RGB2BGR)
+        chart_regions = image_processor.extract_chart_regions(img_cv)
+
+        for j, chart_img in enumerate(chart_regions):
+            chart_type, confidence = chart_classifier.classify_chart(chart_img)
+            extracted_data = image_processor.extract_chart_data(chart_img, chart_type)
+
+            chart_data.append({
+                "page": i + 1,
+                "chart": j + 1,
+                "type": chart_type,
+                "confidence": confidence,
+                "data": extracted_data
+            })
+
+    return chart_data
+
+
+def load_dataset(dataset_path: str, columns: Optional[List[str]] = None) -> Tuple["pd.DataFrame", Optional[Dict[str, Any]]]:
+    """Load a dataset from the columnar store (column subset) or ingest an uploaded CSV
+
+    Returns the frame and, for CSV sources, the ingestion memory report.
+    """
+    from backend.utils.ingest_utils import read_csv_optimized
+
+    if dataset_path.endswith(".parquet"):
+        return DatasetStore.read_path(dataset_path, columns), None
+
+    df, ingest_report = read_csv_optimized(dataset_path)
+    df.columns = [normalize_column_name(col) for col in df.columns]
+    return (df[columns] if columns else df), ingest_report
+
+
+def run_analysis_job(dataset_path: str, task_type: str, target_column: str, filename: str,
+                     pdf_path: Optional[str] = None, session_id: Optional[str] = None,
+                     columns: Optional[List[str]] = None, sample_size: Optional[int] = None) -> Dict[str, Any]:
+    """Run EDA, model training and PDF chart extraction inside a pool worker
+
+    When session_id is given, the raw frame (for CSV sources) and the cleaned frame are
+    persisted to the session's columnar store. sample_size enables sampling mode in both
+    pipelines.
+    """
+    df, ingest_report = load_dataset(dataset_path, columns)
+    if session_id and not dataset_path.endswith(".parquet"):
+        dataset_store.write(session_id, "raw", df)
+
+    eda_pipeline = get_engine("eda_pipeline")
+    ml_pipeline = get_engine("ml_pipeline")
+
+    cleaned_df, eda_results = asyncio.run(eda_pipeline.run_analysis(
+        df, task_type, target_column, ingest_report, sample_size
+    ))
+    if session_id:
+        dataset_store.write(session_id, "cleaned", cleaned_df)
+    model_results = asyncio.run(ml_pipeline.train_and_evaluate(
+        cleaned_df, task_type, target_column, sample_size, session_id
+    ))
+
+    return {
+        "dataset_info": {
+            "shape": cleaned_df.shape,
+            "columns": list(cleaned_df.columns),
+            "filename": filename
+        },
+        "eda": eda_results,
+        "ml": model_results,
+        **run_pdf_extraction_job(pdf_path)
+    }
+
+
+def run_pdf_extraction_job(pdf_path: Optional[str]) -> Dict[str, Any]:
+    """Extract PDF charts on their own, e.g. when the dataset results came from the cache"""
+    if not pdf_path:
+        return {"pdf_charts": None}
+
+    try:
+        return {"pdf_charts": extract_pdf_charts(pdf_path)}
+    except Exception as e:
+        return {"pdf_charts": {"error": f"PDF analysis failed: {str(e)}"}}
@@ -0,0 +1,167 @@
+# backend/modules/blob_store.py
+
+import hashlib
+import os
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Any, Iterable, Iterator, Optional
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from backend.modules.database import Blob, BlobChunk
+
+# zstd comes from pyarrow (already used by the dataset store); zlib is the fallback
+BLOB_CODEC = os.getenv('BLOB_CODEC', 'zstd')
+BLOB_COMPRESSION_LEVEL = int(os.getenv('BLOB_COMPRESSION_LEVEL', '3'))
+# Uncompressed bytes per chunk; chunks are compressed independently so reads can stream
+BLOB_CHUNK_BYTES = int(os.getenv('BLOB_CHUNK_BYTES', str(256 * 1024)))
+# Payloads smaller than this are cheaper to keep inline in their row than to reference
+BLOB_INLINE_MAX_BYTES = int(os.getenv('BLOB_INLINE_MAX_BYTES', '1024'))
+# Chunk rows fetched per round trip while streaming a blob
+BLOB_READ_BATCH = int(os.getenv('BLOB_READ_BATCH', '4'))
+
+_NO_SYNC = {"synchronize_session": False}
+
+_zstd_codec = None
+
+
+def _zstd():
+    global _zstd_codec
+    if _zstd_codec is None:
+        import pyarrow as pa
+        _zstd_codec = pa.Codec("zstd", compression_level=BLOB_COMPRESSION_LEVEL)
+    return _zstd_codec
+
+
+def _default_codec() -> str:
+    if BLOB_CODEC == "zstd":
+        try:
+            _zstd()
+        except (ImportError, ValueError):
+            return "zlib"
+    return BLOB_CODEC
+
+
+def compress(chunk: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstd().compress(chunk, asbytes=True)
+    if codec == "zlib":
+        return zlib.compress(chunk, BLOB_COMPRESSION_LEVEL)
+    return chunk
+
+
+def decompress(chunk: bytes, codec: str, raw_size: int) -> bytes:
+    if codec == "zstd":
+        return _zstd().decompress(chunk, decompressed_size=raw_size, asbytes=True)
+    if codec == "zlib":
+        return zlib.decompress(chunk)
+    return chunk
+
+
+def make_key(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _insert(db: Session, model):
+    """Dialect insert() with ON CONFLICT support (SQLite and PostgreSQL)"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(model)
+
+
+def put(db: Session, content: bytes, codec: Optional[str] = None) -> str:
+    """Store content (deduplicated by hash), take a reference to it and return its key; the caller commits
+
+    Every put must be matched by a release once the referencing row is gone. Taking the
+    reference is a single upsert, so concurrent puts of the same content cannot collide
+    and a concurrent release cannot drop a blob between the check and the increment.
+    """
+    key = make_key(content)
+    bumped = db.execute(update(Blob).where(Blob.key == key).values(refcount=Blob.refcount + 1), execution_options=_NO_SYNC)
+    if bumped.rowcount:
+        return key
+
+    codec = codec or _default_codec()
+    chunks = [compress(content[start:start + BLOB_CHUNK_BYTES], codec)
+              for start in range(0, len(content), BLOB_CHUNK_BYTES)]
+    if chunks:
+        # Chunks are content-addressed too, so another writer's identical rows can be kept
+        db.execute(_insert(db, BlobChunk).values([
+            {"blob_key": key, "seq": seq, "data": data} for seq, data in enumerate(chunks)
+        ]).on_conflict_do_nothing(index_elements=[BlobChunk.blob_key, BlobChunk.seq]))
+    db.execute(_insert(db, Blob).values(
+        key=key, codec=codec, raw_size=len(content), stored_size=sum(len(data) for data in chunks),
+        chunk_count=len(chunks), refcount=1, created_at=datetime.utcnow()
+    ).on_conflict_do_update(index_elements=[Blob.key], set_={"refcount": Blob.refcount + 1}))
+    return key
+
+
+def iter_chunks(db: Session, key: str) -> Iterator[bytes]:
+    """Yield the blob's content one decompressed chunk at a time"""
+    blob = db.get(Blob, key)
+    if blob is None:
+        raise KeyError(f"Blob {key} not found")
+    rows = db.execute(
+        select(BlobChunk.data).where(BlobChunk.blob_key == key).order_by(BlobChunk.seq)
+        .execution_options(yield_per=BLOB_READ_BATCH)
+    )
+    for seq, (data,) in enumerate(rows):
+        raw_size = min(BLOB_CHUNK_BYTES, blob.raw_size - seq * BLOB_CHUNK_BYTES)
+        yield decompress(data, blob.codec, raw_size)
+
+
+def read(db: Session, key: str) -> bytes:
+    return b"".join(iter_chunks(db, key))
+
+
+def stream(session_factory: Callable, key: str) -> Iterator[bytes]:
+    """iter_chunks with its own session, for responses that outlive the request's session"""
+    db = session_factory()
+    try:
+        yield from iter_chunks(db, key)
+    finally:
+        db.close()
+
+
+def release(db: Session, keys: Iterable[str]) -> int:
+    """Drop one reference per key (repeat a key to drop several) and delete blobs left unreferenced
+
+    Returns the number of blobs deleted; the caller commits.
+    """
+    counts = Counter(key for key in keys if key)
+    if not counts:
+        return 0
+    # Core executemany: one statement per distinct key, each an atomic decrement
+    blobs = Blob.__table__
+    db.connection().execute(
+        update(blobs).where(blobs.c.key == bindparam("_key")).values(refcount=blobs.c.refcount - bindparam("_n")),
+        [{"_key": key, "_n": n} for key, n in counts.items()]
+    )
+    deleted = db.execute(delete(Blob).where(Blob.key.in_(list(counts)), Blob.refcount <= 0),
+                         execution_options=_NO_SYNC).rowcount
+    if deleted:
+        db.execute(delete(BlobChunk).where(
+            BlobChunk.blob_key.in_(list(counts)),
+            ~select(Blob.key).where(Blob.key == BlobChunk.blob_key).exists()
+        ), execution_options=_NO_SYNC)
+    return deleted
+
+
+def get_stats(db: Session) -> Dict[str, Any]:
+    count, raw_size, stored_size = db.query(
+        func.count(Blob.key), func.coalesce(func.sum(Blob.raw_size), 0), func.coalesce(func.sum(Blob.stored_size), 0)
+    ).one()
+    references = db.query(func.coalesce(func.sum(Blob.refcount), 0)).scalar()
+    return {
+        "blobs": count,
+        "references": references,
+        "raw_bytes": raw_size,
+        "stored_bytes": stored_size,
+        "compression_ratio": round(raw_size / stored_size, 2) if stored_size else 0.0,
+        "codec": _default_codec(),
+        "chunk_bytes": BLOB_CHUNK_BYTES,
+    }
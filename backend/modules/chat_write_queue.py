@@ -0,0 +1,144 @@
+# backend/modules/chat_write_queue.py
+
+import asyncio
+import os
+from typing import Callable, Dict, Any, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from backend.modules.database import ChatMessage
+
+CHAT_WRITE_BEHIND = os.getenv('CHAT_WRITE_BEHIND', 'true').lower() == 'true'
+CHAT_WRITE_BATCH_SIZE = int(os.getenv('CHAT_WRITE_BATCH_SIZE', '200'))
+# Longest a message waits in memory before its batch is written
+CHAT_WRITE_FLUSH_INTERVAL = float(os.getenv('CHAT_WRITE_FLUSH_INTERVAL', '0.05'))
+# Beyond this many unwritten messages, callers wait for a flush instead of queueing more
+CHAT_WRITE_MAX_PENDING = int(os.getenv('CHAT_WRITE_MAX_PENDING', '5000'))
+
+COLUMNS = [column.name for column in ChatMessage.__table__.columns]
+
+
+class ChatWriteQueue:
+    """Write-behind buffer that inserts chat_messages rows in batched transactions
+
+    Rows get their id and timestamp when queued, are visible through pending() until
+    written, and are flushed by a background task once batch_size rows are waiting or
+    flush_interval has passed, whichever is first. A failed batch stays queued and is
+    retried on the next flush; rows the database rejects outright are dropped one by one
+    so they cannot block the rest. Pending rows live only in this process: call aclose()
+    on shutdown, and expect other workers to see a message up to flush_interval late.
+    """
+
+    def __init__(self, async_session_factory: Callable, batch_size: int = CHAT_WRITE_BATCH_SIZE,
+                 flush_interval: float = CHAT_WRITE_FLUSH_INTERVAL, max_pending: int = CHAT_WRITE_MAX_PENDING):
+        self.async_session_factory = async_session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[ChatMessage] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "failed_batches": 0, "dropped": 0, "discarded": 0}
+
+    async def enqueue(self, row: ChatMessage) -> None:
+        if len(self._pending) >= self.max_pending:
+            await self.flush()
+            if len(self._pending) >= self.max_pending:
+                raise RuntimeError(f"Chat message write queue is full ({self.max_pending} pending)")
+
+        self._pending.append(row)
+        self.stats["enqueued"] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    def pending(self, session_id: str) -> List[ChatMessage]:
+        """Queued, not yet written rows for session_id, oldest first"""
+        return [row for row in self._pending if row.session_id == session_id]
+
+    async def discard(self, session_id: str) -> None:
+        """Drop a session's unwritten rows, e.g. before the session is deleted"""
+        async with self._flush_lock:  # lets an in-flight batch land first, so the caller can delete it
+            before = len(self._pending)
+            self._pending = [row for row in self._pending if row.session_id != session_id]
+            self.stats["discarded"] += before - len(self._pending)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < self.batch_size:
+                await asyncio.sleep(self.flush_interval)
+            written = await self.flush()
+            if not written and self._pending:
+                await asyncio.sleep(self.flush_interval)  # database unavailable; back off before retrying
+
+    @staticmethod
+    def _values(row: ChatMessage) -> Dict[str, Any]:
+        return {name: getattr(row, name) for name in COLUMNS}
+
+    async def _insert(self, rows: List[ChatMessage]) -> None:
+        async with self.async_session_factory() as db:
+            await db.execute(insert(ChatMessage), [self._values(row) for row in rows])
+            await db.commit()
+
+    async def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows written"""
+        async with self._flush_lock:
+            written = 0
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                try:
+                    done = await self._write_batch(batch)
+                except Exception as e:
+                    self.stats["failed_batches"] += 1
+                    print(f"Chat message batch of {len(batch)} failed, will retry: {e}")
+                    break
+
+                finished = {id(row) for row in batch}
+                self._pending = [row for row in self._pending if id(row) not in finished]
+                written += len(done)
+                self.stats["written"] += len(done)
+                self.stats["batches"] += 1
+
+            if not self._pending:
+                self._wakeup.clear()
+            return written
+
+    async def _write_batch(self, batch: List[ChatMessage]) -> List[ChatMessage]:
+        try:
+            await self._insert(batch)
+            return batch
+        except IntegrityError:
+            return await self._insert_individually(batch)
+
+    async def _insert_individually(self, batch: List[ChatMessage]) -> List[ChatMessage]:
+        written = []
+        for row in batch:
+            try:
+                await self._insert([row])
+                written.append(row)
+            except IntegrityError as e:
+                self.stats["dropped"] += 1
+                print(f"Dropping chat message {row.id} for session {row.session_id}: {e}")
+        return written
+
+    async def aclose(self) -> None:
+        """Flush what is queued and stop the background task"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": len(self._pending),
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+        }
@@ -0,0 +1,210 @@
+# backend/modules/conversation_memory.py
+
+import asyncio
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, Any, List, Optional
+
+from sqlalchemy import select
+
+from backend.modules.chat_write_queue import ChatWriteQueue
+from backend.modules.database import ChatMessage
+
+CHAT_MEMORY_TURNS = int(os.getenv('CHAT_MEMORY_TURNS', '10'))
+CHAT_MEMORY_MAX_SESSIONS = int(os.getenv('CHAT_MEMORY_MAX_SESSIONS', '1000'))
+# Refreshes re-read this many seconds before the newest row already seen: a row another
+# worker stamped earlier but committed later (e.g. from its write-behind queue) still shows up
+CHAT_MEMORY_REFRESH_OVERLAP = float(os.getenv('CHAT_MEMORY_REFRESH_OVERLAP', '60'))
+
+
+class _SessionMemory:
+    def __init__(self, max_turns: int):
+        self.turns: Deque[Dict[str, Any]] = deque(maxlen=max_turns)
+        # Newest timestamp read back from chat_messages; queued and local rows never move it
+        self.last_timestamp: Optional[datetime] = None
+
+
+class ConversationMemoryStore:
+    """Bounded per-session conversation memory backed by the chat_messages table
+
+    Each session keeps its last max_turns exchanges in process; sessions are evicted LRU
+    beyond max_sessions. chat_messages is the source of truth: a session missing from
+    memory is rebuilt from its newest rows, and every read pulls rows from refresh_overlap
+    before the newest one seen, so turns written by other uvicorn workers show up in this
+    one too, even when they commit out of timestamp order. Turns are de-duplicated by id
+    and kept in timestamp order.
+
+    ahistory/arecord are the event-loop variants; they use async_session_factory when one
+    is given and fall back to running the sync methods in a thread otherwise. With a
+    write_queue, arecord only queues the row; reads merge the queued rows back in.
+    """
+
+    def __init__(self, session_factory: Callable, max_turns: int = CHAT_MEMORY_TURNS,
+                 max_sessions: int = CHAT_MEMORY_MAX_SESSIONS, async_session_factory: Optional[Callable] = None,
+                 write_queue: Optional[ChatWriteQueue] = None,
+                 refresh_overlap: float = CHAT_MEMORY_REFRESH_OVERLAP):
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+        self.write_queue = write_queue
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.refresh_overlap = timedelta(seconds=refresh_overlap)
+        self._sessions: "OrderedDict[str, _SessionMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"rebuilds": 0, "refreshed_turns": 0, "evictions": 0}
+
+    @staticmethod
+    def _turn(row: ChatMessage) -> Dict[str, Any]:
+        return {
+            "id": row.id,
+            "message": row.message,
+            "response": row.response,
+            "context_type": row.context_type,
+            "timestamp": row.timestamp.isoformat() if row.timestamp else None
+        }
+
+    def _merge(self, memory: _SessionMemory, rows: List[ChatMessage]) -> int:
+        """Add rows not already in memory, keeping the newest max_turns in timestamp order
+
+        Returns how many of the rows were new.
+        """
+        known_ids = {turn["id"] for turn in memory.turns}
+        new_turns = [self._turn(row) for row in rows if row.id not in known_ids]
+        if new_turns:
+            turns = sorted(list(memory.turns) + new_turns, key=lambda turn: turn["timestamp"] or "")
+            memory.turns = deque(turns[-memory.turns.maxlen:], maxlen=memory.turns.maxlen)
+        return len(new_turns)
+
+    def _touch(self, session_id: str) -> _SessionMemory:
+        memory = self._sessions.get(session_id)
+        if memory is None:
+            memory = self._sessions[session_id] = _SessionMemory(self.max_turns)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats["evictions"] += 1
+        self._sessions.move_to_end(session_id)
+        return memory
+
+    def _begin_read(self, session_id: str):
+        with self._lock:
+            known = session_id in self._sessions
+            memory = self._touch(session_id)
+            since = memory.last_timestamp
+
+        query = select(ChatMessage).where(ChatMessage.session_id == session_id)
+        if known and since is not None:
+            query = query.where(ChatMessage.timestamp >= since - self.refresh_overlap)
+            return known, memory, query.order_by(ChatMessage.timestamp.asc())
+        return known, memory, query.order_by(ChatMessage.timestamp.desc()).limit(self.max_turns)
+
+    def _finish_read(self, session_id: str, known: bool, memory: _SessionMemory,
+                     rows: List[ChatMessage]) -> List[Dict[str, Any]]:
+        rows = list(rows)
+        with self._lock:
+            # Only rows read back from the database advance the watermark
+            for row in rows:
+                if row.timestamp and (memory.last_timestamp is None or row.timestamp > memory.last_timestamp):
+                    memory.last_timestamp = row.timestamp
+            added = self._merge(memory, rows + self.pending(session_id))
+            if known:
+                self.stats["refreshed_turns"] += added
+            else:
+                self.stats["rebuilds"] += 1
+            return list(memory.turns)
+
+    def _remember(self, session_id: str, row: ChatMessage) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._merge(self._touch(session_id), [row])
+
+    def history(self, session_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Return the session's recent turns, oldest first, synced with chat_messages"""
+        if not session_id:
+            return []
+
+        known, memory, query = self._begin_read(session_id)
+        db = self.session_factory()
+        try:
+            rows = db.execute(query).scalars().all()
+        finally:
+            db.close()
+        return self._finish_read(session_id, known, memory, rows)
+
+    async def ahistory(self, session_id: Optional[str]) -> List[Dict[str, Any]]:
+        if not session_id:
+            return []
+        if self.async_session_factory is None:
+            return await asyncio.to_thread(self.history, session_id)
+
+        known, memory, query = self._begin_read(session_id)
+        async with self.async_session_factory() as db:
+            rows = (await db.execute(query)).scalars().all()
+        return self._finish_read(session_id, known, memory, rows)
+
+    def record(self, session_id: Optional[str], message: str, response: str, context_type: str = "general") -> Optional[str]:
+        """Persist an exchange to chat_messages and add it to the session's memory"""
+        if not session_id:
+            return None  # chat without a session has nothing to attach the row to
+        db = self.session_factory()
+        try:
+            row = ChatMessage(session_id=session_id, message=message, response=response, context_type=context_type)
+            db.add(row)
+            db.commit()
+            db.refresh(row)
+            db.expunge(row)
+        finally:
+            db.close()
+
+        self._remember(session_id, row)
+        return row.id
+
+    async def arecord(self, session_id: Optional[str], message: str, response: str,
+                      context_type: str = "general") -> Optional[str]:
+        if not session_id:
+            return None
+        if self.write_queue is not None:
+            row = ChatMessage(id=str(uuid.uuid4()), session_id=session_id, message=message, response=response,
+                              context_type=context_type, timestamp=datetime.utcnow())
+            await self.write_queue.enqueue(row)
+            self._remember(session_id, row)
+            return row.id
+        if self.async_session_factory is None:
+            return await asyncio.to_thread(self.record, session_id, message, response, context_type)
+
+        # id and timestamp are client-side defaults, filled in at flush, so no refresh is needed
+        row = ChatMessage(session_id=session_id, message=message, response=response, context_type=context_type)
+        async with self.async_session_factory() as db:
+            db.add(row)
+            await db.commit()
+        self._remember(session_id, row)
+        return row.id
+
+    def pending(self, session_id: str) -> List[ChatMessage]:
+        """Rows recorded for session_id that the write queue has not written yet"""
+        return self.write_queue.pending(session_id) if self.write_queue is not None else []
+
+    async def discard_pending(self, session_id: str) -> None:
+        if self.write_queue is not None:
+            await self.write_queue.discard(session_id)
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    async def aclose(self) -> None:
+        if self.write_queue is not None:
+            await self.write_queue.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "sessions": len(self._sessions),
+                "turns": sum(len(memory.turns) for memory in self._sessions.values()),
+                "max_turns": self.max_turns,
+                "max_sessions": self.max_sessions,
+                "write_queue": self.write_queue.get_stats() if self.write_queue is not None else None,
+            }
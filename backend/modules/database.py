@@ -1,19 +1,90 @@
 # backend/modules/database.py
 
-from sqlalchemy import create_engine, Column, String, DateTime, Text
+from sqlalchemy import create_engine, event, Column, String, DateTime, Text, Integer, LargeBinary, Index, inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
 import uuid
 import os
 import json
+import time
 
 # ============================
 # Database Setup
 # ============================
 MONGO_URL = os.getenv('MONGO_URL', 'sqlite:///./insightforge.db')
-engine = create_engine(MONGO_URL, connect_args={"check_same_thread": False})
+# Async handlers use their own engine on the same database (aiosqlite for SQLite)
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', MONGO_URL.replace('sqlite://', 'sqlite+aiosqlite://', 1))
+
+# Per-engine pool; the sync and async engines each get one, so size them for the
+# deployment's worker count (SQLite still serializes writers, whatever the pool size)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '-1'))
+# How long a worker waits for another worker's schema setup/migrations before giving up
+SCHEMA_LOCK_TIMEOUT = float(os.getenv('SCHEMA_LOCK_TIMEOUT', '300'))
+
+# Applied to every new SQLite connection, in this order. busy_timeout comes first: it makes
+# a writer wait for the lock instead of failing with "database is locked", which also
+# covers the switch to WAL when several workers open a new database at once. WAL lets
+# readers run alongside the single writer, and synchronous=NORMAL is durable across
+# application crashes under WAL (only an OS crash can lose the latest commits).
+SQLITE_PRAGMAS = {
+    "busy_timeout": int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    "journal_mode": os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    "synchronous": os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    "cache_size": -int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000')),  # negative = KiB
+    "temp_store": "MEMORY",
+}
+
+
+def _pool_kwargs(url: str) -> Dict[str, Any]:
+    if ":memory:" in url or url.rstrip("/").endswith("sqlite:"):
+        return {}  # in-memory SQLite keeps one connection per thread
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT, "pool_recycle": DB_POOL_RECYCLE}
+
+
+def _install_sqlite_pragmas(sync_engine, pragmas: Optional[Dict[str, Any]]) -> None:
+    if sync_engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def make_engine(url: str = MONGO_URL, pragmas: Optional[Dict[str, Any]] = SQLITE_PRAGMAS):
+    """Sync engine for worker threads, background jobs and startup tasks"""
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    sync_engine = create_engine(url, connect_args=connect_args, **_pool_kwargs(url))
+    _install_sqlite_pragmas(sync_engine, pragmas)
+    return sync_engine
+
+
+def make_async_engine(url: str = ASYNC_DATABASE_URL, pragmas: Optional[Dict[str, Any]] = SQLITE_PRAGMAS):
+    """Async engine for request handlers, so queries and commits do not block the event loop"""
+    kwargs = _pool_kwargs(url)
+    if kwargs and url.startswith("sqlite"):
+        kwargs["poolclass"] = AsyncAdaptedQueuePool  # aiosqlite otherwise opens a connection per checkout
+    async_engine = create_async_engine(url, **kwargs)
+    _install_sqlite_pragmas(async_engine.sync_engine, pragmas)
+    return async_engine
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = make_async_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # ============================
@@ -29,6 +100,20 @@ class AnalysisSession(Base):
     target_column = Column(String, nullable=False)
     dataset_info = Column(Text)  # JSON string
     results = Column(Text)       # JSON string
+    upload_info = Column(Text)   # JSON string: bytes, sha256, throughput per uploaded file
+    job_id = Column(String)
+    status = Column(String, default="completed")  # queued | running | completed | failed
+    job_owner = Column(String)    # host:pid:boot id of the server process running the job
+    heartbeat_at = Column(DateTime)
+    error = Column(Text)
+    completed_at = Column(DateTime)
+
+    # (created_at, id) is the keyset the session listing pages on, optionally per task_type
+    __table_args__ = (
+        Index("ix_analysis_sessions_created_at_id", "created_at", "id"),
+        Index("ix_analysis_sessions_task_type_created_at_id", "task_type", "created_at", "id"),
+        Index("ix_analysis_sessions_job_id", "job_id"),
+    )
 
 
 class ChatMessage(Base):
@@ -41,10 +126,228 @@ class ChatMessage(Base):
     response = Column(Text, nullable=False)
     context_type = Column(String, default="general")
 
+    # Serves both the per-session filter and conversation memory's ordering by timestamp
+    __table_args__ = (Index("ix_chat_messages_session_id_timestamp", "session_id", "timestamp"),)
+
+
+class AnalysisResultSection(Base):
+    __tablename__ = "analysis_result_sections"
+
+    session_id = Column(String, primary_key=True)
+    section = Column(String, primary_key=True)  # see backend.modules.results_store.SECTIONS
+    data = Column(Text)                         # JSON string, for sections small enough to keep inline
+    blob_key = Column(String)                   # otherwise the JSON lives in the blob store
+    size_bytes = Column(Integer, default=0)     # uncompressed JSON size
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_analysis_result_sections_blob_key", "blob_key"),)
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    key = Column(String, primary_key=True)      # sha256 of the uncompressed content
+    codec = Column(String, nullable=False)      # zstd | zlib | none
+    raw_size = Column(Integer, nullable=False)
+    stored_size = Column(Integer, nullable=False)
+    chunk_count = Column(Integer, nullable=False)
+    refcount = Column(Integer, nullable=False, default=1)  # result section rows pointing at this blob
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BlobChunk(Base):
+    __tablename__ = "blob_chunks"
+
+    blob_key = Column(String, primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)  # each chunk is compressed on its own
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String, primary_key=True)  # sha256 of model, sampling params and normalized prompt
+    context_type = Column(String, default="general")
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    last_accessed = Column(DateTime, default=datetime.utcnow)
+    hits = Column(Integer, default=0)
+
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+# ============================
+# Migrations
+# ============================
+# Append-only list of (version, name, steps); a step is a SQL string or a function taking
+# the connection. Pending migrations run under the schema lock, in the same transaction
+# as table creation, and are recorded in schema_migrations. Tables and indexes declared
+# on the models are created by create_all for new databases, so steps must be idempotent.
+
+def _rebuild_result_sections(conn) -> None:
+    # SQLite cannot drop NOT NULL in place, so the table is rebuilt; blob_key itself was
+    # already added by ensure_schema's column backfill. Tables created from the current
+    # model already have a nullable data column and are left alone.
+    columns = {col["name"]: col for col in inspect(conn).get_columns("analysis_result_sections")}
+    if columns["data"]["nullable"]:
+        return
+    for statement in [
+        "DROP TABLE IF EXISTS analysis_result_sections_new",
+        "CREATE TABLE analysis_result_sections_new (session_id VARCHAR NOT NULL, section VARCHAR NOT NULL, "
+        "data TEXT, blob_key VARCHAR, size_bytes INTEGER, updated_at DATETIME, PRIMARY KEY (session_id, section))",
+        "INSERT INTO analysis_result_sections_new (session_id, section, data, blob_key, size_bytes, updated_at) "
+        "SELECT session_id, section, data, blob_key, size_bytes, updated_at FROM analysis_result_sections",
+        "DROP TABLE analysis_result_sections",
+        "ALTER TABLE analysis_result_sections_new RENAME TO analysis_result_sections",
+    ]:
+        conn.execute(text(statement))
+
+
+def _drop_session_chat_history(conn) -> None:
+    # Never read or written: chat transcripts live in chat_messages. Databases created
+    # from the current model do not have the column
+    columns = {col["name"] for col in inspect(conn).get_columns("analysis_sessions")}
+    if "chat_history" in columns:
+        conn.execute(text("ALTER TABLE analysis_sessions DROP COLUMN chat_history"))
+
+
+MIGRATIONS = [
+    (1, "index chat_messages by session", [
+        "CREATE INDEX IF NOT EXISTS ix_chat_messages_session_id_timestamp ON chat_messages (session_id, timestamp)",
+    ]),
+    (2, "index analysis_sessions by created_at and job_id", [
+        "CREATE INDEX IF NOT EXISTS ix_analysis_sessions_created_at ON analysis_sessions (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_analysis_sessions_job_id ON analysis_sessions (job_id)",
+    ]),
+    (3, "keyset indexes for the session listing", [
+        "CREATE INDEX IF NOT EXISTS ix_analysis_sessions_created_at_id ON analysis_sessions (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_analysis_sessions_task_type_created_at_id "
+        "ON analysis_sessions (task_type, created_at, id)",
+        "DROP INDEX IF EXISTS ix_analysis_sessions_created_at",
+    ]),
+    (4, "allow result sections to reference blobs", [
+        _rebuild_result_sections,
+        "CREATE INDEX IF NOT EXISTS ix_analysis_result_sections_blob_key ON analysis_result_sections (blob_key)",
+    ]),
+    # refcount was added by the column backfill; count the references that already exist
+    (5, "reference-count blobs", [
+        "UPDATE blobs SET refcount = (SELECT COUNT(*) FROM analysis_result_sections "
+        "WHERE analysis_result_sections.blob_key = blobs.key)",
+        "DELETE FROM blobs WHERE refcount = 0",
+        "DELETE FROM blob_chunks WHERE blob_key NOT IN (SELECT key FROM blobs)",
+    ]),
+    (6, "drop the unused analysis_sessions.chat_history column", [
+        _drop_session_chat_history,
+    ]),
+]
+
+
+def _already_applied(error: Exception) -> bool:
+    message = str(error).lower()
+    return "already exists" in message or "duplicate column" in message
+
+
+def _execute_step(conn, step) -> None:
+    if callable(step):
+        step(conn)
+        return
+    try:
+        conn.execute(text(step))
+    except (OperationalError, ProgrammingError) as e:
+        # The schema lock keeps workers from racing, but a step that finds its change
+        # already in place (e.g. made by hand) counts as applied
+        if not _already_applied(e):
+            raise
+
+
+@contextmanager
+def _schema_lock(bind) -> Iterator[Any]:
+    """Connection inside a write transaction, so only one process sets up the schema at a time
+
+    On SQLite this is BEGIN IMMEDIATE, which takes the database write lock up front;
+    other workers wait for it (retrying past busy_timeout up to SCHEMA_LOCK_TIMEOUT) and
+    then see the finished schema.
+    """
+    with bind.connect() as conn:
+        if bind.dialect.name != "sqlite":
+            with conn.begin():
+                yield conn
+            return
+
+        conn.execution_options(isolation_level="AUTOCOMMIT")  # BEGIN/COMMIT are issued here
+        deadline = time.monotonic() + SCHEMA_LOCK_TIMEOUT
+        while True:
+            try:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                break
+            except OperationalError as e:
+                if "locked" not in str(e) or time.monotonic() >= deadline:
+                    raise
+        try:
+            yield conn
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+        conn.exec_driver_sql("COMMIT")
+
+
+def _apply_migrations(conn) -> list:
+    applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+    ran = []
+    for version, name, steps in MIGRATIONS:
+        if version in applied:
+            continue
+        for step in steps:
+            _execute_step(conn, step)
+        conn.execute(
+            text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+            {"version": version, "name": name, "applied_at": datetime.utcnow()}
+        )
+        ran.append((version, name))
+    return ran
+
+
+def apply_migrations(bind=engine) -> list:
+    """Run migrations newer than the database's recorded version; returns the versions applied"""
+    with _schema_lock(bind) as conn:
+        ran = _apply_migrations(conn)
+    for version, name in ran:
+        print(f"Applied schema migration {version}: {name}")
+    return [version for version, _ in ran]
+
 # ============================
 # Table Initialization
 # ============================
-Base.metadata.create_all(bind=engine)
+def ensure_schema(bind=engine):
+    """Create missing tables, add columns introduced after a database was first created and
+    apply pending migrations
+
+    Safe to run from several workers at once: everything happens in one transaction under
+    the schema lock, and the schema is re-read once the lock is held.
+    """
+    with _schema_lock(bind) as conn:
+        Base.metadata.create_all(bind=conn)
+
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    col_type = column.type.compile(dialect=bind.dialect)
+                    _execute_step(conn, f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}")
+
+        ran = _apply_migrations(conn)
+    for version, name in ran:
+        print(f"Applied schema migration {version}: {name}")
+
+
+ensure_schema()
 
 # ============================
 # DB Session Dependency
@@ -56,6 +359,11 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # ============================
 # Database Manager Class
 # ============================
@@ -65,14 +373,16 @@ class DatabaseManager:
         self.engine = engine
 
     def save_analysis_session(self, db: Session, session_data: dict) -> str:
+        from backend.modules import results_store
         try:
             session = AnalysisSession(
+                id=str(uuid.uuid4()),
                 task_type=session_data.get('task_type'),
                 target_column=session_data.get('target_column'),
-                dataset_info=json.dumps(session_data.get('dataset_info', {})),
-                results=json.dumps(session_data.get('results', {}))
+                dataset_info=json.dumps(session_data.get('dataset_info', {}))
             )
             db.add(session)
+            results_store.save_sections(db, session.id, session_data.get('results', {}))
             db.commit()
             db.refresh(session)
             return session.id
@@ -81,6 +391,7 @@ class DatabaseManager:
             raise e
 
     def get_analysis_session(self, db: Session, session_id: str):
+        from backend.modules import results_store
         session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
         if session:
             return {
@@ -89,6 +400,6 @@ class DatabaseManager:
                 "task_type": session.task_type,
                 "target_column": session.target_column,
                 "dataset_info": json.loads(session.dataset_info or "{}"),
-                "results": json.loads(session.results or "{}")
+                "results": results_store.assemble_results(results_store.load_sections(db, session_id))
             }
         return None
@@ -0,0 +1,94 @@
+# backend/modules/dataset_store.py
+
+import os
+import shutil
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+# pyarrow and pandas are imported where they are used: the API process only needs
+# paths and existence checks from this module on most requests.
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class DatasetStore:
+    """Per-session columnar (Parquet) copies of uploaded datasets
+
+    Each session gets <root>/<session_id>/raw.parquet, written once at ingest from the
+    uploaded CSV, and cleaned.parquet, the frame produced by the EDA pipeline. Files are
+    zstd-compressed and read with memory mapping, so callers that only need a few
+    columns never touch the rest of the file or re-parse CSV text.
+    """
+
+    KINDS = ("raw", "cleaned")
+
+    def __init__(self, root: str, compression: str = "zstd"):
+        self.root = root
+        self.compression = compression
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, session_id: str, kind: str) -> str:
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown dataset kind '{kind}'")
+        return os.path.join(self.root, session_id, f"{kind}.parquet")
+
+    def exists(self, session_id: str, kind: str) -> bool:
+        return os.path.exists(self.path(session_id, kind))
+
+    def write(self, session_id: str, kind: str, df: "pd.DataFrame") -> str:
+        """Write df as the session's raw or cleaned dataset and return its path"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self.path(session_id, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type object columns (e.g. numbers and strings) cannot be typed by Arrow
+            object_cols = df.select_dtypes(include=['object']).columns
+            table = pa.Table.from_pandas(df.astype({col: str for col in object_cols}), preserve_index=False)
+
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, path)
+        return path
+
+    def read(self, session_id: str, kind: str, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        return self.read_path(self.path(session_id, kind), columns)
+
+    @staticmethod
+    def read_path(path: str, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        """Read only the requested columns from a Parquet file"""
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    def columns(self, session_id: str, kind: str) -> List[str]:
+        """Column names from the file footer, without reading any data"""
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(self.path(session_id, kind)).names
+
+    def iter_csv(self, session_id: str, kind: str, columns: Optional[List[str]] = None) -> Iterator[str]:
+        """Yield the session's dataset (optionally a column subset) as CSV text, batch by batch"""
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(self.path(session_id, kind), memory_map=True)
+        header = True
+        for batch in parquet_file.iter_batches(columns=columns):
+            yield batch.to_pandas().to_csv(index=False, header=header)
+            header = False
+        if header:
+            yield pd.DataFrame(columns=columns or parquet_file.schema_arrow.names).to_csv(index=False)
+
+    def export_csv(self, session_id: str, kind: str, dest_path: str, columns: Optional[List[str]] = None) -> str:
+        """Write the session's dataset (optionally a column subset) to a CSV file"""
+        with open(dest_path, "w", newline="") as f:
+            for text in self.iter_csv(session_id, kind, columns):
+                f.write(text)
+        return dest_path
+
+    def delete(self, session_id: str) -> None:
+        shutil.rmtree(os.path.join(self.root, session_id), ignore_errors=True)
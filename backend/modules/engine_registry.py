@@ -0,0 +1,107 @@
+# backend/modules/engine_registry.py
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class EngineRegistry:
+    """Process-wide registry that builds each engine once, on first use
+
+    Factories import their module lazily, so registering an engine costs nothing until
+    something actually asks for it. Construction is guarded per engine, so concurrent
+    first requests share a single build.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self.build_seconds: Dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._factories:
+            raise KeyError(f"Unknown engine '{name}'")
+
+        with self._locks[name]:
+            if name not in self._instances:
+                started = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self.build_seconds[name] = round(time.perf_counter() - started, 3)
+                print(f"Engine '{name}' loaded in {self.build_seconds[name]}s")
+            return self._instances[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> None:
+        """Build the given engines (all registered engines by default) ahead of first use"""
+        for name in (names or list(self._factories)):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Warm-up of engine '{name}' failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            name: {"loaded": self.is_loaded(name), "build_seconds": self.build_seconds.get(name)}
+            for name in self._factories
+        }
+
+
+# ============================
+# Engine Factories
+# ============================
+
+def _chart_classifier():
+    from backend.modules.enhanced_vision import CNNChartClassifier
+    return CNNChartClassifier()
+
+
+def _image_processor():
+    from backend.modules.enhanced_vision import EnhancedImageProcessor
+    return EnhancedImageProcessor()
+
+
+def _eda_pipeline():
+    from backend.modules.enhanced_eda import AutoEDAPipeline
+    return AutoEDAPipeline()
+
+
+def _ml_pipeline():
+    from backend.modules.enhanced_ml import EnhancedMLPipeline
+    return EnhancedMLPipeline()
+
+
+def _chat_engine():
+    from backend.modules.chat_write_queue import ChatWriteQueue, CHAT_WRITE_BEHIND
+    from backend.modules.conversation_memory import ConversationMemoryStore
+    from backend.modules.database import SessionLocal, AsyncSessionLocal
+    from backend.modules.enhanced_chat import IntelligentChatEngine
+    from backend.modules.llm_cache import LLMResponseCache
+    response_cache = LLMResponseCache(SessionLocal) if os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true' else None
+    write_queue = ChatWriteQueue(AsyncSessionLocal) if CHAT_WRITE_BEHIND else None
+    memory_store = ConversationMemoryStore(SessionLocal, async_session_factory=AsyncSessionLocal, write_queue=write_queue)
+    return IntelligentChatEngine(os.getenv('GROQ_API_KEY'), os.getenv('GROQ_API_URL'), os.getenv('GROQ_MODEL'),
+                                 response_cache=response_cache, memory_store=memory_store)
+
+
+registry = EngineRegistry()
+registry.register("chart_classifier", _chart_classifier)
+registry.register("image_processor", _image_processor)
+registry.register("eda_pipeline", _eda_pipeline)
+registry.register("ml_pipeline", _ml_pipeline)
+registry.register("chat_engine", _chat_engine)
+
+
+def get_engine(name: str) -> Any:
+    return registry.get(name)
@@ -1,20 +1,37 @@
+import asyncio
 import json
-import requests
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Any, List, Optional
 import re
-from datetime import datetime
-import numpy as np
-import pandas as pd
+
+from backend.modules.conversation_memory import ConversationMemoryStore
+from backend.modules.llm_cache import LLMResponseCache
+from backend.modules.llm_client import LLMClient, LLMAPIError, SingleFlight
+from backend.modules.llm_scheduler import LLMScheduler
+from backend.modules.prompt_context import (
+    PROMPT_MIN_CONTEXT_TOKENS, PROMPT_TOKEN_BUDGET, build_session_context, count_tokens
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+BATCH_CONTEXT_TYPES = {"chart_insights", "summary_insights"}
 
 
 class IntelligentChatEngine:
     """Enhanced chat engine with context awareness and memory"""
 
-    def __init__(self, api_key: str, api_url: str, model: str):
+    def __init__(self, api_key: str, api_url: str, model: str, response_cache: Optional[LLMResponseCache] = None,
+                 memory_store: Optional[ConversationMemoryStore] = None):
         self.api_key = api_key
         self.api_url = api_url
         self.model = model
-        self.conversation_memory = []
+        self.client = LLMClient(api_url, api_key)
+        self.single_flight = SingleFlight()
+        self.scheduler = LLMScheduler()
+        self.response_cache = response_cache
+        self.memory_store = memory_store
+        self.prompt_budget = PROMPT_TOKEN_BUDGET
+        self.prompt_stats = {"prompts": 0, "total_tokens": 0, "max_tokens": 0, "trimmed": 0}
         self.context_templates = {
             "chart_analysis": """
             You are an expert data analyst specializing in chart interpretation and data visualization insights.
@@ -36,11 +53,12 @@ class IntelligentChatEngine:
             "eda_analysis": """
             You are an expert statistician and data scientist analyzing exploratory data analysis results.
 
-            Dataset Info: {dataset_info}
-            Statistical Summary: {statistics}
             Task Type: {task_type}
             Target Variable: {target_column}
 
+            Analysis Context:
+            {context}
+
             Please provide:
             1. Key findings from the EDA
             2. Data quality assessment
@@ -55,9 +73,9 @@ class IntelligentChatEngine:
             You are a machine learning expert analyzing model performance results.
 
             Task: {task_type}
-            Best Model: {best_model}
-            Performance Metrics: {metrics}
-            Comparison Results: {comparison}
+
+            Analysis Context:
+            {context}
 
             Please provide:
             1. Model performance interpretation
@@ -83,55 +101,97 @@ class IntelligentChatEngine:
             """
         }
 
-    async def generate_response(self, message: str, context: Dict[str, Any], context_type: str = "general") -> str:
-        """Generate intelligent response based on context and conversation history"""
+    async def generate_response(self, message: str, context: Dict[str, Any], context_type: str = "general",
+                                session_id: Optional[str] = None) -> str:
+        """Generate intelligent response based on context and the session's conversation history"""
         try:
-            # Build prompt based on context type
-            if context_type == "chart_analysis":
-                prompt = self._build_chart_analysis_prompt(message, context)
-            elif context_type == "eda_analysis":
-                prompt = self._build_eda_analysis_prompt(message, context)
-            elif context_type == "model_performance":
-                prompt = self._build_model_performance_prompt(message, context)
-            else:
-                prompt = self._build_general_prompt(message, context)
-
-            # Add conversation memory
-            if self.conversation_memory:
-                conversation_context = "\
-".join([
-                    f"User: {item['message']}\
-AI: {item['response']}"
-                    for item in self.conversation_memory[-3:]  # Last 3 exchanges
-                ])
-                prompt = f"Previous conversation:\
-{conversation_context}\
-\
-{prompt}"
+            history = await self._history(session_id)
+            prompt = self._build_prompt(message, context, context_type, history)
 
             # Make API call
-            response = await self._call_groq_api(prompt)
-
-            # Store in memory
-            self.conversation_memory.append({
-                "message": message,
-                "response": response,
-                "context_type": context_type,
-                "timestamp": datetime.now().isoformat()
-            })
-
-            # Keep memory manageable
-            if len(self.conversation_memory) > 10:
-                self.conversation_memory = self.conversation_memory[-10:]
+            response = await self._call_groq_api(prompt, context_type)
 
             return response
 
         except Exception as e:
             return f"I apologize, but I encountered an error while processing your request: {str(e)}"
 
+    async def stream_response(self, message: str, context: Dict[str, Any], context_type: str = "general",
+                              session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Like generate_response, but yields the answer incrementally as the model produces it"""
+        history = await self._history(session_id)
+        prompt = self._build_prompt(message, context, context_type, history)
+        payload = self._build_payload(prompt)
+        cache_key = self._cache_key(payload) if self.response_cache else None
+        cached = await self._cached_response(cache_key) if cache_key else None
+
+        if cached is not None:
+            yield cached
+        else:
+            parts = []
+            async with self.scheduler.slot("interactive", self._estimate_tokens(payload)):
+                async for delta in self.client.stream_chat_completion(payload):
+                    parts.append(delta)
+                    yield delta
+            response = "".join(parts).strip()
+            if cache_key:
+                await self._cache_response(cache_key, response, context_type)
+
+    async def _history(self, session_id: Optional[str]) -> List[Dict[str, Any]]:
+        if self.memory_store is None or not session_id:
+            return []
+        return await self.memory_store.ahistory(session_id)
+
+    def _build_prompt(self, message: str, context: Dict[str, Any], context_type: str,
+                      history: List[Dict[str, Any]]) -> str:
+        """Build the context-specific prompt, prefixed with recent conversation"""
+        prefix = ""
+        if history:
+            conversation_context = "\n".join([
+                f"User: {item['message']}\nAI: {item['response']}"
+                for item in history[-3:]  # Last 3 exchanges
+            ])
+            prefix = f"Previous conversation:\n{conversation_context}\n\n"
+        report = {"context_type": context_type, "history_tokens": count_tokens(prefix)}
+
+        # Build prompt based on context type
+        if context_type == "chart_analysis":
+            prompt = self._build_chart_analysis_prompt(message, context)
+        elif context_type == "eda_analysis":
+            prompt = self._build_eda_analysis_prompt(message, context, report)
+        elif context_type == "model_performance":
+            prompt = self._build_model_performance_prompt(message, context, report)
+        else:
+            prompt = self._build_general_prompt(message, context, history, report)
+
+        # Add conversation memory
+        prompt = prefix + prompt
+
+        self._record_prompt_size(prompt, report)
+        return prompt
+
+    def _record_prompt_size(self, prompt: str, report: Dict[str, Any]):
+        """Log the size of a built prompt and fold it into the running prompt stats"""
+        report["prompt_tokens"] = count_tokens(prompt)
+        trimmed = [name for name, section in report.get("sections", {}).items() if section["status"] != "complete"]
+
+        self.prompt_stats["prompts"] += 1
+        self.prompt_stats["total_tokens"] += report["prompt_tokens"]
+        self.prompt_stats["max_tokens"] = max(self.prompt_stats["max_tokens"], report["prompt_tokens"])
+        if trimmed:
+            self.prompt_stats["trimmed"] += 1
+
+        print(f"Prompt ({report['context_type']}): {report['prompt_tokens']} tokens, "
+              f"context {report.get('context_tokens', 0)}/{report.get('budget', '-')}"
+              + (f", trimmed {', '.join(trimmed)}" if trimmed else ""))
+
     async def generate_chart_insights(self, chart_type: str, extracted_data: Dict[str, Any],
-                                      dataset: Optional[pd.DataFrame] = None) -> List[str]:
-        """Generate comprehensive insights from chart analysis"""
+                                      dataset: Optional["pd.DataFrame"] = None, raise_errors: bool = False) -> List[str]:
+        """Generate comprehensive insights from chart analysis
+
+        Failures come back as a one-line error insight unless raise_errors is set, for
+        callers that report failed charts themselves.
+        """
         try:
             data_summary = self._summarize_chart_data(chart_type, extracted_data)
 
@@ -150,27 +210,31 @@ AI: {item['response']}"
             Keep each insight concise but actionable.
             """
 
-            response = await self._call_groq_api(prompt)
+            if raise_errors:
+                response = await self._complete(prompt, "chart_insights")
+            else:
+                response = await self._call_groq_api(prompt, "chart_insights")
 
             # Parse response into list of insights
             insights = [line.strip().lstrip('•-*').strip()
-                        for line in response.split('\
-')
+                        for line in response.split('\n')
                         if line.strip() and not line.strip().startswith('Here')]
 
             return insights[:5]  # Limit to 5 insights
 
         except Exception as e:
+            if raise_errors:
+                raise
             return [f"Error generating insights: {str(e)}"]
 
-    async def generate_summary_insights(self, chart_data: List[Dict], dataset: pd.DataFrame) -> List[str]:
+    async def generate_summary_insights(self, chart_data: List[Dict], dataset_info: Dict[str, Any]) -> List[str]:
         """Generate summary insights from multiple charts"""
         try:
             summary = f"""
             Analyzed {len(chart_data)} charts from the document.
-            Chart types found: {', '.join(set(chart['type'] for chart in chart_data))}
-            Dataset shape: {dataset.shape}
-            Dataset columns: {', '.join(dataset.columns.tolist())}
+            Chart types found: {', '.join(sorted(set(chart['type'] for chart in chart_data)))}
+            Dataset shape: {tuple(dataset_info.get('shape', ()))}
+            Dataset columns: {', '.join(dataset_info.get('columns', []))}
             """
 
             prompt = f"""
@@ -190,11 +254,10 @@ AI: {item['response']}"
             Focus on executive-level insights that connect the data to business value.
             """
 
-            response = await self._call_groq_api(prompt)
+            response = await self._call_groq_api(prompt, "summary_insights")
 
             insights = [line.strip().lstrip('•-*').strip()
-                        for line in response.split('\
-')
+                        for line in response.split('\n')
                         if line.strip() and not line.strip().startswith('Here')]
 
             return insights[:5]
@@ -212,46 +275,45 @@ AI: {item['response']}"
             chart_type=chart_type,
             extracted_data=json.dumps(extracted_data, indent=2),
             data_summary=data_summary
-        ) + f"\
-\
-User Question: {message}"
-
-    def _build_eda_analysis_prompt(self, message: str, context: Dict[str, Any]) -> str:
+        ) + f"\n\nUser Question: {message}"
+
+    def _fit_context(self, render: Callable[[str], str], context: Dict[str, Any], context_type: str,
+                     report: Dict[str, Any]) -> str:
+        """Render a template with session context compacted to what is left of the token budget"""
+        overhead = count_tokens(render("")) + report.get("history_tokens", 0)
+        budget = max(PROMPT_MIN_CONTEXT_TOKENS, self.prompt_budget - overhead)
+        context_text, context_report = build_session_context(context, context_type, budget)
+        report.update(context_report)
+        return render(context_text)
+
+    def _build_eda_analysis_prompt(self, message: str, context: Dict[str, Any], report: Dict[str, Any]) -> str:
         """Build prompt for EDA analysis context"""
-        return self.context_templates["eda_analysis"].format(
-            dataset_info=json.dumps(context.get('dataset_info', {}), indent=2),
-            statistics=json.dumps(context.get('statistics', {}), indent=2),
+        return self._fit_context(lambda context_text: self.context_templates["eda_analysis"].format(
+            context=context_text,
             task_type=context.get('task_type', 'unknown'),
             target_column=context.get('target_column', 'unknown')
-        ) + f"\
-\
-User Question: {message}"
+        ) + f"\n\nUser Question: {message}", context, "eda_analysis", report)
 
-    def _build_model_performance_prompt(self, message: str, context: Dict[str, Any]) -> str:
+    def _build_model_performance_prompt(self, message: str, context: Dict[str, Any], report: Dict[str, Any]) -> str:
         """Build prompt for model performance context"""
-        return self.context_templates["model_performance"].format(
-            task_type=context.get('task_type', 'unknown'),
-            best_model=json.dumps(context.get('best_model', {}), indent=2),
-            metrics=json.dumps(context.get('metrics', {}), indent=2),
-            comparison=json.dumps(context.get('comparison_table', []), indent=2)
-        ) + f"\
-\
-User Question: {message}"
-
-    def _build_general_prompt(self, message: str, context: Dict[str, Any]) -> str:
+        return self._fit_context(lambda context_text: self.context_templates["model_performance"].format(
+            context=context_text,
+            task_type=context.get('task_type', 'unknown')
+        ) + f"\n\nUser Question: {message}", context, "model_performance", report)
+
+    def _build_general_prompt(self, message: str, context: Dict[str, Any], history: List[Dict[str, Any]],
+                              report: Dict[str, Any]) -> str:
         """Build prompt for general inquiries"""
-        conversation_history = "\
-".join([
-            f"Q: {item['message']}\
-A: {item['response']}"
-            for item in self.conversation_memory[-2:]
-        ]) if self.conversation_memory else "None"
-
-        return self.context_templates["general_inquiry"].format(
-            context=json.dumps(context, indent=2) if context else "No specific context",
+        conversation_history = "\n".join([
+            f"Q: {item['message']}\nA: {item['response']}"
+            for item in history[-2:]
+        ]) if history else "None"
+
+        return self._fit_context(lambda context_text: self.context_templates["general_inquiry"].format(
+            context=context_text,
             conversation_history=conversation_history,
             question=message
-        )
+        ), context, "general", report)
 
     def _summarize_chart_data(self, chart_type: str, extracted_data: Dict[str, Any]) -> str:
         """Create human-readable summary of chart data"""
@@ -287,45 +349,93 @@ A: {item['response']}"
         except Exception:
             return "Chart data summary unavailable"
 
-    async def _call_groq_api(self, prompt: str) -> str:
-        """Make API call to Groq"""
+    def _build_payload(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert data scientist and business intelligence analyst. Provide clear, actionable insights based on data analysis. Use bullet points for lists and be concise but comprehensive."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "max_tokens": 1500,
+            "temperature": 0.7
+        }
+
+    def _cache_key(self, payload: Dict[str, Any]) -> str:
+        return LLMResponseCache.make_key(
+            payload["messages"][-1]["content"], self.model, payload["temperature"], payload["max_tokens"]
+        )
+
+    async def _complete(self, prompt: str, context_type: str = "general") -> str:
+        """Get a completion, answering repeated prompts from the response cache; raises on failure
+
+        Identical prompts already in flight share one upstream call.
+        """
+        payload = self._build_payload(prompt)
+        cache_key = self._cache_key(payload)
+        if self.response_cache:
+            cached = await self._cached_response(cache_key)
+            if cached is not None:
+                return cached
+
+        return await self.single_flight.do(cache_key, lambda: self._fetch_completion(payload, cache_key, context_type))
+
+    async def _call_groq_api(self, prompt: str, context_type: str = "general") -> str:
+        """Make API call to Groq; failures are returned as an error message"""
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an expert data scientist and business intelligence analyst. Provide clear, actionable insights based on data analysis. Use bullet points for lists and be concise but comprehensive."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 1500,
-                "temperature": 0.7
-            }
-
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
-
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            else:
-                return f"API Error: {response.status_code} - {response.text}"
+            return await self._complete(prompt, context_type)
 
+        except LLMAPIError as e:
+            return f"API Error: {e.status_code} - {e.body}"
         except Exception as e:
             return f"Failed to get AI response: {str(e)}"
 
-    def clear_memory(self):
-        """Clear conversation memory"""
-        self.conversation_memory = []
+    @staticmethod
+    def _estimate_tokens(payload: Dict[str, Any]) -> int:
+        return sum(count_tokens(message["content"]) for message in payload["messages"]) + payload["max_tokens"]
+
+    async def _fetch_completion(self, payload: Dict[str, Any], cache_key: str, context_type: str) -> str:
+        # Chart and summary insights are bulk work and yield to interactive chat upstream
+        priority = "batch" if context_type in BATCH_CONTEXT_TYPES else "interactive"
+        async with self.scheduler.slot(priority, self._estimate_tokens(payload)) as slot:
+            result = await self.client.chat_completion(payload)
+            slot.actual_tokens = (result.get("usage") or {}).get("total_tokens")
+        content = result["choices"][0]["message"]["content"].strip()
+        if self.response_cache:
+            await self._cache_response(cache_key, content, context_type)
+        return content
+
+    # The response cache is an optimization: a failing lookup counts as a miss and a failing
+    # write is logged, so neither fails a completion
+    async def _cached_response(self, cache_key: str) -> Optional[str]:
+        try:
+            return await asyncio.to_thread(self.response_cache.get, cache_key)
+        except Exception as e:
+            print(f"LLM cache lookup failed: {e}")
+            return None
 
-    def get_conversation_history(self) -> List[Dict[str, Any]]:
-        """Get conversation history"""
-        return self.conversation_memory.copy()
+    async def _cache_response(self, cache_key: str, content: str, context_type: str) -> None:
+        try:
+            await asyncio.to_thread(self.response_cache.put, cache_key, content, context_type)
+        except Exception as e:
+            print(f"LLM cache write failed: {e}")
+
+    async def aclose(self):
+        """Flush queued chat messages and close the pooled HTTP connections"""
+        if self.memory_store is not None:
+            await self.memory_store.aclose()
+        await self.client.aclose()
+
+    def clear_memory(self, session_id: str):
+        """Drop a session's in-process conversation memory"""
+        if self.memory_store is not None:
+            self.memory_store.forget(session_id)
+
+    def get_conversation_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """Get a session's conversation history"""
+        return self.memory_store.history(session_id) if self.memory_store is not None else []
@@ -5,15 +5,12 @@ import seaborn as sns
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.impute import KNNImputer
 from sklearn.feature_selection import chi2, f_classif
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import plotly.io as pio
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 import os
 import warnings
 
+from backend.utils.sampling_utils import stratified_sample
+
 warnings.filterwarnings('ignore')
 
 
@@ -24,9 +21,15 @@ class AutoEDAPipeline:
         self.charts_dir = "static/charts"
         os.makedirs(self.charts_dir, exist_ok=True)
 
-    async def run_analysis(self, df: pd.DataFrame, task_type: str, target_col: str) -> Tuple[
-        pd.DataFrame, Dict[str, Any]]:
-        """Run comprehensive EDA analysis"""
+    async def run_analysis(self, df: pd.DataFrame, task_type: str, target_col: str,
+                           ingest_report: Optional[Dict[str, Any]] = None,
+                           sample_size: Optional[int] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Run comprehensive EDA analysis
+
+        With sample_size set, imputation is fitted and plots/statistics are computed on a
+        stratified sample of at most sample_size rows; the returned frame still covers
+        every row.
+        """
         report = {
             "original_shape": df.shape,
             "task_type": task_type,
@@ -35,6 +38,8 @@ class AutoEDAPipeline:
 
         # Step 1: Data Quality Assessment
         quality_report = self._assess_data_quality(df)
+        if ingest_report:
+            quality_report["memory_optimization"] = ingest_report
         report["data_quality"] = quality_report
 
         # Step 2: Clean and preprocess
@@ -42,18 +47,31 @@ class AutoEDAPipeline:
         report["cleaned_shape"] = cleaned_df.shape
 
         # Step 3: Feature engineering
-        engineered_df = self._engineer_features(cleaned_df, target_col, task_type)
+        sample_index = None
+        if sample_size and target_col in cleaned_df.columns and len(cleaned_df) > sample_size:
+            sample_index = stratified_sample(cleaned_df, target_col, sample_size, task_type).index
+        engineered_df = self._engineer_features(cleaned_df, target_col, task_type, fit_index=sample_index)
+
+        profile_df = engineered_df
+        if sample_index is not None:
+            profile_df = engineered_df.loc[engineered_df.index.intersection(sample_index)]
+            report["sampling"] = {
+                "enabled": True,
+                "sample_rows": len(profile_df),
+                "total_rows": len(engineered_df),
+                "sample_fraction": round(len(profile_df) / len(engineered_df), 4) if len(engineered_df) else 1.0
+            }
 
         # Step 4: Generate comprehensive visualizations
-        visualizations = await self._generate_visualizations(engineered_df, target_col, task_type)
+        visualizations = await self._generate_visualizations(profile_df, target_col, task_type)
         report["visualizations"] = visualizations
 
         # Step 5: Statistical analysis
-        stats = self._statistical_analysis(engineered_df, target_col, task_type)
+        stats = self._statistical_analysis(profile_df, target_col, task_type)
         report["statistics"] = stats
 
         # Step 6: Feature selection and importance
-        feature_importance = self._analyze_feature_importance(engineered_df, target_col, task_type)
+        feature_importance = self._analyze_feature_importance(profile_df, target_col, task_type)
         report["feature_importance"] = feature_importance
 
         return engineered_df, report
@@ -78,7 +96,7 @@ class AutoEDAPipeline:
             if quality_report["missing_percentage"][col] > 50:
                 issues.append(f"High missing values in {col}: {quality_report['missing_percentage'][col]:.1f}%")
 
-            if df[col].dtype == 'object' and df[col].nunique() == len(df):
+            if df[col].dtype.name in ('object', 'category') and df[col].nunique() == len(df):
                 issues.append(f"Potential ID column: {col}")
 
         quality_report["potential_issues"] = issues
@@ -109,7 +127,8 @@ class AutoEDAPipeline:
 
         return cleaned_df
 
-    def _engineer_features(self, df: pd.DataFrame, target_col: str, task_type: str) -> pd.DataFrame:
+    def _engineer_features(self, df: pd.DataFrame, target_col: str, task_type: str,
+                           fit_index: Optional[pd.Index] = None) -> pd.DataFrame:
         """Advanced feature engineering"""
         if target_col not in df.columns:
             raise ValueError(f"Target column '{target_col}' not found")
@@ -121,7 +140,7 @@ class AutoEDAPipeline:
         X = engineered_df.drop(columns=[target_col])
 
         # Handle missing values using KNN imputation
-        X_imputed = self._knn_impute(X)
+        X_imputed = self._knn_impute(X, fit_index=fit_index)
 
         # Encode categorical variables
         X_encoded = self._encode_categorical(X_imputed)
@@ -130,7 +149,7 @@ class AutoEDAPipeline:
         X_scaled = self._scale_features(X_encoded)
 
         # Encode target if classification
-        if task_type == "classification" and y.dtype == 'object':
+        if task_type == "classification" and y.dtype.name in ('object', 'category'):
             y_encoded = LabelEncoder().fit_transform(y)
             y = pd.Series(y_encoded, index=y.index, name=target_col)
 
@@ -142,10 +161,10 @@ class AutoEDAPipeline:
 
         return final_df.dropna()
 
-    def _knn_impute(self, df: pd.DataFrame, n_neighbors: int = 5) -> pd.DataFrame:
-        """KNN imputation for missing values"""
+    def _knn_impute(self, df: pd.DataFrame, n_neighbors: int = 5, fit_index: Optional[pd.Index] = None) -> pd.DataFrame:
+        """KNN imputation for missing values (neighbours drawn from fit_index rows when given)"""
         # Encode categorical for imputation
-        cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+        cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
         df_temp = df.copy()
 
         encoders = {}
@@ -156,8 +175,9 @@ class AutoEDAPipeline:
 
         # Impute
         imputer = KNNImputer(n_neighbors=n_neighbors)
+        imputer.fit(df_temp.loc[fit_index] if fit_index is not None else df_temp)
         df_imputed = pd.DataFrame(
-            imputer.fit_transform(df_temp),
+            imputer.transform(df_temp),
             columns=df_temp.columns,
             index=df_temp.index
         )
@@ -173,7 +193,7 @@ class AutoEDAPipeline:
         """Enhanced categorical encoding"""
         encoded_df = df.copy()
 
-        for col in df.select_dtypes(include=['object']).columns:
+        for col in df.select_dtypes(include=['object', 'category']).columns:
             if df[col].nunique() <= 10:
                 # One-hot encoding for low cardinality
                 dummies = pd.get_dummies(df[col], prefix=col, drop_first=True)
@@ -2,7 +2,8 @@ import pandas as pd
 import numpy as np
 import pickle
 import os
-from typing import Dict, Any, Tuple
+import uuid
+from typing import Dict, Any, Tuple, Optional
 from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -28,8 +29,11 @@ from imblearn.over_sampling import SMOTE, RandomOverSampler
 from imblearn.under_sampling import RandomUnderSampler
 from xgboost import XGBClassifier, XGBRegressor
 import lightgbm as lgb
+from sklearn.base import clone
 import warnings
 
+from backend.utils.sampling_utils import stratified_sample, bootstrap_ci
+
 warnings.filterwarnings('ignore')
 
 
@@ -121,8 +125,15 @@ class EnhancedMLPipeline:
             }
         }
         print("Yha ykk")
-    async def train_and_evaluate(self, df: pd.DataFrame, task_type: str, target_col: str) -> Dict[str, Any]:
-        """Enhanced training and evaluation pipeline"""
+    async def train_and_evaluate(self, df: pd.DataFrame, task_type: str, target_col: str,
+                                 sample_size: Optional[int] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Enhanced training and evaluation pipeline
+
+        With sample_size set and a larger training set, hyperparameter search and model
+        selection run on stratified samples; only the winning configuration is refitted
+        on the full training data. With session_id, the best model is saved as
+        model_<session_id>.pkl.
+        """
         if target_col not in df.columns:
             raise ValueError(f"Target column '{target_col}' not found")
 
@@ -135,6 +146,10 @@ class EnhancedMLPipeline:
             X, y, test_size=0.2, random_state=42, stratify=y if task_type == "classification" else None
         )
 
+        if sample_size and len(X_train) > sample_size:
+            return await self._train_and_evaluate_sampled(X_train, X_test, y_train, y_test, task_type,
+                                                          target_col, sample_size, df.shape, session_id)
+
         # Handle class imbalance for classification
         if task_type == "classification":
             X_train, y_train = self._handle_imbalance(X_train, y_train)
@@ -147,10 +162,85 @@ class EnhancedMLPipeline:
         results.update(ensemble_results)
 
         # Generate comprehensive report
-        report = self._generate_comprehensive_report(results, task_type, df.shape)
+        report = self._generate_comprehensive_report(results, task_type, df.shape, session_id=session_id)
 
         return report
 
+    async def _train_and_evaluate_sampled(self, X_train, X_test, y_train, y_test, task_type: str, target_col: str,
+                                          sample_size: int, dataset_shape: Tuple,
+                                          session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Select a model on stratified samples, then refit the winner on the full training data"""
+        train_idx = stratified_sample(y_train.to_frame(name=target_col), target_col, sample_size, task_type).index
+        test_idx = stratified_sample(y_test.to_frame(name=target_col), target_col,
+                                     max(sample_size // 4, 1), task_type).index
+        Xs_train, ys_train = X_train.loc[train_idx], y_train.loc[train_idx]
+        Xs_test, ys_test = X_test.loc[test_idx], y_test.loc[test_idx]
+
+        if task_type == "classification":
+            Xs_train, ys_train = self._handle_imbalance(Xs_train, ys_train)
+
+        results = await self._train_models(Xs_train, Xs_test, ys_train, ys_test, task_type)
+        results.update(await self._create_ensemble(Xs_train, Xs_test, ys_train, ys_test, task_type, results))
+
+        for data in results.values():
+            if "model" in data and "metrics" in data:
+                data["evaluated_on"] = "sample"
+                data["confidence_intervals"] = self._metric_intervals(ys_test, data["model"].predict(Xs_test), task_type)
+
+        # Refit only the winning configuration on all training rows
+        primary_metric = "f1_macro" if task_type == "classification" else "r2_score"
+        winner = max([name for name, data in results.items() if "metrics" in data],
+                     key=lambda name: results[name]["metrics"][primary_metric])
+        sample_metrics = results[winner]["metrics"]
+        train_rows = len(X_train)
+
+        if task_type == "classification":
+            X_train, y_train = self._handle_imbalance(X_train, y_train)
+        full_model = clone(results[winner]["model"])
+        full_model.fit(X_train, y_train)
+        y_pred = full_model.predict(X_test)
+
+        if task_type == "classification":
+            metrics = self._calculate_classification_metrics(y_test, y_pred, full_model, X_test)
+        else:
+            metrics = self._calculate_regression_metrics(y_test, y_pred)
+
+        results[winner].update({
+            "model": full_model,
+            "metrics": metrics,
+            "plot_path": await self._generate_model_plots(y_test, y_pred, winner, task_type),
+            "evaluated_on": "full",
+            "confidence_intervals": self._metric_intervals(y_test, y_pred, task_type)
+        })
+
+        report = self._generate_comprehensive_report(results, task_type, dataset_shape, best_model_name=winner,
+                                                     session_id=session_id)
+        report["sampling"] = {
+            "enabled": True,
+            "train_sample_rows": len(train_idx),
+            "test_sample_rows": len(test_idx),
+            "train_rows": train_rows,
+            "sample_fraction": round(len(train_idx) / train_rows, 4),
+            "selected_model": winner,
+            "selection_metrics": sample_metrics,
+            "refit_on_full_data": True
+        }
+        return report
+
+    def _metric_intervals(self, y_true, y_pred, task_type: str) -> Dict[str, Any]:
+        """95% bootstrap confidence intervals for the headline metrics"""
+        if task_type == "classification":
+            metric_fns = {
+                "accuracy": accuracy_score,
+                "f1_macro": lambda t, p: f1_score(t, p, average='macro')
+            }
+        else:
+            metric_fns = {
+                "r2_score": r2_score,
+                "mae": mean_absolute_error
+            }
+        return {name: bootstrap_ci(y_true, y_pred, fn) for name, fn in metric_fns.items()}
+
     def _handle_imbalance(self, X_train: pd.DataFrame, y_train: pd.Series) -> Tuple[pd.DataFrame, pd.Series]:
         """Handle class imbalance using SMOTE or other techniques"""
         class_counts = y_train.value_counts()
@@ -350,26 +440,25 @@ class EnhancedMLPipeline:
             print(f"Ensemble creation failed: {e}")
             return {}
 
-    def _generate_comprehensive_report(self, results: Dict[str, Any], task_type: str, dataset_shape: Tuple) -> Dict[
-        str, Any]:
+    def _generate_comprehensive_report(self, results: Dict[str, Any], task_type: str, dataset_shape: Tuple,
+                                       best_model_name: Optional[str] = None,
+                                       session_id: Optional[str] = None) -> Dict[str, Any]:
         """Generate comprehensive ML report"""
         # Find best model
-        if task_type == "classification":
-            best_model_name = max(
-                [name for name, data in results.items() if "metrics" in data],
-                key=lambda x: results[x]["metrics"]["f1_macro"]
-            )
-            primary_metric = "f1_macro"
-        else:
+        primary_metric = "f1_macro" if task_type == "classification" else "r2_score"
+        if best_model_name is None:
             best_model_name = max(
                 [name for name, data in results.items() if "metrics" in data],
-                key=lambda x: results[x]["metrics"]["r2_score"]
+                key=lambda x: results[x]["metrics"][primary_metric]
             )
-            primary_metric = "r2_score"
 
-        # Save best model
+        # Save best model; a timestamp alone is shared by runs finishing in the same second,
+        # and retention would then delete one session's model along with the other's
         best_model = results[best_model_name]["model"]
-        model_path = f"{self.models_dir}/best_model_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pkl"
+        if session_id:
+            model_path = f"{self.models_dir}/model_{session_id}.pkl"
+        else:
+            model_path = f"{self.models_dir}/best_model_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.pkl"
         with open(model_path, 'wb') as f:
             pickle.dump(best_model, f)
 
@@ -381,6 +470,9 @@ class EnhancedMLPipeline:
                 row.update(data["metrics"])
                 if "plot_path" in data:
                     row["Visualization"] = data["plot_path"]
+                if "confidence_intervals" in data:
+                    row["evaluated_on"] = data["evaluated_on"]
+                    row["confidence_intervals"] = data["confidence_intervals"]
                 comparison_table.append(row)
 
         # Feature importance (for tree-based models)
@@ -398,6 +490,7 @@ class EnhancedMLPipeline:
                 "name": best_model_name,
                 "metrics": results[best_model_name]["metrics"],
                 "primary_score": results[best_model_name]["metrics"][primary_metric],
+                "confidence_intervals": results[best_model_name].get("confidence_intervals"),
                 "model_path": model_path
             },
             "comparison_table": comparison_table,
@@ -1,11 +1,5 @@
 import cv2
 import numpy as np
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras.applications import ResNet50
-from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout
-from tensorflow.keras.models import Model
-import pytesseract
 from typing import Tuple, List, Dict, Any
 import os
 import pickle
@@ -24,6 +18,12 @@ class CNNChartClassifier:
     def _build_model(self):
         """Build CNN model with transfer learning"""
         try:
+            # TensorFlow takes seconds to import; only pay for it when a classifier is built
+            from tensorflow import keras
+            from tensorflow.keras.applications import ResNet50
+            from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout
+            from tensorflow.keras.models import Model
+
             # Try to load pre-trained model
             if os.path.exists('models/chart_classifier.h5'):
                 self.model = keras.models.load_model('models/chart_classifier.h5')
@@ -211,6 +211,8 @@ class EnhancedImageProcessor:
 
     def _extract_text_ocr(self, image: np.ndarray) -> List[str]:
         """Extract text using OCR"""
+        import pytesseract
+
         # Preprocess image for better OCR
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
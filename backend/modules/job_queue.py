@@ -0,0 +1,180 @@
+# backend/modules/job_queue.py
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+from sqlalchemy import or_
+
+from backend.modules.analysis_worker import mark_job_running, run_job
+from backend.modules.database import AnalysisSession
+
+# Each server process refreshes heartbeat_at on the jobs it owns; a queued/running job whose
+# heartbeat is older than the timeout belongs to a process that is gone
+JOB_HEARTBEAT_INTERVAL = float(os.getenv('JOB_HEARTBEAT_INTERVAL', '30'))
+JOB_HEARTBEAT_TIMEOUT = float(os.getenv('JOB_HEARTBEAT_TIMEOUT', '120'))
+
+
+class JobQueueFullError(Exception):
+    """Raised when the analysis queue already holds its maximum number of jobs"""
+
+
+class AnalysisJobQueue:
+    """Bounded process-pool queue for CPU-bound analysis jobs, tracked on AnalysisSession rows
+
+    Every server process (e.g. each uvicorn worker) has its own queue, identified by owner.
+    Jobs are stamped with the owner that runs them and kept alive by its heartbeats, so
+    recovery only touches jobs whose owner is gone.
+    """
+
+    def __init__(self, session_factory, database_url: str, max_workers: int = 2, max_pending: int = 16):
+        self.session_factory = session_factory
+        self.database_url = database_url
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._session_ids: Dict[str, str] = {}  # job_id -> session_id of the jobs in _tasks
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Spawn instead of fork: the server process may already hold TensorFlow
+        # threads, which do not survive a fork.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def is_full(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def ownership(self) -> Dict[str, Any]:
+        """Columns for a new job row, so other processes see a live owner from the start"""
+        return {"job_owner": self.owner, "heartbeat_at": datetime.utcnow()}
+
+    def submit(self, job_id: str, session_id: str, job_fn: Callable[..., Dict[str, Any]], *args,
+               on_complete: Optional[Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]] = None) -> str:
+        """Schedule job_fn(*args) on the pool; on_complete maps its result to session columns"""
+        if self.is_full():
+            raise JobQueueFullError(f"Analysis queue is full ({self.max_pending} jobs pending)")
+
+        task = asyncio.create_task(self._run(session_id, job_fn, args, on_complete))
+        self._tasks[job_id] = task
+        self._session_ids[job_id] = session_id
+        task.add_done_callback(lambda _: self._forget(job_id))
+        return job_id
+
+    def _forget(self, job_id: str) -> None:
+        self._tasks.pop(job_id, None)
+        self._session_ids.pop(job_id, None)
+
+    async def _run(self, session_id: str, job_fn, args, on_complete) -> None:
+        # The session stays queued until a worker picks the job up; run_job marks it running
+        # through mark_job_running, so workers never import the models (or run migrations).
+        # Status updates are sync SQLAlchemy commits, so they run off the event loop
+        try:
+            loop = asyncio.get_running_loop()
+            on_start = partial(mark_job_running, self.database_url, session_id)
+            result = await loop.run_in_executor(self.executor, partial(run_job, on_start, job_fn, *args))
+            fields = await on_complete(session_id, result) if on_complete else {}
+            await asyncio.to_thread(self._update_session, session_id, status="completed",
+                                    completed_at=datetime.utcnow(), **fields)
+        except Exception as e:
+            print(f"Analysis job for session {session_id} failed: {e}")
+            await asyncio.to_thread(self._update_session, session_id, status="failed", error=str(e),
+                                    completed_at=datetime.utcnow())
+
+    def _update_session(self, session_id: str, **fields) -> None:
+        db = self.session_factory()
+        try:
+            session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+            if session:
+                for key, value in fields.items():
+                    setattr(session, key, value)
+                db.commit()
+        finally:
+            db.close()
+
+    def heartbeat(self) -> int:
+        """Refresh heartbeat_at on the unfinished jobs this process is running
+
+        Only jobs with a live task count, so a row whose job never got submitted goes
+        stale and is failed like any other orphan.
+        """
+        session_ids = list(self._session_ids.values())
+        if not session_ids:
+            return 0
+        db = self.session_factory()
+        try:
+            count = db.query(AnalysisSession).filter(
+                AnalysisSession.id.in_(session_ids),
+                AnalysisSession.job_owner == self.owner,
+                AnalysisSession.status.in_(["queued", "running"])
+            ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def fail_interrupted_jobs(self) -> int:
+        """Mark queued/running jobs whose heartbeat went stale as failed
+
+        Jobs of live processes, including other workers of this server, keep a fresh
+        heartbeat and are left alone. Rows from before job owners were recorded have no
+        heartbeat and count as orphaned.
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=JOB_HEARTBEAT_TIMEOUT)
+        db = self.session_factory()
+        try:
+            count = db.query(AnalysisSession).filter(
+                AnalysisSession.status.in_(["queued", "running"]),
+                or_(AnalysisSession.heartbeat_at.is_(None), AnalysisSession.heartbeat_at < stale_before)
+            ).update(
+                {"status": "failed", "error": "Interrupted: the server process running it stopped",
+                 "completed_at": datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Start the heartbeat loop, which also fails jobs orphaned by other processes"""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_forever())
+
+    async def _heartbeat_forever(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.heartbeat)
+                interrupted = await asyncio.to_thread(self.fail_interrupted_jobs)
+                if interrupted:
+                    print(f"Marked {interrupted} interrupted analysis job(s) as failed")
+            except Exception as e:
+                print(f"Job heartbeat failed: {e}")
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+
+    def shutdown(self) -> None:
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,194 @@
+# backend/modules/llm_cache.py
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.modules.database import LLMCacheEntry
+
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', '512'))
+LLM_CACHE_DB_ENTRIES = int(os.getenv('LLM_CACHE_DB_ENTRIES', '10000'))
+# Per-context TTL overrides in seconds, e.g. "general=600,chart_insights=86400"
+LLM_CACHE_TTL = os.getenv('LLM_CACHE_TTL', '')
+
+DEFAULT_TTL_SECONDS = {
+    "chart_insights": 7 * 24 * 3600,     # depends only on the extracted chart data
+    "summary_insights": 7 * 24 * 3600,
+    "chart_analysis": 24 * 3600,
+    "eda_analysis": 24 * 3600,
+    "model_performance": 24 * 3600,
+    "general": 3600,
+}
+PRUNE_EVERY_STORES = 100
+
+
+def _insert(db: Session):
+    """Dialect insert() with ON CONFLICT support (SQLite and PostgreSQL)"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(LLMCacheEntry)
+
+
+def _parse_ttl_overrides(raw: str) -> Dict[str, int]:
+    overrides = {}
+    for item in raw.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            overrides[name.strip()] = int(seconds)
+    return overrides
+
+
+class LLMResponseCache:
+    """Two-tier cache of LLM completions: in-process LRU in front of the llm_cache table
+
+    Keys hash the model, sampling parameters and the whitespace-normalized prompt, so a
+    re-uploaded report or a repeated question maps to the same entry. Each context type
+    has its own TTL. The SQLite tier survives restarts and is shared by every worker
+    process, so its writes are single upserts/conditional updates rather than
+    read-then-write; it is pruned to its size limit every PRUNE_EVERY_STORES writes.
+    Stats and the memory tier are only touched under the lock.
+    """
+
+    def __init__(self, session_factory: Callable, memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+                 db_entries: int = LLM_CACHE_DB_ENTRIES, ttl_seconds: Optional[Dict[str, int]] = None):
+        self.session_factory = session_factory
+        self.memory_entries = memory_entries
+        self.db_entries = db_entries
+        self.ttl_seconds = {**DEFAULT_TTL_SECONDS, **_parse_ttl_overrides(LLM_CACHE_TTL), **(ttl_seconds or {})}
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stores_since_prune = 0
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    @staticmethod
+    def make_key(prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+        normalized = re.sub(r"\s+", " ", prompt).strip()
+        raw = "|".join([model or "", f"{temperature:.3f}", str(max_tokens), normalized])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, context_type: str) -> int:
+        return self.ttl_seconds.get(context_type, self.ttl_seconds["general"])
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def _remember_in_memory(self, key: str, response: str, expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (response, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, checking memory first and then SQLite"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[0]
+                del self._memory[key]
+                self.stats["expired"] += 1
+
+        db = self.session_factory()
+        try:
+            row = db.query(LLMCacheEntry.response, LLMCacheEntry.expires_at).filter(LLMCacheEntry.key == key).first()
+            if row is None:
+                self._count(misses=1)
+                return None
+            now = datetime.utcnow()
+            entries = db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key)
+            if row.expires_at <= now:
+                # Conditional delete: another worker may have refreshed or removed the row
+                entries.filter(LLMCacheEntry.expires_at <= now).delete(synchronize_session=False)
+                db.commit()
+                self._count(expired=1, misses=1)
+                return None
+
+            entries.update({LLMCacheEntry.hits: func.coalesce(LLMCacheEntry.hits, 0) + 1,
+                            LLMCacheEntry.last_accessed: now}, synchronize_session=False)
+            db.commit()
+            remaining = (row.expires_at - now).total_seconds()
+        finally:
+            db.close()
+
+        self._remember_in_memory(key, row.response, time.time() + remaining)
+        self._count(db_hits=1)
+        return row.response
+
+    def put(self, key: str, response: str, context_type: str = "general") -> None:
+        ttl = self.ttl_for(context_type)
+        self._remember_in_memory(key, response, time.time() + ttl)
+
+        now = datetime.utcnow()
+        values = {"context_type": context_type, "response": response, "created_at": now,
+                  "expires_at": now + timedelta(seconds=ttl), "last_accessed": now, "hits": 0}
+        db = self.session_factory()
+        try:
+            # One statement, so workers storing the same prompt cannot collide on the key
+            db.execute(_insert(db).values(key=key, **values).on_conflict_do_update(
+                index_elements=[LLMCacheEntry.key], set_=values
+            ))
+            db.commit()
+
+            with self._lock:
+                self.stats["stores"] += 1
+                self._stores_since_prune += 1
+                prune = self._stores_since_prune >= PRUNE_EVERY_STORES
+                if prune:
+                    self._stores_since_prune = 0
+            if prune:
+                self._prune(db)
+        finally:
+            db.close()
+
+    def _prune(self, db) -> None:
+        """Drop expired rows, then the least recently used rows beyond db_entries"""
+        expired = db.query(LLMCacheEntry).filter(LLMCacheEntry.expires_at <= datetime.utcnow()).delete()
+        overflow = db.query(LLMCacheEntry).count() - self.db_entries
+        evicted = 0
+        if overflow > 0:
+            stale_keys = [
+                row.key for row in db.query(LLMCacheEntry.key)
+                .order_by(LLMCacheEntry.last_accessed.asc()).limit(overflow)
+            ]
+            evicted = db.query(LLMCacheEntry).filter(LLMCacheEntry.key.in_(stale_keys)).delete(synchronize_session=False)
+        db.commit()
+        self._count(expired=expired, evictions=evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        db = self.session_factory()
+        try:
+            db.query(LLMCacheEntry).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            memory_entries = len(self._memory)
+        hits = stats["memory_hits"] + stats["db_hits"]
+        lookups = hits + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,285 @@
+# backend/modules/llm_client.py
+
+import asyncio
+import json
+import os
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, Optional
+
+import httpx
+
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', '20'))
+LLM_MAX_KEEPALIVE = int(os.getenv('LLM_MAX_KEEPALIVE', '10'))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '30'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', '0.5'))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', '8'))
+LLM_BREAKER_THRESHOLD = int(os.getenv('LLM_BREAKER_THRESHOLD', '5'))
+LLM_BREAKER_RESET = float(os.getenv('LLM_BREAKER_RESET', '30'))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMAPIError(Exception):
+    """Non-success response from the chat-completions endpoint"""
+
+    def __init__(self, status_code: int, body: str):
+        self.status_code = status_code
+        self.body = body
+        super().__init__(f"{status_code} - {body}")
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_THRESHOLD, reset_timeout: float = LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Let another call probe; called once the probe call ends, however it ends"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight task
+
+    The first caller for a key starts the task; callers arriving while it runs await the
+    same task and get its result or exception. Waiters are shielded, so one of them being
+    cancelled does not cancel the call for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self.stats["leaders"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "in_flight": len(self._in_flight),
+            "coalesce_rate": round(self.stats["coalesced"] / calls, 4) if calls else 0.0,
+        }
+
+
+class LLMClient:
+    """Shared async client for an OpenAI-style chat-completions endpoint
+
+    One keep-alive connection pool per process, a semaphore capping in-flight requests,
+    retries with full-jitter exponential backoff on 429/5xx and transport errors, and a
+    circuit breaker that fails fast while upstream keeps failing.
+    """
+
+    def __init__(self, api_url: str, api_key: str, max_connections: int = LLM_MAX_CONNECTIONS,
+                 max_keepalive: int = LLM_MAX_KEEPALIVE, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 timeout: float = LLM_TIMEOUT, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE, backoff_max: float = LLM_BACKOFF_MAX):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "rejected_open_circuit": 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _admit(self) -> bool:
+        """Check the breaker before a call; returns whether the call is the half-open probe"""
+        probe = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            self.stats["rejected_open_circuit"] += 1
+            raise CircuitOpenError("LLM upstream is unavailable (circuit open)")
+        return probe
+
+    def _record_unexpected(self, call: Dict[str, bool]) -> None:
+        # Errors the retry loop did not classify (e.g. a malformed body) count as failures.
+        # The flag is per call: the shared failure counter also moves with other calls' errors
+        if not call["recorded_failure"]:
+            self._record_failure(call)
+
+    async def chat_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST payload and return the decoded JSON body, retrying transient failures"""
+        probe = self._admit()
+        call = {"recorded_failure": False}
+        try:
+            return await self._chat_completion(payload, call)
+        except LLMAPIError:
+            raise
+        except Exception:
+            self._record_unexpected(call)
+            raise
+        finally:
+            if probe:
+                self.breaker.release_probe()
+
+    async def _chat_completion(self, payload: Dict[str, Any], call: Dict[str, bool]) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    self.stats["requests"] += 1
+                    response = await self.client.post(self.api_url, headers=self._headers(), json=payload)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    self._record_failure(call)
+                    raise
+            else:
+                if response.status_code == 200:
+                    body = response.json()
+                    self.breaker.record_success()
+                    return body
+                if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    # 429 means upstream is alive but throttling us; it does not trip the breaker
+                    if response.status_code >= 500:
+                        self._record_failure(call)
+                    else:
+                        self.breaker.record_success()
+                    raise LLMAPIError(response.status_code, response.text)
+
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt, response))
+
+    async def stream_chat_completion(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream a completion (server-sent events) and yield the content deltas
+
+        Retries only happen before the first delta is yielded; a stream that breaks
+        midway raises, since the caller has already forwarded part of the answer.
+        """
+        probe = self._admit()
+        call = {"recorded_failure": False}
+        try:
+            async for delta in self._stream_chat_completion(payload, call):
+                yield delta
+        except LLMAPIError:
+            raise
+        except Exception:
+            self._record_unexpected(call)
+            raise
+        finally:
+            if probe:
+                self.breaker.release_probe()
+
+    async def _stream_chat_completion(self, payload: Dict[str, Any], call: Dict[str, bool]) -> AsyncIterator[str]:
+        payload = {**payload, "stream": True}
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    self.stats["requests"] += 1
+                    async with self.client.stream("POST", self.api_url, headers=self._headers(), json=payload) as response:
+                        if response.status_code == 200:
+                            self.breaker.record_success()
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[len("data:"):].strip()
+                                if data == "[DONE]":
+                                    break
+                                choices = json.loads(data).get("choices") or [{}]
+                                delta = (choices[0].get("delta") or {}).get("content")
+                                if delta:
+                                    yield delta
+                            return
+                        await response.aread()
+            except httpx.TransportError:
+                if response is not None and response.status_code == 200:
+                    self._record_failure(call)
+                    raise
+                if attempt == self.max_retries:
+                    self._record_failure(call)
+                    raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    if response.status_code >= 500:
+                        self._record_failure(call)
+                    else:
+                        self.breaker.record_success()
+                    raise LLMAPIError(response.status_code, response.text)
+
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt, response))
+
+    def _record_failure(self, call: Dict[str, bool]) -> None:
+        call["recorded_failure"] = True
+        self.stats["failures"] += 1
+        self.breaker.record_failure()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "circuit_state": self.breaker.state, "consecutive_failures": self.breaker.failures}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
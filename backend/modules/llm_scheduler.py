@@ -0,0 +1,155 @@
+# backend/modules/llm_scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Any, List, Optional, Tuple
+
+LLM_SCHEDULER_CONCURRENCY = int(os.getenv('LLM_SCHEDULER_CONCURRENCY', os.getenv('LLM_MAX_CONCURRENCY', '8')))
+# Per-class caps, e.g. "interactive=8,batch=4"; batch stays below the total so chat always has room
+LLM_SCHEDULER_CAPS = os.getenv('LLM_SCHEDULER_CAPS', 'interactive=8,batch=4')
+# Upstream tokens-per-minute budget (prompt + completion); 0 disables the limit
+LLM_TPM_BUDGET = int(os.getenv('LLM_TPM_BUDGET', '0'))
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+TPM_WINDOW_SECONDS = 60.0
+
+
+def _parse_caps(raw: str) -> Dict[str, int]:
+    caps = {}
+    for item in raw.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            caps[name.strip()] = int(value)
+    return caps
+
+
+class _Slot:
+    def __init__(self, priority: str, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.actual_tokens: Optional[int] = None  # set by the caller once usage is known
+        self.usage_entry: Optional[List] = None
+
+
+class LLMScheduler:
+    """Admission control for upstream LLM calls by priority class
+
+    Waiters are granted strictly by priority, then arrival order, subject to the total
+    concurrency, their class cap and a sliding one-minute token budget. A waiter held back
+    only by its class cap does not block lower classes, so batch work fills whatever
+    interactive traffic leaves idle; a waiter held back by the token budget does, so batch
+    work cannot keep spending the budget ahead of a waiting chat message.
+    """
+
+    def __init__(self, concurrency: int = LLM_SCHEDULER_CONCURRENCY, caps: Optional[Dict[str, int]] = None,
+                 tpm_budget: int = LLM_TPM_BUDGET):
+        self.concurrency = concurrency
+        self.caps = {name: concurrency for name in PRIORITIES}
+        self.caps.update(_parse_caps(LLM_SCHEDULER_CAPS) if caps is None else caps)
+        self.tpm_budget = tpm_budget
+        self._waiters: List[Tuple[int, int, asyncio.Future, _Slot, float]] = []
+        self._sequence = itertools.count()
+        self._running = {name: 0 for name in PRIORITIES}
+        self._usage: Deque[List] = deque()  # [granted_at, tokens]
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+        self._waits = {name: deque(maxlen=1000) for name in PRIORITIES}
+        self.stats = {name: {"granted": 0, "completed": 0} for name in PRIORITIES}
+
+    def _tokens_used(self, now: float) -> int:
+        while self._usage and now - self._usage[0][0] >= TPM_WINDOW_SECONDS:
+            self._usage.popleft()
+        return sum(tokens for _, tokens in self._usage)
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        held_back = []
+        while self._waiters and sum(self._running.values()) < self.concurrency:
+            entry = heapq.heappop(self._waiters)
+            _, _, future, slot, enqueued = entry
+            if future.done():  # cancelled while waiting
+                continue
+            if self._running[slot.priority] >= self.caps.get(slot.priority, self.concurrency):
+                held_back.append(entry)
+                continue
+            if self.tpm_budget and self._usage and self._tokens_used(now) + slot.tokens > self.tpm_budget:
+                held_back.append(entry)
+                self._schedule_wake(now)
+                break
+
+            self._running[slot.priority] += 1
+            slot.usage_entry = [now, slot.tokens]
+            self._usage.append(slot.usage_entry)
+            self._waits[slot.priority].append(now - enqueued)
+            self.stats[slot.priority]["granted"] += 1
+            future.set_result(None)
+
+        for entry in held_back:
+            heapq.heappush(self._waiters, entry)
+
+    def _schedule_wake(self, now: float) -> None:
+        if self._wake_handle is None and self._usage:
+            delay = max(0.0, TPM_WINDOW_SECONDS - (now - self._usage[0][0])) + 0.01
+            self._wake_handle = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    def _wake(self) -> None:
+        self._wake_handle = None
+        self._dispatch()
+
+    def _release(self, slot: _Slot) -> None:
+        self._running[slot.priority] -= 1
+        self.stats[slot.priority]["completed"] += 1
+        if slot.actual_tokens is not None and slot.usage_entry is not None:
+            # Swap the estimate booked at grant time for the real usage
+            slot.usage_entry[1] = slot.actual_tokens
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "interactive", tokens: int = 0):
+        """Wait for an upstream slot for a call estimated at tokens, and hold it for the block"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority class '{priority}'")
+
+        slot = _Slot(priority, tokens)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (PRIORITIES[priority], next(self._sequence), future, slot, time.monotonic()))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(slot)
+            raise
+
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    def get_stats(self) -> Dict[str, Any]:
+        queued = {name: 0 for name in PRIORITIES}
+        for _, _, future, slot, _ in self._waiters:
+            if not future.done():
+                queued[slot.priority] += 1
+
+        classes = {}
+        for name in PRIORITIES:
+            waits = sorted(self._waits[name])
+            classes[name] = {
+                **self.stats[name],
+                "queued": queued[name],
+                "running": self._running[name],
+                "cap": self.caps.get(name),
+                "avg_wait_seconds": round(sum(waits) / len(waits), 4) if waits else 0.0,
+                "p95_wait_seconds": round(waits[int(0.95 * (len(waits) - 1))], 4) if waits else 0.0,
+            }
+        return {
+            "concurrency": self.concurrency,
+            "tpm_budget": self.tpm_budget,
+            "tokens_last_minute": self._tokens_used(time.monotonic()),
+            "classes": classes,
+        }
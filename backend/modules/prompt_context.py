@@ -0,0 +1,194 @@
+# backend/modules/prompt_context.py
+
+import json
+import math
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '3000'))
+PROMPT_MIN_CONTEXT_TOKENS = int(os.getenv('PROMPT_MIN_CONTEXT_TOKENS', '300'))
+PROMPT_TOP_FEATURES = int(os.getenv('PROMPT_TOP_FEATURES', '10'))
+
+# Section order per context type, most important first
+SECTION_PRIORITY = {
+    "eda_analysis": ["overview", "issues", "top_features", "target", "column_statistics", "best_model", "model_comparison"],
+    "model_performance": ["overview", "best_model", "model_comparison", "top_features", "issues", "target", "column_statistics"],
+    "general": ["overview", "best_model", "top_features", "issues", "target", "model_comparison", "column_statistics"],
+}
+
+
+@lru_cache(maxsize=1)
+def _tokenizer() -> Optional[Callable[[str], List[int]]]:
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base").encode
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise the ~4 characters per token estimate"""
+    encode = _tokenizer()
+    if encode is not None:
+        return len(encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _num(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def _results(context: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    results = context.get("results") or {}
+    eda = results.get("eda") or {}
+    ml = results.get("ml") or {}
+    dataset_info = results.get("dataset_info") or context.get("dataset_info") or {}
+    # Callers may also pass the pieces directly instead of a stored session
+    if "statistics" in context:
+        eda = {**eda, "statistics": context["statistics"]}
+    if "best_model" in context or "comparison_table" in context:
+        ml = {**ml, **{key: context[key] for key in ("best_model", "comparison_table") if key in context}}
+    return dataset_info, eda, ml
+
+
+def _overview(context, dataset_info, eda, ml) -> List[str]:
+    lines = [f"task: {context.get('task_type') or eda.get('task_type', 'unknown')}",
+             f"target: {context.get('target_column') or eda.get('target_column', 'unknown')}"]
+    for key in ("filename", "shape"):
+        if dataset_info.get(key) is not None:
+            lines.append(f"{key}: {dataset_info[key]}")
+    if eda.get("cleaned_shape"):
+        lines.append(f"cleaned shape: {eda['cleaned_shape']}")
+    if (eda.get("sampling") or {}).get("enabled"):
+        lines.append(f"profiled on a sample of {eda['sampling']['sample_rows']} rows")
+    return lines
+
+
+def _best_model(context, dataset_info, eda, ml) -> List[str]:
+    best = ml.get("best_model") or {}
+    if not best:
+        return []
+    lines = [f"name: {best.get('name')}", f"primary score: {_num(best.get('primary_score'))}"]
+    lines += [f"{name}: {_num(value)}" for name, value in (best.get("metrics") or {}).items()]
+    for name, interval in (best.get("confidence_intervals") or {}).items():
+        if interval:
+            lines.append(f"{name} 95% CI: [{_num(interval.get('lower'))}, {_num(interval.get('upper'))}]")
+    return lines
+
+
+def _top_features(context, dataset_info, eda, ml) -> List[str]:
+    scored = [(name, info.get("score") or 0.0, info.get("p_value")) for name, info in
+              (eda.get("feature_importance") or {}).items() if isinstance(info, dict)]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    lines = [f"{name}: score={_num(score)}, p={_num(p)}" for name, score, p in scored[:PROMPT_TOP_FEATURES]]
+
+    model_importance = sorted((ml.get("feature_importance") or {}).items(), key=lambda item: item[1], reverse=True)
+    lines += [f"model importance {name}: {_num(value)}" for name, value in model_importance[:PROMPT_TOP_FEATURES]]
+    return lines
+
+
+def _issues(context, dataset_info, eda, ml) -> List[str]:
+    quality = eda.get("data_quality") or {}
+    lines = []
+
+    balance = ((eda.get("statistics") or {}).get("target") or {}).get("class_balance") or {}
+    if balance and min(balance.values()) < 0.1:
+        rare = min(balance, key=balance.get)
+        lines.append(f"class imbalance: class {rare} is {_num(balance[rare] * 100)}% of rows")
+
+    failed = (ml.get("training_summary") or {}).get("failed_models")
+    if failed:
+        lines.append(f"models that failed to train: {failed}")
+    if quality.get("duplicate_rows"):
+        lines.append(f"duplicate rows: {quality['duplicate_rows']}")
+
+    missing = sorted(((col, pct) for col, pct in (quality.get("missing_percentage") or {}).items() if pct),
+                     key=lambda item: item[1], reverse=True)
+    if len(missing) > PROMPT_TOP_FEATURES:
+        lines.append(f"{len(missing)} columns have missing values; the worst are listed")
+    lines += [f"missing values in {col}: {_num(pct)}%" for col, pct in missing[:PROMPT_TOP_FEATURES]]
+    return lines
+
+
+def _target(context, dataset_info, eda, ml) -> List[str]:
+    target = (eda.get("statistics") or {}).get("target") or {}
+    return [f"{key}: {json.dumps(value, default=str) if isinstance(value, dict) else _num(value)}"
+            for key, value in target.items()]
+
+
+def _model_comparison(context, dataset_info, eda, ml) -> List[str]:
+    rows = ml.get("comparison_table") or []
+    lines = []
+    for row in rows:
+        metrics = ", ".join(f"{key}={_num(value)}" for key, value in row.items()
+                            if key not in ("Model", "Visualization", "confidence_intervals", "evaluated_on"))
+        lines.append(f"{row.get('Model')}: {metrics}")
+    return lines
+
+
+def _column_statistics(context, dataset_info, eda, ml) -> List[str]:
+    describe = (eda.get("statistics") or {}).get("descriptive") or {}
+    lines = []
+    for column, stats in describe.items():
+        summary = ", ".join(f"{key}={_num(stats[key])}" for key in ("mean", "std", "min", "max") if key in stats)
+        lines.append(f"{column}: {summary}")
+    return lines
+
+
+SECTION_BUILDERS = {
+    "overview": _overview,
+    "best_model": _best_model,
+    "top_features": _top_features,
+    "issues": _issues,
+    "target": _target,
+    "model_comparison": _model_comparison,
+    "column_statistics": _column_statistics,
+}
+
+
+def build_session_context(context: Dict[str, Any], context_type: str = "general",
+                          budget: int = PROMPT_TOKEN_BUDGET) -> Tuple[str, Dict[str, Any]]:
+    """Render session results as ranked, compact sections that fit within budget tokens
+
+    Sections are added in priority order for the context type; a section that does not
+    fit whole keeps as many of its (already ranked) lines as fit, and later sections are
+    dropped once the budget is spent. Returns the text and a report of what was kept.
+    """
+    if not context:
+        return "No specific context", {"budget": budget, "context_tokens": 0, "sections": {}}
+
+    dataset_info, eda, ml = _results(context)
+    order = SECTION_PRIORITY.get(context_type, SECTION_PRIORITY["general"])
+
+    blocks, sections, used = [], {}, 0
+    for name in order:
+        lines = SECTION_BUILDERS[name](context, dataset_info, eda, ml)
+        if not lines:
+            continue
+
+        header = f"## {name.replace('_', ' ')}"
+        kept = []
+        cost = count_tokens(header) + 1
+        for line in lines:
+            line_cost = count_tokens(line) + 1
+            if used + cost + line_cost > budget:
+                break
+            kept.append(line)
+            cost += line_cost
+
+        if not kept:
+            sections[name] = {"lines": 0, "of": len(lines), "status": "dropped"}
+            continue
+
+        sections[name] = {"lines": len(kept), "of": len(lines),
+                          "status": "complete" if len(kept) == len(lines) else "truncated"}
+        if len(kept) < len(lines):
+            kept.append(f"... {len(lines) - len(kept)} more omitted")
+            cost += count_tokens(kept[-1]) + 1
+        blocks.append("\n".join([header] + kept))
+        used += cost
+
+    return "\n\n".join(blocks), {"budget": budget, "context_tokens": used, "sections": sections}
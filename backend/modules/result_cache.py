@@ -0,0 +1,117 @@
+# backend/modules/result_cache.py
+
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from typing import Dict, Any, Optional, List, Tuple
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of EDA/ML results and model artifacts
+
+    Entries are keyed on the dataset content hash plus task type, target column and
+    pipeline version. Each entry is a directory holding results.pkl plus any artifacts
+    stored alongside it (model.pkl, raw.parquet, cleaned.parquet). The directory mtime
+    doubles as the last-access time for LRU eviction, which runs whenever the entry count
+    or total size exceeds its limit.
+    """
+
+    RESULTS_FILE = "results.pkl"
+
+    def __init__(self, cache_dir: str, max_entries: int = 200, max_bytes: int = 5 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content_hash: str, task_type: str, target_column: str, pipeline_version: str) -> str:
+        raw = "|".join([content_hash, task_type, target_column, pipeline_version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload for key and mark it as recently used"""
+        entry_dir = self._entry_dir(key)
+        with self._lock:
+            try:
+                with open(os.path.join(entry_dir, self.RESULTS_FILE), "rb") as f:
+                    payload = pickle.load(f)
+                os.utime(entry_dir)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["hits"] += 1
+            return payload
+
+    def copy_artifact(self, key: str, name: str, dest_path: str) -> Optional[str]:
+        """Copy a cached artifact (e.g. model.pkl) for key to dest_path"""
+        artifact_path = os.path.join(self._entry_dir(key), name)
+        if not os.path.exists(artifact_path):
+            return None
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        shutil.copyfile(artifact_path, dest_path)
+        return dest_path
+
+    def put(self, key: str, payload: Dict[str, Any], artifacts: Optional[Dict[str, str]] = None) -> None:
+        """Store payload and artifact files ({name: source path}) under key, then enforce limits"""
+        tmp_dir = os.path.join(self.cache_dir, f".tmp_{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            with open(os.path.join(tmp_dir, self.RESULTS_FILE), "wb") as f:
+                pickle.dump(payload, f)
+            for name, src_path in (artifacts or {}).items():
+                if src_path and os.path.exists(src_path):
+                    shutil.copyfile(src_path, os.path.join(tmp_dir, name))
+
+            with self._lock:
+                entry_dir = self._entry_dir(key)
+                if os.path.exists(entry_dir):
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(tmp_dir, entry_dir)
+                self.stats["stores"] += 1
+                self._evict()
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(".tmp_") or not os.path.isdir(path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            entries.append((os.path.getmtime(path), size, path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total_bytes = sum(size for _, size, _ in entries)
+
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            total_bytes -= size
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._entries()
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes
+            }
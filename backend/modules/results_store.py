@@ -0,0 +1,200 @@
+# backend/modules/results_store.py
+
+import json
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.modules import blob_store
+from backend.modules.database import AnalysisResultSection, AnalysisSession
+from backend.utils import json_utils
+
+# Section name -> (top-level results key, sub-key or None for "everything else")
+SECTIONS = {
+    "eda_overview": ("eda", None),
+    "eda_quality": ("eda", "data_quality"),
+    "eda_statistics": ("eda", "statistics"),
+    "feature_importance": ("eda", "feature_importance"),
+    "visualizations": ("eda", "visualizations"),
+    "model_summary": ("ml", None),
+    "model_comparison": ("ml", "comparison_table"),
+    "pdf_insights": ("pdf_insights", None),
+}
+MIGRATION_BATCH_SIZE = 200
+
+
+def _split_off(section_key: str) -> List[str]:
+    return [sub for parent, sub in SECTIONS.values() if parent == section_key and sub]
+
+
+def split_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Break a results dict ({"eda", "ml", "pdf_insights"}) into independently stored sections"""
+    sections = {}
+    for name, (parent, sub) in SECTIONS.items():
+        value = results.get(parent)
+        if sub is not None:
+            sections[name] = (value or {}).get(sub)
+        elif isinstance(value, dict):
+            sections[name] = {key: item for key, item in value.items() if key not in _split_off(parent)}
+        else:
+            sections[name] = value
+    return sections
+
+
+def assemble_results(sections: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of split_results for whichever sections are present"""
+    results: Dict[str, Any] = {}
+    for name, value in sections.items():
+        parent, sub = SECTIONS[name]
+        if parent == "pdf_insights":
+            results[parent] = value
+            continue
+        target = results.setdefault(parent, {})
+        if sub is None:
+            target.update(value or {})
+        else:
+            target[sub] = value
+    return results
+
+
+def parse_section_names(raw: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated ?sections= value; None means every section"""
+    if not raw:
+        return None
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown result section(s): {', '.join(unknown)}. Available: {', '.join(SECTIONS)}")
+    return names
+
+
+def _section_row(session_id: str, name: str, data: str, now: datetime, db: Session) -> AnalysisResultSection:
+    # Large sections go to the compressed, deduplicated blob store; small ones stay inline
+    content = data.encode("utf-8")
+    if len(content) <= blob_store.BLOB_INLINE_MAX_BYTES:
+        return AnalysisResultSection(session_id=session_id, section=name, data=data,
+                                     size_bytes=len(content), updated_at=now)
+    return AnalysisResultSection(session_id=session_id, section=name, blob_key=blob_store.put(db, content),
+                                 size_bytes=len(content), updated_at=now)
+
+
+def save_sections(db: Session, session_id: str, results: Dict[str, Any]) -> None:
+    """Write (or replace) every section of results for session_id; the caller commits"""
+    previous = delete_sections(db, session_id, release_blobs=False)
+    now = datetime.utcnow()
+    for name, value in split_results(results).items():
+        db.add(_section_row(session_id, name, json_utils.dumps(value), now, db))
+    db.flush()
+    blob_store.release(db, previous)
+
+
+def _section_value(db: Session, row) -> Any:
+    if row.blob_key:
+        return json.loads(blob_store.read(db, row.blob_key))
+    return json.loads(row.data)
+
+
+def load_sections(db: Session, session_id: str, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Fetch the requested sections (all by default), parsing only those rows
+
+    Sessions written before sections existed still carry the legacy results column until
+    migrate_legacy_results has run; for those the column is split on the fly.
+    """
+    names = list(names) if names is not None else list(SECTIONS)
+    rows = db.query(AnalysisResultSection.section, AnalysisResultSection.data, AnalysisResultSection.blob_key).filter(
+        AnalysisResultSection.session_id == session_id,
+        AnalysisResultSection.section.in_(names)
+    ).all()
+    if rows:
+        return {row.section: _section_value(db, row) for row in rows}
+
+    legacy = db.query(AnalysisSession.results).filter(AnalysisSession.id == session_id).scalar()
+    if not legacy:
+        return {}
+    sections = split_results(json.loads(legacy))
+    return {name: sections[name] for name in names if name in sections}
+
+
+def list_sections(db: Session, session_id: str) -> Dict[str, int]:
+    """Section name -> stored size in bytes"""
+    rows = db.query(AnalysisResultSection.section, AnalysisResultSection.size_bytes).filter(
+        AnalysisResultSection.session_id == session_id
+    ).all()
+    return {row.section: row.size_bytes for row in rows}
+
+
+def section_blob(db: Session, session_id: str, name: str) -> Optional[AnalysisResultSection]:
+    """The stored row for one section (None if missing), for streaming its raw JSON"""
+    return db.query(AnalysisResultSection).filter(
+        AnalysisResultSection.session_id == session_id, AnalysisResultSection.section == name
+    ).first()
+
+
+def delete_sections(db: Session, session_id: str, release_blobs: bool = True) -> List[str]:
+    """Delete the session's section rows (and blobs nothing else references); returns their blob keys"""
+    keys = [row.blob_key for row in db.query(AnalysisResultSection.blob_key).filter(
+        AnalysisResultSection.session_id == session_id, AnalysisResultSection.blob_key.isnot(None)
+    )]
+    db.query(AnalysisResultSection).filter(AnalysisResultSection.session_id == session_id).delete()
+    if release_blobs:
+        db.flush()
+        blob_store.release(db, keys)
+    return keys
+
+
+def migrate_legacy_results(session_factory, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """Move results JSON of existing sessions into section rows, clearing the old column
+
+    Runs in batches with a commit per batch, so it can be interrupted and resumed.
+    """
+    migrated = 0
+    skipped: List[str] = []  # unreadable rows keep their column and are not retried
+    while True:
+        db = session_factory()
+        try:
+            sessions = db.query(AnalysisSession.id, AnalysisSession.results).filter(
+                AnalysisSession.results.isnot(None), AnalysisSession.id.notin_(skipped)
+            ).limit(batch_size).all()
+            if not sessions:
+                return migrated
+
+            for session_id, results in sessions:
+                try:
+                    save_sections(db, session_id, json.loads(results))
+                except ValueError as e:
+                    print(f"Skipping unreadable results for session {session_id}: {e}")
+                    skipped.append(session_id)
+                    continue
+                db.query(AnalysisSession).filter(AnalysisSession.id == session_id).update(
+                    {"results": None}, synchronize_session=False
+                )
+                migrated += 1
+            db.commit()
+        finally:
+            db.close()
+
+
+def migrate_inline_sections(session_factory, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """Move section JSON written before the blob store existed into blobs, past the inline size limit"""
+    migrated = 0
+    while True:
+        db = session_factory()
+        try:
+            rows = db.query(AnalysisResultSection).filter(
+                AnalysisResultSection.blob_key.is_(None),
+                func.length(AnalysisResultSection.data) > blob_store.BLOB_INLINE_MAX_BYTES
+            ).limit(batch_size).all()
+            if not rows:
+                return migrated
+
+            for row in rows:
+                content = row.data.encode("utf-8")
+                row.blob_key = blob_store.put(db, content)
+                row.size_bytes = len(content)
+                row.data = None
+                migrated += 1
+            db.commit()
+        finally:
+            db.close()
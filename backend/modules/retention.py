@@ -0,0 +1,216 @@
+# backend/modules/retention.py
+
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+RETENTION_ENABLED = os.getenv('RETENTION_ENABLED', 'true').lower() == 'true'
+RETENTION_SWEEP_INTERVAL = float(os.getenv('RETENTION_SWEEP_INTERVAL', '3600'))
+# Total bytes across all categories; least recently used files go first once it is exceeded. 0 disables
+RETENTION_MAX_BYTES = int(os.getenv('RETENTION_MAX_BYTES', str(20 * 1024 ** 3)))
+# Files younger than this are never removed, so in-flight uploads and model writes are safe
+RETENTION_MIN_AGE = float(os.getenv('RETENTION_MIN_AGE', '600'))
+# Per-category TTL overrides in seconds, e.g. "uploads=86400,charts=0"; 0 keeps files until the quota needs room
+RETENTION_TTL = os.getenv('RETENTION_TTL', '')
+
+DEFAULT_TTL_SECONDS = {
+    "uploads": 7 * 24 * 3600,        # original CSV/PDF uploads; the dataset store keeps a Parquet copy
+    "chart_uploads": 24 * 3600,      # images posted to /api/analyze-chart, only read during the request
+    "exports": 24 * 3600,            # CSV exports rendered on demand from the dataset store
+    "models": 30 * 24 * 3600,
+    "datasets": 30 * 24 * 3600,      # per-session Parquet directories, needed for reanalysis
+    "charts": 30 * 24 * 3600,
+}
+
+SESSION_ID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def _parse_ttl_overrides(raw: str) -> Dict[str, int]:
+    overrides = {}
+    for item in raw.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            overrides[name.strip()] = int(seconds)
+    return overrides
+
+
+class _Category(NamedTuple):
+    directory: str
+    matches: Callable[[str], bool]
+    per_session_dirs: bool = False  # entries are <directory>/<session_id>/ rather than files
+
+
+class _Entry(NamedTuple):
+    category: str
+    path: str
+    size: int
+    last_used: float
+    session_id: Optional[str]
+
+
+def _dir_usage(path: str) -> Tuple[int, float]:
+    size, last_used = 0, 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            size += stat.st_size
+            last_used = max(last_used, stat.st_atime, stat.st_mtime)
+    return size, last_used or os.path.getmtime(path)
+
+
+class RetentionService:
+    """Expires and evicts generated files: uploads, exports, model pickles, datasets and charts
+
+    A sweep removes files older than their category's TTL, then, while the total still
+    exceeds max_bytes, the least recently used (latest of atime and mtime) across all
+    categories. Files of sessions that are still queued or running, as reported by
+    active_sessions, and files younger than min_age are left alone. The result cache is
+    not managed here; it enforces its own limits.
+    """
+
+    def __init__(self, upload_dir: str, output_dir: str, dataset_dir: str, charts_dir: str,
+                 ttl_seconds: Optional[Dict[str, int]] = None, max_bytes: int = RETENTION_MAX_BYTES,
+                 min_age: float = RETENTION_MIN_AGE, active_sessions: Optional[Callable[[], Set[str]]] = None):
+        self.categories = {
+            "uploads": _Category(upload_dir, lambda name: not name.startswith("chart_")),
+            "chart_uploads": _Category(upload_dir, lambda name: name.startswith("chart_")),
+            "exports": _Category(output_dir, lambda name: name.endswith((".csv", ".pdf", ".txt"))),
+            "models": _Category(output_dir, lambda name: name.endswith(".pkl")),
+            "datasets": _Category(dataset_dir, lambda name: True, per_session_dirs=True),
+            "charts": _Category(charts_dir, lambda name: True),
+        }
+        self.ttl_seconds = {**DEFAULT_TTL_SECONDS, **_parse_ttl_overrides(RETENTION_TTL), **(ttl_seconds or {})}
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self.active_sessions = active_sessions
+        self._lock = threading.Lock()
+        self.stats = {
+            "sweeps": 0,
+            "files_removed": 0,
+            "bytes_reclaimed": 0,
+            "by_reason": {reason: {"files": 0, "bytes": 0} for reason in ("ttl", "quota", "session_delete")},
+            "by_category": {name: {"files": 0, "bytes": 0} for name in self.categories},
+        }
+        self.last_sweep: Dict[str, Any] = {}
+
+    def _scan(self, wanted: Optional[Callable[[str, Optional[str]], bool]] = None) -> List[_Entry]:
+        """Managed entries, optionally only those for which wanted(path, session_id) holds"""
+        entries = []
+        for name, category in self.categories.items():
+            if not os.path.isdir(category.directory):
+                continue
+            for item in os.scandir(category.directory):
+                if item.name.startswith(".") or not category.matches(item.name):
+                    continue
+                match = SESSION_ID_RE.search(item.name)
+                session_id = match.group(0) if match else None
+                if wanted is not None and not wanted(item.path, session_id):
+                    continue
+                try:
+                    if category.per_session_dirs:
+                        if not item.is_dir():
+                            continue
+                        size, last_used = _dir_usage(item.path)
+                    else:
+                        if not item.is_file():
+                            continue
+                        stat = item.stat()
+                        size, last_used = stat.st_size, max(stat.st_atime, stat.st_mtime)
+                except FileNotFoundError:
+                    continue
+                entries.append(_Entry(name, item.path, size, last_used, session_id))
+        return entries
+
+    def _remove(self, entry: _Entry, reason: str) -> bool:
+        try:
+            if os.path.isdir(entry.path):
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Retention could not remove {entry.path}: {e}")
+            return False
+
+        with self._lock:
+            self.stats["files_removed"] += 1
+            self.stats["bytes_reclaimed"] += entry.size
+            for bucket in (self.stats["by_reason"][reason], self.stats["by_category"][entry.category]):
+                bucket["files"] += 1
+                bucket["bytes"] += entry.size
+        return True
+
+    def sweep(self) -> Dict[str, Any]:
+        """Run one TTL pass followed by quota eviction; returns what was removed"""
+        started = time.perf_counter()
+        now = time.time()
+        active = self.active_sessions() if self.active_sessions else set()
+
+        def removable(entry: _Entry) -> bool:
+            return now - entry.last_used >= self.min_age and entry.session_id not in active
+
+        kept, removed = [], {"ttl": [0, 0], "quota": [0, 0]}
+        for entry in self._scan():
+            ttl = self.ttl_seconds.get(entry.category, 0)
+            if ttl and now - entry.last_used > ttl and removable(entry) and self._remove(entry, "ttl"):
+                removed["ttl"][0] += 1
+                removed["ttl"][1] += entry.size
+            else:
+                kept.append(entry)
+
+        total = sum(entry.size for entry in kept)
+        evicted = set()
+        if self.max_bytes:
+            for entry in sorted(kept, key=lambda entry: entry.last_used):
+                if total <= self.max_bytes:
+                    break
+                if removable(entry) and self._remove(entry, "quota"):
+                    total -= entry.size
+                    evicted.add(entry.path)
+                    removed["quota"][0] += 1
+                    removed["quota"][1] += entry.size
+
+        usage = {name: 0 for name in self.categories}
+        for entry in kept:
+            if entry.path not in evicted:
+                usage[entry.category] += entry.size
+        summary = {
+            "at": datetime.utcnow().isoformat(),
+            "seconds": round(time.perf_counter() - started, 3),
+            "removed": {reason: {"files": files, "bytes": size} for reason, (files, size) in removed.items()},
+            "usage_bytes": usage,
+            "total_bytes": sum(usage.values()),
+        }
+        with self._lock:
+            self.stats["sweeps"] += 1
+            self.last_sweep = summary
+        return summary
+
+    def delete_session_files(self, session_id: str, extra_paths: Iterable[str] = ()) -> Dict[str, int]:
+        """Remove every managed file named after session_id, plus extra_paths that live in a managed directory"""
+        extra = {os.path.realpath(path) for path in extra_paths if path}
+        files = bytes_removed = 0
+        # _scan only yields entries directly inside a managed directory, so extra paths elsewhere are ignored
+        for entry in self._scan(lambda path, owner: owner == session_id or os.path.realpath(path) in extra):
+            if self._remove(entry, "session_delete"):
+                files += 1
+                bytes_removed += entry.size
+        return {"files": files, "bytes": bytes_removed}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "ttl_seconds": self.ttl_seconds,
+                "max_bytes": self.max_bytes,
+                "min_age": self.min_age,
+                "last_sweep": self.last_sweep,
+            }
@@ -0,0 +1,159 @@
+# backend/modules/session_context.py
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from backend.modules.database import AnalysisSession
+from backend.modules import results_store
+
+SESSION_CONTEXT_MAX_BYTES = int(os.getenv('SESSION_CONTEXT_MAX_BYTES', str(64 * 1024 ** 2)))
+# Check each hit against the session's (status, completed_at) so a re-run or delete on
+# another worker is noticed; costs one primary-key lookup of two small columns
+SESSION_CONTEXT_VALIDATE = os.getenv('SESSION_CONTEXT_VALIDATE', 'true').lower() == 'true'
+
+PROMPT_SECTIONS = ["eda_overview", "eda_quality", "eda_statistics", "feature_importance",
+                   "model_summary", "model_comparison"]
+
+
+def summarize_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the parts of stored results that prompt building reads
+
+    Drops visualization paths, PDF chart payloads and the rest of the per-column quality
+    report, which make up most of a large results blob.
+    """
+    dataset_info = results.get("dataset_info") or {}
+    eda = results.get("eda") or {}
+    ml = results.get("ml") or {}
+    quality = eda.get("data_quality") or {}
+    statistics = eda.get("statistics") or {}
+
+    return {
+        "dataset_info": {key: dataset_info[key] for key in ("filename", "shape") if key in dataset_info},
+        "eda": {
+            "task_type": eda.get("task_type"),
+            "target_column": eda.get("target_column"),
+            "cleaned_shape": eda.get("cleaned_shape"),
+            "sampling": eda.get("sampling"),
+            "data_quality": {
+                "missing_percentage": quality.get("missing_percentage") or {},
+                "duplicate_rows": quality.get("duplicate_rows"),
+            },
+            "statistics": {"target": statistics.get("target") or {}, "descriptive": statistics.get("descriptive") or {}},
+            "feature_importance": eda.get("feature_importance") or {},
+        },
+        "ml": {
+            key: ml.get(key) for key in ("best_model", "comparison_table", "feature_importance", "training_summary")
+        },
+    }
+
+
+class SessionContextCache:
+    """In-process LRU of parsed, summarized session contexts for prompt building
+
+    Entries are sized by their JSON length and evicted least recently used once the total
+    passes max_bytes. Only finished sessions are cached; a session still queued or running
+    is loaded each time until its results exist.
+    """
+
+    def __init__(self, session_factory: Callable, max_bytes: int = SESSION_CONTEXT_MAX_BYTES,
+                 validate: bool = SESSION_CONTEXT_VALIDATE):
+        self.session_factory = session_factory
+        self.max_bytes = max_bytes
+        self.validate = validate
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], Tuple, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _version(status: Optional[str], completed_at) -> Tuple:
+        return (status or "completed", completed_at.isoformat() if completed_at else None)
+
+    def get(self, session_id: Optional[str]) -> Dict[str, Any]:
+        """Return the prompt context for session_id ({} if there is no such session)"""
+        if not session_id:
+            return {}
+
+        with self._lock:
+            entry = self._entries.get(session_id)
+
+        db = self.session_factory()
+        try:
+            if entry is not None:
+                if not self.validate:
+                    return self._hit(session_id, entry)
+                row = db.query(AnalysisSession.status, AnalysisSession.completed_at).filter(
+                    AnalysisSession.id == session_id
+                ).first()
+                if row is not None and self._version(row.status, row.completed_at) == entry[1]:
+                    return self._hit(session_id, entry)
+                self.stats["stale"] += 1
+                self.invalidate(session_id)
+
+            self.stats["misses"] += 1
+            session = db.query(
+                AnalysisSession.task_type, AnalysisSession.target_column, AnalysisSession.dataset_info,
+                AnalysisSession.status, AnalysisSession.completed_at
+            ).filter(AnalysisSession.id == session_id).first()
+            if session is None:
+                return {}
+
+            # Visualizations and PDF insights are never read for prompts, so they stay in the database
+            results = results_store.assemble_results(results_store.load_sections(db, session_id, PROMPT_SECTIONS))
+            results["dataset_info"] = json.loads(session.dataset_info) if session.dataset_info else {}
+            context = {
+                "task_type": session.task_type,
+                "target_column": session.target_column,
+                "results": summarize_results(results)
+            }
+            version = self._version(session.status, session.completed_at)
+            finished = version[0] in ("completed", "failed")
+        finally:
+            db.close()
+
+        if finished:
+            self._store(session_id, context, version)
+        return context
+
+    def _hit(self, session_id: str, entry: Tuple[Dict[str, Any], Tuple, int]) -> Dict[str, Any]:
+        with self._lock:
+            if session_id in self._entries:
+                self._entries.move_to_end(session_id)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def _store(self, session_id: str, context: Dict[str, Any], version: Tuple) -> None:
+        size = len(json.dumps(context, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(session_id, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[session_id] = (context, version, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats["evictions"] += 1
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                self.stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        with self._lock:
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -1,98 +1,60 @@
 import os
-import sqlite3
+import csv
+import base64
 import uuid
 import json
 import asyncio
+import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from pathlib import Path
+from functools import partial
+from typing import List, Optional, Dict, Any, Tuple
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import pandas as pd
-import numpy as np
-import cv2
-import requests
-from sqlalchemy import create_engine, Column, String, DateTime, Text, Integer
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-import tensorflow as tf
-from tensorflow import keras
-from sklearn.preprocessing import LabelEncoder
-import pytesseract
-from pdf2image import convert_from_bytes
-from langdetect import detect
-import pickle
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
 
-from backend.modules.enhanced_vision import CNNChartClassifier, EnhancedImageProcessor
-from backend.modules.enhanced_eda import AutoEDAPipeline
-from backend.modules.enhanced_ml import EnhancedMLPipeline
-from backend.modules.enhanced_chat import IntelligentChatEngine
-from backend.modules.database import DatabaseManager
-
 load_dotenv()
 
+from backend.modules.engine_registry import registry, get_engine
+from backend.modules.database import (
+    DatabaseManager, AnalysisSession, ChatMessage, MONGO_URL, engine, async_engine, SessionLocal, get_async_db
+)
+from backend.modules.job_queue import AnalysisJobQueue, JobQueueFullError
+from backend.modules.analysis_worker import (
+    run_analysis_job, run_pdf_extraction_job, normalize_column_name, ANALYSIS_PIPELINE_VERSION, DATASET_STORE_DIR
+)
+from backend.modules.result_cache import ResultCache
+from backend.modules.dataset_store import DatasetStore
+from backend.modules.session_context import SessionContextCache
+from backend.modules.retention import RetentionService, RETENTION_ENABLED, RETENTION_SWEEP_INTERVAL
+from backend.modules import blob_store, results_store
+from backend.utils.upload_utils import save_upload, UploadTooLargeError
+from backend.utils import json_utils
+
 UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
 OUTPUT_FOLDER = os.getenv('OUTPUT_FOLDER', 'outputs')
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 GROQ_API_URL = os.getenv('GROQ_API_URL')
 GROQ_MODEL = os.getenv('GROQ_MODEL')
-DATABASE_URL = os.getenv('MONGO_URL', 'sqlite:///./insightforge.db')
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '2'))
+ANALYSIS_MAX_PENDING = int(os.getenv('ANALYSIS_MAX_PENDING', '16'))
+ENGINE_WARMUP = os.getenv('ENGINE_WARMUP', '')
+MIN_SAMPLE_SIZE = int(os.getenv('MIN_SAMPLE_SIZE', '1000'))
+PDF_INSIGHT_CONCURRENCY = int(os.getenv('PDF_INSIGHT_CONCURRENCY', '4'))
+SESSION_LIST_MAX_LIMIT = int(os.getenv('SESSION_LIST_MAX_LIMIT', '200'))
+RESULT_CACHE_DIR = os.getenv('RESULT_CACHE_DIR', os.path.join(OUTPUT_FOLDER, 'result_cache'))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '200'))
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(5 * 1024 ** 3)))
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 os.makedirs('static/charts', exist_ok=True)
 
-Base = declarative_base()
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-app = FastAPI(title="InsightForge AI", version="2.0.0")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-chart_classifier = CNNChartClassifier()
-image_processor = EnhancedImageProcessor()
-eda_pipeline = AutoEDAPipeline()
-ml_pipeline = EnhancedMLPipeline()
-chat_engine = IntelligentChatEngine(GROQ_API_KEY, GROQ_API_URL, GROQ_MODEL)
-db_manager = DatabaseManager(engine)
-
-class AnalysisSession(Base):
-    __tablename__ = "analysis_sessions"
-
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    task_type = Column(String)
-    target_column = Column(String)
-    dataset_info = Column(Text)
-    results = Column(Text)
-    chat_history = Column(Text)
-
-class ChatMessage(Base):
-    __tablename__ = "chat_messages"
-
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id = Column(String)
-    message = Column(Text)
-    response = Column(Text)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    context_type = Column(String)
-
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(title="InsightForge AI", version="2.0.0")
 
 app.add_middleware(
@@ -105,20 +67,24 @@ app.add_middleware(
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-chart_classifier = CNNChartClassifier()
-image_processor = EnhancedImageProcessor()
-eda_pipeline = AutoEDAPipeline()
-ml_pipeline = EnhancedMLPipeline()
-chat_engine = IntelligentChatEngine(GROQ_API_KEY, GROQ_API_URL, GROQ_MODEL)
 db_manager = DatabaseManager(engine)
+job_queue = AnalysisJobQueue(SessionLocal, MONGO_URL, max_workers=ANALYSIS_WORKERS, max_pending=ANALYSIS_MAX_PENDING)
+result_cache = ResultCache(RESULT_CACHE_DIR, max_entries=RESULT_CACHE_MAX_ENTRIES, max_bytes=RESULT_CACHE_MAX_BYTES)
+dataset_store = DatasetStore(DATASET_STORE_DIR)
+session_contexts = SessionContextCache(SessionLocal)
 
-def get_db():
+def _active_session_ids() -> set:
     db = SessionLocal()
     try:
-        yield db
+        rows = db.query(AnalysisSession.id).filter(AnalysisSession.status.in_(["queued", "running"])).all()
+        return {row.id for row in rows}
     finally:
         db.close()
 
+retention = RetentionService(UPLOAD_FOLDER, OUTPUT_FOLDER, DATASET_STORE_DIR, 'static/charts',
+                             active_sessions=_active_session_ids)
+retention_task: Optional[asyncio.Task] = None
+
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
@@ -156,80 +122,390 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "service": "InsightForge AI", "version": "2.0.0"}
+    return {"status": "healthy", "service": "InsightForge AI", "version": "2.0.0", "engines": registry.status()}
+
+@app.on_event("startup")
+async def warm_up_engines():
+    # Opt-in: ENGINE_WARMUP=all or a comma-separated list of engine names. Runs in the
+    # background so the server accepts requests (and health checks) while models load.
+    if ENGINE_WARMUP:
+        names = None if ENGINE_WARMUP == "all" else [name.strip() for name in ENGINE_WARMUP.split(",") if name.strip()]
+        asyncio.get_running_loop().run_in_executor(None, registry.warm_up, names)
+
+@app.on_event("startup")
+async def start_job_heartbeat():
+    # Keeps this process's jobs alive for the other workers and fails jobs whose owning
+    # process stopped heartbeating (e.g. after a restart)
+    job_queue.start()
+
+@app.on_event("startup")
+async def migrate_legacy_results():
+    # Splits results stored as one JSON column into section rows, then moves large inline
+    # sections into the blob store; readers handle every stage, so this runs in the background
+    async def migrate():
+        migrated = await asyncio.to_thread(results_store.migrate_legacy_results, SessionLocal)
+        if migrated:
+            print(f"Migrated results of {migrated} session(s) to section storage")
+        moved = await asyncio.to_thread(results_store.migrate_inline_sections, SessionLocal)
+        if moved:
+            print(f"Moved {moved} result section(s) to the blob store")
+    asyncio.create_task(migrate())
+
+@app.on_event("startup")
+async def start_retention_sweeper():
+    global retention_task
+    if not RETENTION_ENABLED:
+        return
+
+    async def sweep_forever():
+        while True:
+            try:
+                summary = await asyncio.to_thread(retention.sweep)
+                removed = sum(item["files"] for item in summary["removed"].values())
+                if removed:
+                    print(f"Retention sweep removed {removed} file(s), "
+                          f"{sum(item['bytes'] for item in summary['removed'].values())} bytes")
+            except Exception as e:
+                print(f"Retention sweep failed: {e}")
+            await asyncio.sleep(RETENTION_SWEEP_INTERVAL)
+    retention_task = asyncio.create_task(sweep_forever())
+
+@app.on_event("shutdown")
+async def stop_retention_sweeper():
+    if retention_task is not None:
+        retention_task.cancel()
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    job_queue.shutdown()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    if registry.is_loaded("chat_engine"):
+        await get_engine("chat_engine").aclose()
+
+@app.on_event("shutdown")
+async def close_database():
+    await async_engine.dispose()
+
+def _restore_cached_results(session_id: str, cache_key: str, cached: Dict[str, Any], filename: str) -> Dict[str, Any]:
+    """Point a cache hit at this session: current filename, per-session model and datasets"""
+    restored = dict(cached)
+    restored["dataset_info"] = {**cached["dataset_info"], "filename": filename}
+
+    result_cache.copy_artifact(cache_key, "raw.parquet", dataset_store.path(session_id, "raw"))
+    result_cache.copy_artifact(cache_key, "cleaned.parquet", dataset_store.path(session_id, "cleaned"))
+    model_path = result_cache.copy_artifact(cache_key, "model.pkl", os.path.join(OUTPUT_FOLDER, f"model_{session_id}.pkl"))
+    if model_path and isinstance(cached["ml"].get("best_model"), dict):
+        restored["ml"] = {**cached["ml"], "best_model": {**cached["ml"]["best_model"], "model_path": model_path}}
+    return restored
+
+async def _complete_analysis(session_id: str, result: Dict[str, Any],
+                             cache_key: Optional[str] = None,
+                             cached: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run the I/O-bound PDF insight step in the event loop and build the session columns"""
+    if cached is not None:
+        result = {**cached, **result}
+    elif cache_key:
+        await asyncio.to_thread(
+            result_cache.put,
+            cache_key,
+            {"dataset_info": result["dataset_info"], "eda": result["eda"], "ml": result["ml"]},
+            {
+                "model.pkl": result["ml"].get("best_model", {}).get("model_path"),
+                "raw.parquet": dataset_store.path(session_id, "raw"),
+                "cleaned.parquet": dataset_store.path(session_id, "cleaned")
+            }
+        )
+
+    pdf_insights = None
+    if result.get("pdf_charts") is not None:
+        pdf_insights = await analyze_pdf_charts(result["pdf_charts"], result["dataset_info"])
 
-@app.post("/api/upload-dataset")
+    # Sections are written before the session is marked completed, so a completed session
+    # always has them
+    await asyncio.to_thread(_save_result_sections, session_id, {
+        "eda": result["eda"],
+        "ml": result["ml"],
+        "pdf_insights": pdf_insights
+    })
+    return {"dataset_info": json_utils.dumps(result["dataset_info"])}
+
+def _save_result_sections(session_id: str, results: Dict[str, Any]) -> None:
+    db = SessionLocal()
+    try:
+        results_store.save_sections(db, session_id, results)
+        db.commit()
+    finally:
+        db.close()
+
+@app.post("/api/upload-dataset", status_code=202)
 async def upload_dataset(
     file: UploadFile = File(...),
     task_type: str = Form(...),
     target_column: str = Form(...),
     pdf_file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    sample_size: Optional[int] = Form(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
+    # Files saved so far; removed if the request fails before a session row references them
+    saved_paths: List[str] = []
     try:
+        if sample_size is not None and sample_size < MIN_SAMPLE_SIZE:
+            raise HTTPException(400, f"sample_size must be at least {MIN_SAMPLE_SIZE}")
+        if job_queue.is_full():
+            raise HTTPException(503, "Analysis queue is full, please retry shortly")
+
         session_id = str(uuid.uuid4())
+        job_id = str(uuid.uuid4())
         dataset_path = os.path.join(UPLOAD_FOLDER, f"{session_id}_{file.filename}")
-        with open(dataset_path, "wb") as buffer:
-            buffer.write(await file.read())
-
-        df = pd.read_csv(dataset_path)
-        df.columns = df.columns.str.strip().str.replace(" ", "").str.title()
-        normalized_target = target_column.strip().replace(" ", "").title()
+        upload_info = {"dataset": await save_upload(file, dataset_path)}
+        saved_paths.append(dataset_path)
 
-        if normalized_target not in df.columns:
+        with open(dataset_path, newline="", encoding="utf-8-sig", errors="replace") as f:
+            header = next(csv.reader(f), [])
+        normalized_target = normalize_column_name(target_column)
+        if normalized_target not in [normalize_column_name(col) for col in header]:
             raise HTTPException(400, f"Target column '{target_column}' not found")
 
-        cleaned_df, eda_results = await eda_pipeline.run_analysis(df, task_type, normalized_target)
-        model_results = await ml_pipeline.train_and_evaluate(cleaned_df, task_type, normalized_target)
-        print("step 1")
-        pdf_insights = None
+        pdf_path = None
         if pdf_file:
             pdf_path = os.path.join(UPLOAD_FOLDER, f"{session_id}_{pdf_file.filename}")
-            with open(pdf_path, "wb") as buffer:
-                buffer.write(await pdf_file.read())
-            pdf_insights = await analyze_pdf_charts(pdf_path, cleaned_df)
+            upload_info["pdf"] = await save_upload(pdf_file, pdf_path)
+            saved_paths.append(pdf_path)
+
+        content_hash = upload_info["dataset"]["sha256"]
+        if sample_size:
+            content_hash = f"{content_hash}:sample={sample_size}"
+        cache_key = ResultCache.make_key(content_hash, task_type, normalized_target, ANALYSIS_PIPELINE_VERSION)
+        # Unpickling the entry and copying its artifacts is file I/O, so it runs off the event loop
+        cached = await asyncio.to_thread(result_cache.get, cache_key)
+        if cached is not None:
+            cached = await asyncio.to_thread(_restore_cached_results, session_id, cache_key, cached, file.filename)
 
         session_data = AnalysisSession(
             id=session_id,
+            job_id=job_id,
+            status="queued",
             task_type=task_type,
             target_column=normalized_target,
-            dataset_info=json.dumps({
-                "shape": cleaned_df.shape,
-                "columns": list(cleaned_df.columns),
-                "filename": file.filename
-            }),
-            results=json.dumps({
-                "eda": eda_results,
-                "ml": model_results,
-                "pdf_insights": pdf_insights
-            })
+            dataset_info=json.dumps({"filename": file.filename}),
+            upload_info=json.dumps(upload_info),
+            **job_queue.ownership()
         )
-        print("step 2")
+
+        if cached is not None and not pdf_path:
+            session_data.created_at = datetime.utcnow()
+            for key, value in (await _complete_analysis(session_id, {}, cached=cached)).items():
+                setattr(session_data, key, value)
+            session_data.status = "completed"
+            session_data.completed_at = datetime.utcnow()
+            db.add(session_data)
+            await db.commit()
+            return {"session_id": session_id, "job_id": job_id, "status": "completed", "cached": True}
+
         db.add(session_data)
-        db.commit()
+        await db.commit()
+        saved_paths.clear()  # the session owns its files now; retention cleans them up
 
-        return {
-            "session_id": session_id,
-            "eda_results": eda_results,
-            "ml_results": model_results,
-            "pdf_insights": pdf_insights
-        }
+        if cached is not None:
+            job_queue.submit(
+                job_id, session_id, run_pdf_extraction_job, pdf_path,
+                on_complete=partial(_complete_analysis, cached=cached)
+            )
+        else:
+            job_queue.submit(
+                job_id, session_id, run_analysis_job,
+                dataset_path, task_type, normalized_target, file.filename, pdf_path, session_id, None, sample_size,
+                on_complete=partial(_complete_analysis, cache_key=cache_key)
+            )
+
+        return {"session_id": session_id, "job_id": job_id, "status": "queued", "cached": cached is not None}
 
+    except HTTPException:
+        _remove_files(saved_paths)
+        raise
+    except UploadTooLargeError as e:
+        _remove_files(saved_paths)
+        raise HTTPException(413, str(e))
+    except JobQueueFullError as e:
+        raise HTTPException(503, str(e))
     except Exception as e:
-        print("error")
+        _remove_files(saved_paths)
         raise HTTPException(500, f"Upload error: {str(e)}")
 
+def _remove_files(paths: List[str]) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _resolve_columns(available: List[str], columns: str) -> List[str]:
+    """Map a comma-separated column list onto stored column names, normalizing like the upload does"""
+    by_normalized = {normalize_column_name(col): col for col in available}
+    selected, missing = [], []
+    for col in (col.strip() for col in columns.split(",")):
+        if not col:
+            continue
+        name = col if col in available else by_normalized.get(normalize_column_name(col))
+        if name is None:
+            missing.append(col)
+        elif name not in selected:
+            selected.append(name)
+    if missing:
+        raise HTTPException(400, f"Unknown columns: {', '.join(missing)}")
+    return selected
+
+@app.post("/api/sessions/{session_id}/reanalyze", status_code=202)
+async def reanalyze_session(
+    session_id: str,
+    task_type: str = Form(...),
+    target_column: str = Form(...),
+    columns: Optional[str] = Form(None),
+    sample_size: Optional[int] = Form(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Re-run the analysis on a stored dataset, reading only the requested columns"""
+    source = await db.get(AnalysisSession, session_id)
+    if not source or not dataset_store.exists(session_id, "raw"):
+        raise HTTPException(404, "No stored dataset for this session")
+    if sample_size is not None and sample_size < MIN_SAMPLE_SIZE:
+        raise HTTPException(400, f"sample_size must be at least {MIN_SAMPLE_SIZE}")
+    if job_queue.is_full():
+        raise HTTPException(503, "Analysis queue is full, please retry shortly")
+
+    available = dataset_store.columns(session_id, "raw")
+    normalized_target = normalize_column_name(target_column)
+    if normalized_target not in available:
+        raise HTTPException(400, f"Target column '{target_column}' not found")
+
+    selected = None
+    if columns:
+        selected = _resolve_columns(available, columns)
+        if normalized_target not in selected:
+            selected.append(normalized_target)
+
+    upload_info = json.loads(source.upload_info) if source.upload_info else {}
+    filename = (json.loads(source.dataset_info) if source.dataset_info else {}).get("filename")
+    content_hash = upload_info.get("dataset", {}).get("sha256", session_id)
+    if selected:
+        content_hash = f"{content_hash}:{','.join(sorted(selected))}"
+    if sample_size:
+        content_hash = f"{content_hash}:sample={sample_size}"
+    cache_key = ResultCache.make_key(content_hash, task_type, normalized_target, ANALYSIS_PIPELINE_VERSION)
+
+    new_session_id = str(uuid.uuid4())
+    job_id = str(uuid.uuid4())
+    db.add(AnalysisSession(
+        id=new_session_id,
+        job_id=job_id,
+        status="queued",
+        task_type=task_type,
+        target_column=normalized_target,
+        dataset_info=json.dumps({"filename": filename, "source_session_id": session_id}),
+        upload_info=source.upload_info,
+        **job_queue.ownership()
+    ))
+    await db.commit()
+
+    # The new session reads the source session's raw Parquet file; only its cleaned frame is written
+    job_queue.submit(
+        job_id, new_session_id, run_analysis_job,
+        dataset_store.path(session_id, "raw"), task_type, normalized_target, filename, None,
+        new_session_id, selected, sample_size,
+        on_complete=partial(_complete_analysis, cache_key=cache_key)
+    )
+
+    return {"session_id": new_session_id, "job_id": job_id, "status": "queued"}
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    return await asyncio.to_thread(result_cache.get_stats)
+
+def _blob_stats() -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return blob_store.get_stats(db)
+    finally:
+        db.close()
+
+@app.get("/api/storage/stats")
+async def get_storage_stats():
+    return {**retention.get_stats(), "blobs": await asyncio.to_thread(_blob_stats)}
+
+@app.post("/api/storage/sweep")
+async def run_storage_sweep():
+    return await asyncio.to_thread(retention.sweep)
+
+@app.get("/api/llm/stats")
+async def get_llm_stats():
+    if not registry.is_loaded("chat_engine"):
+        return {"loaded": False, "session_context": session_contexts.get_stats()}
+    chat_engine = get_engine("chat_engine")
+    return {
+        "loaded": True,
+        "session_context": session_contexts.get_stats(),
+        "client": chat_engine.client.get_stats(),
+        "single_flight": chat_engine.single_flight.get_stats(),
+        "scheduler": chat_engine.scheduler.get_stats(),
+        "cache": chat_engine.response_cache.get_stats() if chat_engine.response_cache else None,
+        "memory": chat_engine.memory_store.get_stats(),
+        "prompts": {
+            **chat_engine.prompt_stats,
+            "budget": chat_engine.prompt_budget,
+            "avg_tokens": round(chat_engine.prompt_stats["total_tokens"] / chat_engine.prompt_stats["prompts"], 1)
+            if chat_engine.prompt_stats["prompts"] else 0,
+        },
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    session = (await db.execute(select(AnalysisSession).where(AnalysisSession.job_id == job_id))).scalars().first()
+    if not session:
+        raise HTTPException(404, "Job not found")
+
+    return {
+        "job_id": job_id,
+        "session_id": session.id,
+        "status": session.status,
+        "error": session.error,
+        "created_at": session.created_at,
+        "completed_at": session.completed_at
+    }
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    session = (await db.execute(select(AnalysisSession).where(AnalysisSession.job_id == job_id))).scalars().first()
+    if not session:
+        raise HTTPException(404, "Job not found")
+    if session.status == "failed":
+        raise HTTPException(500, f"Analysis failed: {session.error}")
+    if session.status != "completed":
+        raise HTTPException(409, f"Job is still {session.status}")
+
+    results = results_store.assemble_results(await db.run_sync(results_store.load_sections, session.id))
+    return {
+        "session_id": session.id,
+        "eda_results": results.get("eda"),
+        "ml_results": results.get("ml"),
+        "pdf_insights": results.get("pdf_insights")
+    }
+
+def _classify_chart_image(image_path: str) -> Tuple[str, float, Dict[str, Any]]:
+    import cv2
+
+    image = cv2.imread(image_path)
+    chart_type, confidence = get_engine("chart_classifier").classify_chart(image)
+    return chart_type, confidence, get_engine("image_processor").extract_chart_data(image, chart_type)
+
 @app.post("/api/analyze-chart")
 async def analyze_chart(file: UploadFile = File(...)):
     try:
         image_path = os.path.join(UPLOAD_FOLDER, f"chart_{uuid.uuid4().hex}_{file.filename}")
-        with open(image_path, "wb") as buffer:
-            buffer.write(await file.read())
+        await save_upload(file, image_path)
 
-        image = cv2.imread(image_path)
-        chart_type, confidence = chart_classifier.classify_chart(image)
-        extracted_data = image_processor.extract_chart_data(image, chart_type)
-        insights = await chat_engine.generate_chart_insights(chart_type, extracted_data)
+        # Decoding, CNN inference and extraction are CPU-bound, so they run off the event loop
+        chart_type, confidence, extracted_data = await asyncio.to_thread(_classify_chart_image, image_path)
+        insights = await get_engine("chat_engine").generate_chart_insights(chart_type, extracted_data)
 
         return ChartAnalysisResponse(
             chart_type=chart_type,
@@ -237,45 +513,50 @@ async def analyze_chart(file: UploadFile = File(...)):
             extracted_data=extracted_data,
             insights=insights
         )
+    except UploadTooLargeError as e:
+        raise HTTPException(413, str(e))
     except Exception as e:
         raise HTTPException(500, f"Chart error: {str(e)}")
 
 @app.post("/api/chat")
-async def chat_with_ai(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat_with_ai(request: ChatRequest):
     try:
-        context = {}
-        if request.session_id:
-            session = db.query(AnalysisSession).filter_by(id=request.session_id).first()
-            if session:
-                context = {
-                    "task_type": session.task_type,
-                    "target_column": session.target_column,
-                    "results": json.loads(session.results)
-                }
+        context = await asyncio.to_thread(session_contexts.get, request.session_id)
 
-        response = await chat_engine.generate_response(request.message, context, request.context_type)
-
-        chat_msg = ChatMessage(
-            session_id=request.session_id,
-            message=request.message,
-            response=response,
-            context_type=request.context_type
+        chat_engine = get_engine("chat_engine")
+        response = await chat_engine.generate_response(
+            request.message, context, request.context_type, session_id=request.session_id
         )
-        db.add(chat_msg)
-        db.commit()
+
+        await chat_engine.memory_store.arecord(request.session_id, request.message, response, request.context_type)
 
         return {"response": response}
 
     except Exception as e:
         raise HTTPException(500, f"Chat error: {str(e)}")
 
+def _section_names(sections: Optional[str]) -> Optional[List[str]]:
+    try:
+        return results_store.parse_section_names(sections)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
 @app.get("/api/sessions/{session_id}")
-async def get_session(session_id: str, db: Session = Depends(get_db)):
-    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+async def get_session(session_id: str, sections: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    # ?sections=model_summary,model_comparison limits "results" to those sections
+    names = _section_names(sections)
+    session = await db.get(AnalysisSession, session_id)
     if not session:
         raise HTTPException(404, "Session not found")
 
-    chat_history = db.query(ChatMessage).filter(ChatMessage.session_id == session_id).all()
+    chat_history = list((await db.execute(
+        select(ChatMessage).where(ChatMessage.session_id == session_id).order_by(ChatMessage.timestamp)
+    )).scalars().all())
+    if registry.is_loaded("chat_engine"):
+        # Messages still in the write-behind queue; a batch may land between the two reads
+        written = {msg.id for msg in chat_history}
+        chat_history += [msg for msg in get_engine("chat_engine").memory_store.pending(session_id)
+                         if msg.id not in written]
 
     return {
         "session": {
@@ -283,8 +564,11 @@ async def get_session(session_id: str, db: Session = Depends(get_db)):
             "created_at": session.created_at,
             "task_type": session.task_type,
             "target_column": session.target_column,
+            "status": session.status or "completed",
+            "job_id": session.job_id,
+            "upload_info": json.loads(session.upload_info) if session.upload_info else {},
             "dataset_info": json.loads(session.dataset_info) if session.dataset_info else {},
-            "results": json.loads(session.results) if session.results else {}
+            "results": results_store.assemble_results(await db.run_sync(results_store.load_sections, session_id, names))
         },
         "chat_history": [
             {
@@ -297,39 +581,128 @@ async def get_session(session_id: str, db: Session = Depends(get_db)):
         ]
     }
 
+@app.get("/api/sessions/{session_id}/results")
+async def get_session_results(session_id: str, sections: Optional[str] = None,
+                              db: AsyncSession = Depends(get_async_db)):
+    """Fetch individual result sections without loading the rest"""
+    names = _section_names(sections)
+    session = (await db.execute(
+        select(AnalysisSession.id, AnalysisSession.status).where(AnalysisSession.id == session_id)
+    )).first()
+    if not session:
+        raise HTTPException(404, "Session not found")
+
+    return {
+        "session_id": session_id,
+        "status": session.status or "completed",
+        "available": await db.run_sync(results_store.list_sections, session_id),
+        "sections": await db.run_sync(results_store.load_sections, session_id, names)
+    }
+
+@app.get("/api/sessions/{session_id}/results/{section}/raw")
+async def stream_session_section(session_id: str, section: str, db: AsyncSession = Depends(get_async_db)):
+    """Stream one section's stored JSON as-is, without parsing it, chunk by chunk from the blob store"""
+    _section_names(section)
+    row = await db.run_sync(results_store.section_blob, session_id, section)
+    if row is None:
+        # Sessions not yet migrated off the legacy results column
+        legacy = await db.run_sync(results_store.load_sections, session_id, [section])
+        if section not in legacy:
+            raise HTTPException(404, "Section not found")
+        return Response(json_utils.dumps(legacy[section]), media_type="application/json")
+    if row.blob_key is None:
+        return Response(row.data, media_type="application/json")
+    return StreamingResponse(blob_store.stream(SessionLocal, row.blob_key), media_type="application/json",
+                             headers={"Content-Length": str(row.size_bytes)})
+
+def _encode_cursor(created_at: datetime, session_id: str) -> str:
+    raw = json.dumps({"created_at": created_at.isoformat(), "id": session_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(raw["created_at"]), str(raw["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
 @app.get("/api/sessions")
-async def get_all_sessions(limit: int = 50, db: Session = Depends(get_db)):
-    sessions = db.query(AnalysisSession).order_by(AnalysisSession.created_at.desc()).limit(limit).all()
+async def get_all_sessions(limit: int = 50, cursor: Optional[str] = None, task_type: Optional[str] = None,
+                           created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                           db: AsyncSession = Depends(get_async_db)):
+    """Newest-first session listing, paged by the (created_at, id) of the last row returned
+
+    Pass next_cursor back as ?cursor= for the following page; it is null on the last one.
+    """
+    limit = max(1, min(limit, SESSION_LIST_MAX_LIMIT))
+    # Only the listing columns: filename and shape are pulled out of dataset_info by SQLite,
+    # so neither the column list it carries nor the results column is read into Python
+    query = select(
+        AnalysisSession.id, AnalysisSession.created_at, AnalysisSession.task_type,
+        AnalysisSession.target_column, AnalysisSession.status,
+        func.json_extract(AnalysisSession.dataset_info, "$.filename").label("filename"),
+        func.json_extract(AnalysisSession.dataset_info, "$.shape").label("shape")
+    )
+    if task_type:
+        query = query.where(AnalysisSession.task_type == task_type)
+    if created_after:
+        query = query.where(AnalysisSession.created_at >= created_after)
+    if created_before:
+        query = query.where(AnalysisSession.created_at < created_before)
+    if cursor:
+        query = query.where(tuple_(AnalysisSession.created_at, AnalysisSession.id) < tuple_(*_decode_cursor(cursor)))
+
+    query = query.order_by(AnalysisSession.created_at.desc(), AnalysisSession.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    page = rows[:limit]
     return {
         "sessions": [
             {
-                "id": session.id,
-                "created_at": session.created_at,
-                "task_type": session.task_type,
-                "target_column": session.target_column,
-                "dataset_info": json.loads(session.dataset_info) if session.dataset_info else {}
+                "id": row.id,
+                "created_at": row.created_at,
+                "task_type": row.task_type,
+                "target_column": row.target_column,
+                "status": row.status or "completed",
+                "dataset_info": {
+                    key: value for key, value in (
+                        ("filename", row.filename), ("shape", json.loads(row.shape) if row.shape else None)
+                    ) if value is not None
+                }
             }
-            for session in sessions
-        ]
+            for row in page
+        ],
+        "next_cursor": _encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
     }
 
 @app.delete("/api/sessions/{session_id}")
-async def delete_session(session_id: str, db: Session = Depends(get_db)):
-    session = db.query(AnalysisSession).filter(AnalysisSession.id == session_id).first()
+async def delete_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
+    session = await db.get(AnalysisSession, session_id)
     if not session:
         raise HTTPException(404, "Session not found")
 
-    db.query(ChatMessage).filter(ChatMessage.session_id == session_id).delete()
-    db.delete(session)
-    db.commit()
-
-    return {"message": "Session deleted successfully"}
+    if registry.is_loaded("chat_engine"):
+        await get_engine("chat_engine").memory_store.discard_pending(session_id)
+    await db.execute(delete(ChatMessage).where(ChatMessage.session_id == session_id))
+    await db.run_sync(results_store.delete_sections, session_id)
+    await db.delete(session)
+    await db.commit()
+    # Uploads, exports, model_<session_id>.pkl and the Parquet dataset directory. Models saved
+    # before they were named per session may be shared, so those are left to the TTL sweep
+    removed = await asyncio.to_thread(retention.delete_session_files, session_id)
+    session_contexts.invalidate(session_id)
+    if registry.is_loaded("chat_engine"):
+        get_engine("chat_engine").clear_memory(session_id)
+
+    return {"message": "Session deleted successfully", "files_removed": removed["files"],
+            "bytes_reclaimed": removed["bytes"]}
 
 @app.get("/api/download/{session_id}/{file_type}")
-async def download_file(session_id: str, file_type: str):
+async def download_file(session_id: str, file_type: str, columns: Optional[str] = None):
     try:
         file_mapping = {
             "cleaned_data": f"{OUTPUT_FOLDER}/cleaned_data_{session_id}.csv",
+            "cleaned_parquet": dataset_store.path(session_id, "cleaned"),
+            "raw_parquet": dataset_store.path(session_id, "raw"),
             "eda_report": f"{OUTPUT_FOLDER}/eda_report_{session_id}.pdf",
             "model": f"{OUTPUT_FOLDER}/model_{session_id}.pkl",
             "chat_history": f"{OUTPUT_FOLDER}/chat_history_{session_id}.txt"
@@ -339,65 +712,108 @@ async def download_file(session_id: str, file_type: str):
             raise HTTPException(400, "Invalid file type")
 
         file_path = file_mapping[file_type]
+        if file_type == "cleaned_data" and dataset_store.exists(session_id, "cleaned"):
+            # Rendered from the columnar store on demand; a column subset only reads those
+            # columns and is streamed instead of being written to disk
+            selected = _resolve_columns(
+                await asyncio.to_thread(dataset_store.columns, session_id, "cleaned"), columns
+            ) if columns else None
+            if selected:
+                return StreamingResponse(
+                    dataset_store.iter_csv(session_id, "cleaned", selected),
+                    media_type="text/csv",
+                    headers={"Content-Disposition": f'attachment; filename="{file_type}_{session_id}"'}
+                )
+            if not os.path.exists(file_path):
+                await asyncio.to_thread(dataset_store.export_csv, session_id, "cleaned", file_path)
+
         if not os.path.exists(file_path):
             raise HTTPException(404, "File not found")
 
         return FileResponse(file_path, filename=f"{file_type}_{session_id}")
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(500, f"Download failed: {str(e)}")
 
 @app.websocket("/api/ws/chat/{session_id}")
 async def websocket_chat(websocket: WebSocket, session_id: str):
+    # Frames sent per message: {"type": "delta", "content": ...} as tokens arrive, then
+    # {"type": "done", "response": <full text>, ...} once the answer is stored, or
+    # {"type": "error", "error": ...} if the completion fails.
     await manager.connect(websocket)
     try:
         while True:
             data = await websocket.receive_text()
             message_data = json.loads(data)
-
-            response = await chat_engine.generate_response(
-                message_data["message"],
-                {},
-                message_data.get("context_type", "general")
+            context_type = message_data.get("context_type", "general")
+
+            chat_engine = get_engine("chat_engine")
+            context = await asyncio.to_thread(session_contexts.get, session_id)
+            parts = []
+            try:
+                async for delta in chat_engine.stream_response(message_data["message"], context, context_type,
+                                                               session_id=session_id):
+                    parts.append(delta)
+                    await websocket.send_text(json.dumps({"type": "delta", "content": delta}))
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_text(json.dumps({"type": "error", "error": str(e), "partial": "".join(parts)}))
+                continue
+
+            response = "".join(parts).strip()
+            message_id = await chat_engine.memory_store.arecord(
+                session_id, message_data["message"], response, context_type
             )
 
             await manager.send_personal_message(
-                json.dumps({"response": response, "timestamp": str(datetime.now())}),
+                json.dumps({"type": "done", "response": response, "message_id": message_id,
+                            "timestamp": str(datetime.now())}),
                 websocket
             )
 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
-async def analyze_pdf_charts(pdf_path: str, dataset: pd.DataFrame) -> Dict[str, Any]:
+async def analyze_pdf_charts(chart_data: List[Dict[str, Any]], dataset_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach LLM insights to charts extracted by the analysis worker"""
+    if isinstance(chart_data, dict) and "error" in chart_data:
+        return chart_data
+
     try:
-        with open(pdf_path, 'rb') as f:
-            images = convert_from_bytes(f.read())
-
-        chart_data = []
-        for i, page in enumerate(images):
-            np_img = np.array(page)
-            img_cv = cv2.cvtColor(np_img, cv2.COLOR_RGB2BGR)
-            chart_regions = image_processor.extract_chart_regions(img_cv)
-
-            for j, chart_img in enumerate(chart_regions):
-                chart_type, confidence = chart_classifier.classify_chart(chart_img)
-                extracted_data = image_processor.extract_chart_data(chart_img, chart_type)
-                insights = await chat_engine.generate_chart_insights(chart_type, extracted_data, dataset)
-
-                chart_data.append({
-                    "page": i + 1,
-                    "chart": j + 1,
-                    "type": chart_type,
-                    "confidence": confidence,
-                    "data": extracted_data,
-                    "insights": insights
-                })
+        chat_engine = get_engine("chat_engine")
+        semaphore = asyncio.Semaphore(PDF_INSIGHT_CONCURRENCY)
+
+        async def add_insights(chart: Dict[str, Any]) -> None:
+            # One chart failing leaves it without insights instead of failing the report
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    chart["insights"] = await chat_engine.generate_chart_insights(
+                        chart["type"], chart["data"], raise_errors=True
+                    )
+                except Exception as e:
+                    chart["insights"] = []
+                    chart["insight_error"] = str(e)
+                chart["insight_seconds"] = round(time.perf_counter() - started, 3)
+
+        # gather keeps results in page/chart order regardless of completion order
+        started = time.perf_counter()
+        await asyncio.gather(*(add_insights(chart) for chart in chart_data))
+        latencies = [chart["insight_seconds"] for chart in chart_data]
 
         return {
             "total_charts": len(chart_data),
             "charts": chart_data,
-            "summary_insights": await chat_engine.generate_summary_insights(chart_data, dataset)
+            "summary_insights": await chat_engine.generate_summary_insights(chart_data, dataset_info),
+            "insight_timing": {
+                "concurrency": PDF_INSIGHT_CONCURRENCY,
+                "wall_seconds": round(time.perf_counter() - started, 3),
+                "max_chart_seconds": max(latencies, default=0),
+                "failed_charts": sum(1 for chart in chart_data if "insight_error" in chart)
+            }
         }
 
     except Exception as e:
@@ -0,0 +1,89 @@
+# backend/utils/ingest_utils.py
+
+import os
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+INGEST_SAMPLE_ROWS = int(os.getenv('INGEST_SAMPLE_ROWS', '10000'))
+INGEST_CHUNK_ROWS = int(os.getenv('INGEST_CHUNK_ROWS', '250000'))
+CATEGORY_MAX_RATIO = float(os.getenv('CATEGORY_MAX_RATIO', '0.5'))
+CATEGORY_MAX_UNIQUE = int(os.getenv('CATEGORY_MAX_UNIQUE', '1000'))
+
+
+def infer_category_columns(sample: pd.DataFrame, max_ratio: float = CATEGORY_MAX_RATIO,
+                           max_unique: int = CATEGORY_MAX_UNIQUE) -> List[str]:
+    """Pick low-cardinality string columns from a sample to be read as category"""
+    category_cols = []
+    for col in sample.select_dtypes(include=['object']).columns:
+        non_null = sample[col].dropna()
+        if non_null.empty:
+            continue
+        # Mostly-numeric text is left alone so _clean_data can still coerce it
+        if pd.to_numeric(non_null, errors='coerce').notna().mean() > 0.7:
+            continue
+        n_unique = non_null.nunique()
+        if n_unique <= max_unique and n_unique / len(non_null) <= max_ratio:
+            category_cols.append(col)
+    return category_cols
+
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast numeric columns to the smallest width that holds their values exactly"""
+    for col in df.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+
+    for col in df.select_dtypes(include=['floating']).columns:
+        as_float32 = df[col].astype('float32')
+        # float32 is only used when every value survives the round trip
+        if np.array_equal(as_float32.astype('float64').to_numpy(), df[col].to_numpy(), equal_nan=True):
+            df[col] = as_float32
+    return df
+
+
+def read_csv_optimized(path: str, sample_rows: int = INGEST_SAMPLE_ROWS,
+                       chunk_rows: int = INGEST_CHUNK_ROWS) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Read a CSV in chunks with sample-inferred categories and per-chunk numeric downcasting
+
+    Returns the frame and a report with the estimated default-dtype memory footprint
+    (extrapolated from the sample) next to the actual optimized footprint.
+    """
+    sample = pd.read_csv(path, nrows=sample_rows)
+    category_cols = infer_category_columns(sample)
+    dtypes = {col: 'category' for col in category_cols}
+
+    chunks = []
+    total_rows = 0
+    for chunk in pd.read_csv(path, dtype=dtypes, chunksize=chunk_rows):
+        chunks.append(downcast_numeric(chunk))
+        total_rows += len(chunk)
+
+    if not chunks:
+        return sample, {"rows": 0, "chunks": 0}
+
+    columns = list(chunks[0].columns)
+    df = pd.concat([chunk.drop(columns=category_cols) for chunk in chunks], ignore_index=True)
+    for col in category_cols:
+        # Chunks carry their own category sets; union them instead of falling back to object
+        df[col] = pd.Categorical(union_categoricals([chunk[col] for chunk in chunks], ignore_order=True))
+    df = df[columns]
+    del chunks
+
+    sample_bytes = int(sample.memory_usage(deep=True).sum())
+    estimated_before = int(sample_bytes * total_rows / len(sample)) if len(sample) else 0
+    memory_after = int(df.memory_usage(deep=True).sum())
+
+    report = {
+        "rows": total_rows,
+        "chunks": -(-total_rows // chunk_rows),
+        "sample_rows": len(sample),
+        "memory_before_bytes": estimated_before,
+        "memory_before_estimated": len(sample) < total_rows,
+        "memory_after_bytes": memory_after,
+        "memory_reduction_pct": round((1 - memory_after / estimated_before) * 100, 2) if estimated_before else 0.0,
+        "category_columns": category_cols,
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()}
+    }
+    return df, report
@@ -0,0 +1,35 @@
+# backend/utils/json_utils.py
+
+import json
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+
+def _json_key(key: Any) -> Any:
+    if isinstance(key, np.generic):
+        key = key.item()
+    if isinstance(key, (str, int, float, bool)) or key is None:
+        return key
+    return str(key)
+
+
+def _to_builtin(obj: Any) -> Any:
+    """Recursively convert numpy scalars/arrays and non-string keys to JSON-friendly values"""
+    if isinstance(obj, dict):
+        return {_json_key(key): _to_builtin(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return obj
+
+
+def dumps(obj: Any) -> str:
+    """json.dumps for analysis results, which are full of numpy types and dtype keys"""
+    return json.dumps(_to_builtin(obj), default=str)
@@ -0,0 +1,56 @@
+# backend/utils/sampling_utils.py
+
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+
+def stratified_sample(df: pd.DataFrame, target_col: str, n: int, task_type: str,
+                      random_state: int = 42) -> pd.DataFrame:
+    """Draw about n rows while preserving the target distribution
+
+    Classification targets are sampled per class (every class keeps at least one row);
+    regression targets are sampled per quantile bin.
+    """
+    if n >= len(df):
+        return df
+
+    fraction = n / len(df)
+    if task_type == "classification":
+        strata = df[target_col].astype(str)
+    else:
+        try:
+            strata = pd.qcut(df[target_col], q=10, duplicates='drop').astype(str)
+        except (TypeError, ValueError):
+            return df.sample(n=n, random_state=random_state)
+
+    sampled_index = []
+    for _, group in df.groupby(strata, sort=False):
+        size = max(1, int(round(len(group) * fraction)))
+        sampled_index.extend(group.sample(n=min(size, len(group)), random_state=random_state).index)
+
+    return df.loc[sampled_index]
+
+
+def bootstrap_ci(y_true, y_pred, metric_fn: Callable, n_boot: int = 200, alpha: float = 0.05,
+                 random_state: int = 42) -> Dict[str, float]:
+    """Percentile bootstrap confidence interval for metric_fn(y_true, y_pred)"""
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    rng = np.random.default_rng(random_state)
+
+    scores = []
+    for _ in range(n_boot):
+        idx = rng.integers(0, len(y_true), len(y_true))
+        try:
+            scores.append(metric_fn(y_true[idx], y_pred[idx]))
+        except ValueError:
+            continue
+
+    if not scores:
+        return {}
+
+    lower, upper = np.percentile(scores, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return {"lower": float(lower), "upper": float(upper), "confidence": 1 - alpha, "n_boot": len(scores)}
+
@@ -0,0 +1,55 @@
+# backend/utils/upload_utils.py
+
+import hashlib
+import os
+import time
+from typing import Dict, Any
+
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', str(2 * 1024 * 1024 * 1024)))
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+async def save_upload(file: UploadFile, dest_path: str, max_bytes: int = MAX_UPLOAD_BYTES,
+                      chunk_size: int = UPLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+    """Stream an upload to disk in fixed-size chunks, hashing as it goes
+
+    Aborts as soon as more than max_bytes have been read and removes the partial file.
+    Returns the byte count, sha256 digest and throughput of the copy.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(f"{file.filename} is {file.size} bytes, limit is {max_bytes} bytes")
+
+    digest = hashlib.sha256()
+    total = 0
+    started = time.perf_counter()
+
+    try:
+        with open(dest_path, "wb") as buffer:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_bytes:
+                    raise UploadTooLargeError(f"{file.filename} exceeds the {max_bytes} byte upload limit")
+                digest.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        "filename": file.filename,
+        "bytes": total,
+        "sha256": digest.hexdigest(),
+        "seconds": round(elapsed, 4),
+        "throughput_mb_s": round(total / (1024 * 1024) / elapsed, 2) if elapsed > 0 else None
+    }
@@ -45,7 +45,13 @@ function App() {
     try {
       setLoading(true);
       const response = await apiService.getSession(sessionId);
-      setAnalysisResults(response);
+      const { status, job_id: jobId } = response.session || {};
+      // A session whose analysis job has not finished yet has no results to show
+      if ((status === 'queued' || status === 'running') && jobId) {
+        setAnalysisResults(await apiService.waitForJob(jobId));
+      } else {
+        setAnalysisResults(response);
+      }
     } catch (error) {
       console.error('Error loading session results:', error);
     } finally {
@@ -10,6 +10,8 @@ const ChatInterface = ({ sessionId, analysisResults }) => {
   const [isLoading, setIsLoading] = useState(false);
   const [ws, setWs] = useState(null);
   const messagesEndRef = useRef(null);
+  // Id of the bot message being built from websocket deltas, if one is in progress
+  const streamingIdRef = useRef(null);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -35,16 +37,41 @@ const ChatInterface = ({ sessionId, analysisResults }) => {
         const websocket = apiService.connectWebSocket(
           sessionId,
           (data) => {
-            setMessages(prev => [...prev, {
-              id: Date.now() + Math.random(),
-              type: 'bot',
-              content: data.response,
-              timestamp: data.timestamp
-            }]);
+            // The server streams {type: 'delta'} frames, then one {type: 'done'} or {type: 'error'}
+            if (data.type === 'delta') {
+              if (streamingIdRef.current === null) {
+                const id = Date.now() + Math.random();
+                streamingIdRef.current = id;
+                setMessages(prev => [...prev, { id, type: 'bot', content: data.content, streaming: true }]);
+              } else {
+                const id = streamingIdRef.current;
+                setMessages(prev => prev.map(message =>
+                  message.id === id ? { ...message, content: message.content + data.content } : message
+                ));
+              }
+              return;
+            }
+
+            const id = streamingIdRef.current;
+            streamingIdRef.current = null;
+            const final = data.type === 'error'
+              ? { content: data.partial || 'Sorry, I could not generate a response.', timestamp: new Date().toISOString() }
+              : { content: data.response, timestamp: data.timestamp };
+
+            if (data.type === 'error') {
+              toast.error(`Chat failed: ${data.error}`);
+            }
+            setMessages(prev => id === null
+              ? [...prev, { id: Date.now() + Math.random(), type: 'bot', ...final }]
+              : prev.map(message => message.id === id ? { ...message, ...final, streaming: false } : message)
+            );
             setIsLoading(false);
           },
           (error) => {
             console.error('WebSocket error:', error);
+            const id = streamingIdRef.current;
+            streamingIdRef.current = null;
+            setMessages(prev => prev.map(message => message.id === id ? { ...message, streaming: false } : message));
             setIsLoading(false);
           }
         );
@@ -175,7 +202,7 @@ const ChatInterface = ({ sessionId, analysisResults }) => {
           </div>
         ))}
 
-        {isLoading && (
+        {isLoading && !messages.some(message => message.streaming) && (
           <div className="flex justify-start">
             <div className="bg-gray-100 text-gray-900 max-w-xs lg:max-w-md px-4 py-2 rounded-lg">
               <div className="flex items-center space-x-2">
@@ -11,6 +11,7 @@ const UploadInterface = ({ onUploadComplete, loading, setLoading }) => {
   const [targetColumn, setTargetColumn] = useState('');
   const [files, setFiles] = useState({ dataset: null, pdf: null, chart: null });
   const [uploadProgress, setUploadProgress] = useState(0);
+  const [jobStatus, setJobStatus] = useState(null);
 
   const onDatasetDrop = useCallback((acceptedFiles) => {
     const file = acceptedFiles[0];
@@ -88,7 +89,7 @@ const UploadInterface = ({ onUploadComplete, loading, setLoading }) => {
         formData.append('pdf_file', files.pdf);
       }
 
-      const result = await apiService.uploadDataset(
+      const job = await apiService.uploadDataset(
         formData,
         (progressEvent) => {
           const progress = Math.round((progressEvent.loaded * 100) / progressEvent.total);
@@ -96,8 +97,12 @@ const UploadInterface = ({ onUploadComplete, loading, setLoading }) => {
         }
       );
 
+      // The upload only queues the analysis; wait for the job before showing results
+      setJobStatus(job.status);
+      const result = await apiService.waitForJob(job.job_id, setJobStatus);
+
       onUploadComplete(result);
-      toast.success('Dataset uploaded and analyzed successfully!');
+      toast.success('Analysis completed successfully!');
 
       // Reset form
       setFiles({ dataset: null, pdf: null, chart: null });
@@ -106,8 +111,9 @@ const UploadInterface = ({ onUploadComplete, loading, setLoading }) => {
 
     } catch (error) {
       console.error('Upload error:', error);
-      toast.error('Upload failed. Please try again.');
+      toast.error(error.isAxiosError ? 'Upload failed. Please try again.' : `Analysis failed: ${error.message}`);
     } finally {
+      setJobStatus(null);
       setLoading(false);
     }
   };
@@ -381,7 +387,11 @@ const UploadInterface = ({ onUploadComplete, loading, setLoading }) => {
         {loading && (
           <div className="mt-4">
             <div className="flex justify-between text-sm text-gray-600 mb-1">
-              <span>Processing...</span>
+              <span>
+                {jobStatus === 'queued' ? 'Waiting for an analysis worker...'
+                  : jobStatus === 'running' ? 'Analyzing dataset...'
+                  : 'Processing...'}
+              </span>
               <span>{uploadProgress}%</span>
             </div>
             <div className="w-full bg-gray-200 rounded-full h-2">
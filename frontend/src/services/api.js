@@ -59,7 +59,7 @@ export const apiService = {
     }
   },
 
-  // Upload dataset and run analysis
+  // Upload dataset and queue its analysis; resolves to { session_id, job_id, status }
   uploadDataset: async (formData, onUploadProgress) => {
     try {
       const response = await api.post('/upload-dataset', formData, {
@@ -69,13 +69,49 @@ export const apiService = {
         onUploadProgress,
       });
 
-      toast.success('Analysis completed successfully!');
+      toast.success('Dataset uploaded, analysis queued');
       return response.data;
     } catch (error) {
       throw error;
     }
   },
 
+  // Get analysis job status
+  getJobStatus: async (jobId) => {
+    try {
+      const response = await api.get(`/jobs/${jobId}`);
+      return response.data;
+    } catch (error) {
+      throw error;
+    }
+  },
+
+  // Get the results of a completed analysis job
+  getJobResult: async (jobId) => {
+    try {
+      const response = await api.get(`/jobs/${jobId}/result`);
+      return response.data;
+    } catch (error) {
+      throw error;
+    }
+  },
+
+  // Poll an analysis job until it finishes, then return its results
+  waitForJob: async (jobId, onStatus, interval = 2000) => {
+    for (;;) {
+      const job = await apiService.getJobStatus(jobId);
+      if (onStatus) onStatus(job.status);
+
+      if (job.status === 'completed') {
+        return apiService.getJobResult(jobId);
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Analysis failed');
+      }
+      await new Promise((resolve) => setTimeout(resolve, interval));
+    }
+  },
+
   // Analyze chart image
   analyzeChart: async (file, onUploadProgress) => {
     try {
@@ -180,10 +216,18 @@ export const apiService = {
     }
   },
 
-  // Get all sessions (for history)
-  getAllSessions: async (limit = 50) => {
+  // Get a page of sessions (for history); pass the previous page's next_cursor to continue
+  getAllSessions: async (limit = 50, { cursor, taskType, createdAfter, createdBefore } = {}) => {
     try {
-      const response = await api.get(`/sessions?limit=${limit}`);
+      const response = await api.get('/sessions', {
+        params: {
+          limit,
+          cursor,
+          task_type: taskType,
+          created_after: createdAfter,
+          created_before: createdBefore,
+        },
+      });
       return response.data;
     } catch (error) {
       throw error;
@@ -0,0 +1,78 @@
+# tests/conftest.py
+
+import os
+import shutil
+import tempfile
+
+# backend.modules.database opens its engine and runs the migrations at import time, so the
+# database and the upload/output folders point at a scratch directory before anything
+# under backend is imported
+SCRATCH_DIR = tempfile.mkdtemp(prefix="insightforge-tests-")
+os.environ["MONGO_URL"] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'insightforge.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["UPLOAD_FOLDER"] = os.path.join(SCRATCH_DIR, "uploads")
+os.environ["OUTPUT_FOLDER"] = os.path.join(SCRATCH_DIR, "outputs")
+os.environ["RETENTION_ENABLED"] = "false"
+os.environ["ENGINE_WARMUP"] = ""
+
+import pytest  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend.modules.database import ensure_schema, make_async_engine, make_engine  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """A fresh SQLite file per test, so tests never see each other's rows"""
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture
+def engine(db_url):
+    test_engine = make_engine(db_url)
+    ensure_schema(test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def client():
+    """TestClient for the app on the scratch database; startup tasks (warm-up, heartbeats) do not run"""
+    from fastapi.testclient import TestClient
+
+    from backend.server import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def app_session_factory():
+    """The app's own SessionLocal on the scratch database, emptied again after the test"""
+    from backend.modules.database import Base, SessionLocal, engine as app_engine
+
+    yield SessionLocal
+    with app_engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name != "schema_migrations":
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+async def async_session_factory(engine, db_url):
+    test_engine = make_async_engine(db_url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    yield async_sessionmaker(test_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    await test_engine.dispose()
@@ -0,0 +1,153 @@
+# tests/test_blob_store.py
+
+import json
+
+import pytest
+from sqlalchemy import select
+
+from backend.modules import blob_store, results_store
+from backend.modules.database import AnalysisResultSection, AnalysisSession, Blob, BlobChunk
+
+CHARTS = {f"chart_{i}": f"static/charts/chart_{i}.png" for i in range(100)}  # well past the inline limit
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def _refcounts(db) -> dict:
+    return dict(db.execute(select(Blob.key, Blob.refcount)).all())
+
+
+def _chunk_keys(db) -> set:
+    return set(db.execute(select(BlobChunk.blob_key)).scalars())
+
+
+def _add_session(db, charts=CHARTS) -> str:
+    session = AnalysisSession(task_type="regression", target_column="Y", status="completed")
+    db.add(session)
+    db.flush()
+    results_store.save_sections(db, session.id, {"eda": {"visualizations": charts}})
+    db.commit()
+    return session.id
+
+
+def test_identical_content_is_stored_once_and_referenced_twice(db):
+    first = blob_store.put(db, b"payload")
+    second = blob_store.put(db, b"payload")
+    db.commit()
+
+    assert first == second == blob_store.make_key(b"payload")
+    assert _refcounts(db) == {first: 2}
+
+
+@pytest.mark.parametrize("codec", ["zstd", "zlib", "none"])
+def test_multi_chunk_content_round_trips(db, monkeypatch, codec):
+    monkeypatch.setattr(blob_store, "BLOB_CHUNK_BYTES", 64)
+    content = bytes(range(256)) * 2 + b"tail"
+
+    key = blob_store.put(db, content, codec=codec)
+    db.commit()
+
+    blob = db.get(Blob, key)
+    assert (blob.codec, blob.raw_size, blob.chunk_count) == (codec, len(content), 9)
+    assert [len(chunk) for chunk in blob_store.iter_chunks(db, key)] == [64] * 8 + [4]
+    assert blob_store.read(db, key) == content
+
+
+def test_reading_a_missing_blob_raises_key_error(db):
+    with pytest.raises(KeyError):
+        blob_store.read(db, "missing")
+
+
+def test_release_deletes_a_blob_and_its_chunks_at_zero_references(db):
+    shared = blob_store.put(db, b"shared")
+    blob_store.put(db, b"shared")
+    single = blob_store.put(db, b"single")
+    db.commit()
+
+    assert blob_store.release(db, [shared, single, None]) == 1
+    db.commit()
+
+    assert _refcounts(db) == {shared: 1}
+    assert _chunk_keys(db) == {shared}
+    assert blob_store.read(db, shared) == b"shared"
+
+
+def test_a_repeated_key_drops_one_reference_per_occurrence(db):
+    key = blob_store.put(db, b"twice")
+    blob_store.put(db, b"twice")
+    db.commit()
+
+    assert blob_store.release(db, [key, key]) == 1
+    assert blob_store.release(db, []) == 0
+    db.commit()
+
+    assert _refcounts(db) == {}
+    assert _chunk_keys(db) == set()
+
+
+def test_large_sections_are_stored_as_blobs_shared_across_sessions(db):
+    first = _add_session(db)
+    second = _add_session(db)
+
+    rows = db.query(AnalysisResultSection).filter(AnalysisResultSection.section == "visualizations").all()
+    assert {row.data for row in rows} == {None}
+    assert len({row.blob_key for row in rows}) == 1
+    assert list(_refcounts(db).values()) == [2]
+    assert results_store.load_sections(db, first, ["visualizations"]) == {"visualizations": CHARTS}
+
+    results_store.delete_sections(db, second)
+    db.commit()
+
+    assert list(_refcounts(db).values()) == [1]
+    assert results_store.load_sections(db, first, ["visualizations"]) == {"visualizations": CHARTS}
+
+
+def test_saving_new_results_releases_the_old_blob(db):
+    session_id = _add_session(db)
+    old_key = next(iter(_refcounts(db)))
+    fewer = dict(list(CHARTS.items())[:60])
+
+    results_store.save_sections(db, session_id, {"eda": {"visualizations": fewer}})
+    db.commit()
+
+    assert old_key not in _refcounts(db)
+    assert old_key not in _chunk_keys(db)
+    assert results_store.load_sections(db, session_id, ["visualizations"]) == {"visualizations": fewer}
+
+
+def test_inline_sections_written_before_the_blob_store_are_moved_into_blobs(db, session_factory):
+    data = json.dumps(CHARTS)
+    db.add(AnalysisResultSection(session_id="s1", section="visualizations", data=data, size_bytes=len(data)))
+    db.add(AnalysisResultSection(session_id="s1", section="model_summary", data="{}", size_bytes=2))
+    db.commit()
+
+    assert results_store.migrate_inline_sections(session_factory, batch_size=1) == 1
+
+    db.expire_all()
+    assert results_store.load_sections(db, "s1") == {"visualizations": CHARTS, "model_summary": {}}
+    assert db.get(AnalysisResultSection, ("s1", "model_summary")).blob_key is None
+
+
+def test_session_delete_endpoint_releases_the_sessions_blobs(client, app_session_factory):
+    db = app_session_factory()
+    try:
+        kept = _add_session(db)
+        deleted = _add_session(db, charts={**CHARTS, "extra": "static/charts/extra.png"})
+        assert len(_refcounts(db)) == 2
+    finally:
+        db.close()
+
+    assert client.delete(f"/api/sessions/{deleted}").status_code == 200
+
+    db = app_session_factory()
+    try:
+        assert list(_refcounts(db).values()) == [1]
+        assert results_store.load_sections(db, kept, ["visualizations"]) == {"visualizations": CHARTS}
+        assert client.get("/api/storage/stats").json()["blobs"]["blobs"] == 1
+    finally:
+        db.close()
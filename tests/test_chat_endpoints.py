@@ -0,0 +1,61 @@
+# tests/test_chat_endpoints.py
+
+import json
+
+import httpx
+import pytest
+
+from backend.modules.conversation_memory import ConversationMemoryStore
+from backend.modules.enhanced_chat import IntelligentChatEngine
+
+
+def _event(delta: str) -> str:
+    return f"data: {json.dumps({'choices': [{'delta': {'content': delta}}]})}\n\n"
+
+
+@pytest.fixture
+def chat_engine(session_factory, monkeypatch):
+    """Chat engine on the test database whose upstream streams "Hello there" back"""
+    from backend import server
+
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=(_event("Hello") + _event(" there") + "data: [DONE]\n\n").encode())
+
+    engine = IntelligentChatEngine("key", "https://llm.test/v1/chat/completions", "test-model",
+                                   memory_store=ConversationMemoryStore(session_factory))
+    engine.client._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    monkeypatch.setattr(server, "get_engine", lambda name: engine)
+    return engine
+
+
+def test_websocket_streams_deltas_then_the_stored_answer(client, chat_engine):
+    with client.websocket_connect("/api/ws/chat/session-1") as websocket:
+        websocket.send_text(json.dumps({"message": "Hi"}))
+        frames = [json.loads(websocket.receive_text()) for _ in range(3)]
+
+    assert frames[0] == {"type": "delta", "content": "Hello"}
+    assert frames[1] == {"type": "delta", "content": " there"}
+    assert frames[2]["type"] == "done"
+    assert frames[2]["response"] == "Hello there"
+    history = chat_engine.memory_store.history("session-1")
+    assert [(turn["id"], turn["message"], turn["response"]) for turn in history] == [
+        (frames[2]["message_id"], "Hi", "Hello there")
+    ]
+
+
+def test_websocket_reports_upstream_errors_and_keeps_the_connection(client, chat_engine):
+    async def failing(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, text="bad request")
+
+    chat_engine.client._client = httpx.AsyncClient(transport=httpx.MockTransport(failing))
+
+    with client.websocket_connect("/api/ws/chat/session-1") as websocket:
+        websocket.send_text(json.dumps({"message": "Hi"}))
+        error = json.loads(websocket.receive_text())
+        websocket.send_text(json.dumps({"message": "Again"}))
+        again = json.loads(websocket.receive_text())
+
+    assert error["type"] == "error"
+    assert "400" in error["error"]
+    assert again["type"] == "error"
+    assert chat_engine.memory_store.history("session-1") == []
@@ -0,0 +1,193 @@
+# tests/test_chat_write_queue.py
+
+import uuid
+from datetime import datetime
+
+import anyio
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from backend.modules.chat_write_queue import ChatWriteQueue
+from backend.modules.conversation_memory import ConversationMemoryStore
+from backend.modules.database import ChatMessage
+
+
+def _row(session_id="s1", message="hi", row_id=None) -> ChatMessage:
+    return ChatMessage(id=row_id or str(uuid.uuid4()), session_id=session_id, message=message,
+                       response=f"re: {message}", context_type="general", timestamp=datetime.utcnow())
+
+
+def _stored(session_factory, session_id="s1") -> list:
+    db = session_factory()
+    try:
+        rows = db.query(ChatMessage).filter(ChatMessage.session_id == session_id).order_by(ChatMessage.timestamp)
+        return [row.message for row in rows]
+    finally:
+        db.close()
+
+
+async def _wait_for(condition, timeout=2.0) -> None:
+    with anyio.fail_after(timeout):
+        while not condition():
+            await anyio.sleep(0.01)
+
+
+@pytest.fixture
+async def make_queue(async_session_factory):
+    """Builds queues whose background flush waits a minute unless a test says otherwise"""
+    queues = []
+
+    def _make(**kwargs) -> ChatWriteQueue:
+        queue = ChatWriteQueue(async_session_factory, **{"flush_interval": 60, **kwargs})
+        queues.append(queue)
+        return queue
+
+    yield _make
+    for queue in queues:
+        await queue.aclose()
+
+
+def _fail_inserts(queue, times=1) -> None:
+    insert = queue._insert
+    failures = {"left": times}
+
+    async def _insert(rows):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise OperationalError("INSERT INTO chat_messages", {}, Exception("database is locked"))
+        await insert(rows)
+
+    queue._insert = _insert
+
+
+@pytest.mark.anyio
+async def test_queued_rows_are_pending_until_flushed(make_queue, session_factory):
+    queue = make_queue()
+    await queue.enqueue(_row(message="one"))
+    await queue.enqueue(_row(message="two"))
+    await queue.enqueue(_row(session_id="s2"))
+
+    assert [row.message for row in queue.pending("s1")] == ["one", "two"]
+    assert _stored(session_factory) == []
+
+    assert await queue.flush() == 3
+    assert queue.pending("s1") == []
+    assert _stored(session_factory) == ["one", "two"]
+    assert queue.get_stats()["batches"] == 1
+
+
+@pytest.mark.anyio
+async def test_a_full_batch_is_written_without_waiting_for_the_interval(make_queue, session_factory):
+    queue = make_queue(batch_size=2)
+
+    await queue.enqueue(_row(message="one"))
+    await queue.enqueue(_row(message="two"))
+
+    await _wait_for(lambda: queue.get_stats()["written"] == 2)
+    assert _stored(session_factory) == ["one", "two"]
+
+
+@pytest.mark.anyio
+async def test_a_partial_batch_is_written_after_the_flush_interval(make_queue, session_factory):
+    queue = make_queue(flush_interval=0.01)
+
+    await queue.enqueue(_row(message="one"))
+
+    await _wait_for(lambda: queue.get_stats()["pending"] == 0)
+    assert _stored(session_factory) == ["one"]
+
+
+@pytest.mark.anyio
+async def test_a_failed_batch_stays_queued_and_is_retried(make_queue, session_factory):
+    queue = make_queue()
+    _fail_inserts(queue)
+    await queue.enqueue(_row(message="one"))
+
+    assert await queue.flush() == 0
+    assert queue.get_stats()["failed_batches"] == 1
+    assert [row.message for row in queue.pending("s1")] == ["one"]
+
+    assert await queue.flush() == 1
+    assert _stored(session_factory) == ["one"]
+
+
+@pytest.mark.anyio
+async def test_rows_the_database_rejects_are_dropped_without_blocking_the_batch(make_queue, session_factory):
+    queue = make_queue()
+    await queue.enqueue(_row(message="first", row_id="taken"))
+    await queue.flush()
+
+    await queue.enqueue(_row(message="before"))
+    await queue.enqueue(_row(message="duplicate", row_id="taken"))
+    await queue.enqueue(_row(message="after"))
+
+    assert await queue.flush() == 2
+    assert _stored(session_factory) == ["first", "before", "after"]
+    stats = queue.get_stats()
+    assert (stats["dropped"], stats["pending"], stats["failed_batches"]) == (1, 0, 0)
+
+
+@pytest.mark.anyio
+async def test_discard_drops_only_that_sessions_rows(make_queue, session_factory):
+    queue = make_queue()
+    await queue.enqueue(_row(session_id="gone"))
+    await queue.enqueue(_row(session_id="kept", message="stays"))
+
+    await queue.discard("gone")
+    await queue.flush()
+
+    assert _stored(session_factory, "gone") == []
+    assert _stored(session_factory, "kept") == ["stays"]
+    assert queue.get_stats()["discarded"] == 1
+
+
+@pytest.mark.anyio
+async def test_a_full_queue_flushes_before_accepting_more(make_queue, session_factory):
+    queue = make_queue(max_pending=2)
+    await queue.enqueue(_row(message="one"))
+    await queue.enqueue(_row(message="two"))
+
+    await queue.enqueue(_row(message="three"))
+
+    assert _stored(session_factory) == ["one", "two"]
+    assert [row.message for row in queue.pending("s1")] == ["three"]
+
+
+@pytest.mark.anyio
+async def test_a_full_queue_that_cannot_flush_refuses_new_rows(make_queue):
+    queue = make_queue(max_pending=2)
+    _fail_inserts(queue, times=10)
+    await queue.enqueue(_row())
+    await queue.enqueue(_row())
+
+    with pytest.raises(RuntimeError):
+        await queue.enqueue(_row())
+    assert queue.get_stats()["pending"] == 2
+
+
+@pytest.mark.anyio
+async def test_aclose_writes_what_is_still_queued(make_queue, session_factory):
+    queue = make_queue()
+    await queue.enqueue(_row(message="last words"))
+
+    await queue.aclose()
+
+    assert _stored(session_factory) == ["last words"]
+    assert queue._task is None
+
+
+@pytest.mark.anyio
+async def test_memory_store_reads_queued_turns_before_they_are_written(make_queue, session_factory,
+                                                                        async_session_factory):
+    queue = make_queue()
+    store = ConversationMemoryStore(session_factory, async_session_factory=async_session_factory, write_queue=queue)
+
+    turn_id = await store.arecord("s1", "hi", "hello")
+
+    assert [turn["id"] for turn in await store.ahistory("s1")] == [turn_id]
+    assert _stored(session_factory) == []
+
+    await queue.flush()
+
+    assert [turn["id"] for turn in await store.ahistory("s1")] == [turn_id]
+    assert _stored(session_factory) == ["hi"]
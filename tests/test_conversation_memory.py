@@ -0,0 +1,82 @@
+# tests/test_conversation_memory.py
+
+from datetime import datetime, timedelta
+
+from backend.modules.conversation_memory import ConversationMemoryStore
+from backend.modules.database import ChatMessage
+
+
+def _insert(session_factory, session_id: str, message: str, timestamp: datetime) -> None:
+    """A row written by some other worker"""
+    db = session_factory()
+    try:
+        db.add(ChatMessage(session_id=session_id, message=message, response=f"re: {message}", timestamp=timestamp))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _messages(history) -> list:
+    return [turn["message"] for turn in history]
+
+
+def test_record_and_history_keep_the_last_turns_in_order(session_factory):
+    store = ConversationMemoryStore(session_factory, max_turns=3)
+
+    for i in range(5):
+        store.record("s1", f"q{i}", f"a{i}")
+
+    assert _messages(store.history("s1")) == ["q2", "q3", "q4"]
+    assert store.history("s2") == []
+
+
+def test_chat_without_a_session_is_not_persisted(session_factory):
+    store = ConversationMemoryStore(session_factory)
+
+    assert store.record(None, "q", "a") is None
+    assert store.history(None) == []
+
+
+def test_a_new_process_rebuilds_memory_from_chat_messages(session_factory):
+    ConversationMemoryStore(session_factory).record("s1", "q0", "a0")
+
+    restarted = ConversationMemoryStore(session_factory)
+
+    assert _messages(restarted.history("s1")) == ["q0"]
+    assert restarted.stats["rebuilds"] == 1
+
+
+def test_turns_recorded_by_another_worker_show_up(session_factory):
+    store = ConversationMemoryStore(session_factory)
+    store.record("s1", "q0", "a0")
+    store.history("s1")
+
+    ConversationMemoryStore(session_factory).record("s1", "q1", "a1")
+
+    assert _messages(store.history("s1")) == ["q0", "q1"]
+    assert store.stats["refreshed_turns"] == 1
+
+
+def test_turns_committed_out_of_timestamp_order_are_not_lost(session_factory):
+    store = ConversationMemoryStore(session_factory, refresh_overlap=60)
+    now = datetime.utcnow()
+    _insert(session_factory, "s1", "first", now - timedelta(seconds=10))
+    _insert(session_factory, "s1", "third", now)
+    assert _messages(store.history("s1")) == ["first", "third"]
+
+    # Stamped before the newest row this store has seen, committed after it was read
+    _insert(session_factory, "s1", "second", now - timedelta(seconds=5))
+
+    assert _messages(store.history("s1")) == ["first", "second", "third"]
+    assert _messages(store.history("s1")) == ["first", "second", "third"]
+
+
+def test_least_recently_used_sessions_are_evicted(session_factory):
+    store = ConversationMemoryStore(session_factory, max_sessions=2)
+    for session_id in ("s1", "s2", "s3"):
+        store.record(session_id, "q", "a")
+        store.history(session_id)
+
+    assert store.stats["evictions"] == 1
+    assert _messages(store.history("s1")) == ["q"]  # rebuilt from the table
+    assert store.stats["rebuilds"] == 4
@@ -0,0 +1,61 @@
+# tests/test_database_engines.py
+
+import pytest
+from sqlalchemy import text
+
+from backend.modules.database import SQLITE_PRAGMAS, ChatMessage, make_async_engine, make_engine
+
+NORMAL = 1
+
+
+def _pragmas(conn) -> tuple:
+    return tuple(conn.execute(text(f"PRAGMA {name}")).scalar() for name in ("journal_mode", "busy_timeout", "synchronous"))
+
+
+def test_sync_connections_get_the_sqlite_pragmas(engine):
+    with engine.connect() as conn:
+        assert _pragmas(conn) == ("wal", SQLITE_PRAGMAS["busy_timeout"], NORMAL)
+    assert engine.pool.size() == 5
+
+
+@pytest.mark.anyio
+async def test_async_connections_get_the_sqlite_pragmas(engine, db_url):
+    async_engine = make_async_engine(db_url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    try:
+        async with async_engine.connect() as conn:
+            assert await conn.run_sync(_pragmas) == ("wal", SQLITE_PRAGMAS["busy_timeout"], NORMAL)
+    finally:
+        await async_engine.dispose()
+
+
+def test_pragmas_can_be_turned_off(db_url):
+    plain = make_engine(db_url, pragmas=None)
+    try:
+        with plain.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    finally:
+        plain.dispose()
+
+
+def test_in_memory_databases_skip_the_pool_settings():
+    memory = make_engine("sqlite://")
+    try:
+        with memory.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        memory.dispose()
+
+
+@pytest.mark.anyio
+async def test_async_sessions_read_what_sync_sessions_wrote(session_factory, async_session_factory):
+    db = session_factory()
+    try:
+        db.add(ChatMessage(id="m1", session_id="s1", message="hi", response="hello"))
+        db.commit()
+    finally:
+        db.close()
+
+    async with async_session_factory() as db:
+        row = await db.get(ChatMessage, "m1")
+
+    assert row.response == "hello"
@@ -0,0 +1,71 @@
+# tests/test_dataset_store.py
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from backend.modules.dataset_store import DatasetStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DatasetStore(str(tmp_path / "datasets"))
+
+
+def test_write_then_read_a_column_subset(store):
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"], "c": [0.5, 1.5, 2.5]})
+
+    store.write("s1", "raw", df)
+
+    assert store.exists("s1", "raw")
+    assert not store.exists("s1", "cleaned")
+    assert store.columns("s1", "raw") == ["a", "b", "c"]
+    pd.testing.assert_frame_equal(store.read("s1", "raw", columns=["c", "a"]), df[["c", "a"]])
+
+
+def test_mixed_type_object_columns_are_stored_as_text(store):
+    df = pd.DataFrame({"mixed": [1, "two", 3.0]})
+
+    store.write("s1", "cleaned", df)
+
+    assert store.read("s1", "cleaned")["mixed"].tolist() == ["1", "two", "3.0"]
+
+
+def test_unknown_kind_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.path("s1", "derived")
+
+
+def test_iter_csv_streams_the_selected_columns(store):
+    df = pd.DataFrame({"a": range(5), "b": list("vwxyz")})
+    store.write("s1", "raw", df)
+
+    text = "".join(store.iter_csv("s1", "raw", columns=["b"]))
+
+    assert text.splitlines() == ["b", "v", "w", "x", "y", "z"]
+
+
+def test_iter_csv_of_an_empty_dataset_still_has_a_header(store):
+    store.write("s1", "raw", pd.DataFrame({"a": pd.Series([], dtype="int64"), "b": pd.Series([], dtype="str")}))
+
+    assert "".join(store.iter_csv("s1", "raw")).splitlines() == ["a,b"]
+
+
+def test_delete_removes_the_session_directory(store):
+    store.write("s1", "raw", pd.DataFrame({"a": [1]}))
+
+    store.delete("s1")
+
+    assert not store.exists("s1", "raw")
+
+
+def test_resolve_columns_normalizes_like_the_upload():
+    from backend.server import _resolve_columns
+
+    available = ["Age", "Monthlyincome", "Target"]
+
+    assert _resolve_columns(available, "age, monthly income,Age,") == ["Age", "Monthlyincome"]
+    with pytest.raises(HTTPException) as error:
+        _resolve_columns(available, "age,salary")
+    assert error.value.status_code == 400
+    assert "salary" in error.value.detail
@@ -0,0 +1,60 @@
+# tests/test_engine_registry.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.modules.engine_registry import EngineRegistry
+
+
+def test_engines_are_built_once_on_first_use():
+    builds = []
+    registry = EngineRegistry()
+    registry.register("engine", lambda: builds.append(1) or object())
+
+    assert not registry.is_loaded("engine")
+    assert builds == []
+
+    first = registry.get("engine")
+
+    assert registry.get("engine") is first
+    assert builds == [1]
+    assert registry.status()["engine"]["loaded"]
+
+
+def test_concurrent_first_requests_share_one_build():
+    builds = []
+    started = threading.Event()
+
+    def slow_factory():
+        builds.append(1)
+        started.set()
+        time.sleep(0.2)
+        return object()
+
+    registry = EngineRegistry()
+    registry.register("engine", slow_factory)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        instances = list(pool.map(lambda _: registry.get("engine"), range(8)))
+
+    assert builds == [1]
+    assert all(instance is instances[0] for instance in instances)
+
+
+def test_unknown_engine_raises_key_error():
+    with pytest.raises(KeyError):
+        EngineRegistry().get("missing")
+
+
+def test_warm_up_continues_past_a_failing_factory():
+    registry = EngineRegistry()
+    registry.register("broken", lambda: 1 / 0)
+    registry.register("working", object)
+
+    registry.warm_up()
+
+    assert not registry.is_loaded("broken")
+    assert registry.is_loaded("working")
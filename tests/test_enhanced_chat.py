@@ -0,0 +1,33 @@
+# tests/test_enhanced_chat.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend.modules.enhanced_chat import IntelligentChatEngine
+
+
+def _engine(handler) -> IntelligentChatEngine:
+    engine = IntelligentChatEngine("key", "https://llm.test/v1/chat/completions", "test-model")
+    engine.client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return engine
+
+
+@pytest.mark.anyio
+async def test_identical_prompts_in_flight_share_one_upstream_call():
+    requests = []
+
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "answer"}}]})
+
+    engine = _engine(upstream)
+
+    answers = await asyncio.gather(*(engine._complete("same prompt") for _ in range(4)),
+                                   engine._complete("other prompt"))
+
+    assert answers == ["answer"] * 5
+    assert len(requests) == 2
+    assert engine.single_flight.get_stats()["coalesced"] == 3
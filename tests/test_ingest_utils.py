@@ -0,0 +1,65 @@
+# tests/test_ingest_utils.py
+
+import numpy as np
+import pandas as pd
+
+from backend.utils.ingest_utils import downcast_numeric, infer_category_columns, read_csv_optimized
+
+
+def test_only_low_cardinality_text_becomes_category():
+    sample = pd.DataFrame({
+        "city": ["Paris", "Lyon"] * 50,
+        "id": [f"user-{i}" for i in range(100)],
+        "amount": [str(i) for i in range(100)],
+        "empty": [None] * 100,
+    })
+
+    assert infer_category_columns(sample) == ["city"]
+
+
+def test_downcast_keeps_values_exact():
+    df = pd.DataFrame({
+        "small": np.array([1, 2, 3], dtype="int64"),
+        "halves": np.array([0.5, 1.5, np.nan], dtype="float64"),
+        "tenths": np.array([0.1, 0.2, 0.3], dtype="float64"),
+    })
+
+    result = downcast_numeric(df)
+
+    assert result["small"].dtype == np.int8
+    assert result["halves"].dtype == np.float32
+    assert result["tenths"].dtype == np.float64
+
+
+def test_chunked_read_matches_a_plain_read(tmp_path):
+    path = tmp_path / "data.csv"
+    rows = 50
+    # The second half introduces a category the first chunk never saw
+    pd.DataFrame({
+        "label": ["yes"] * 25 + ["no"] * 25,
+        "count": range(rows),
+        "score": [i / 2 for i in range(rows)],
+    }).to_csv(path, index=False)
+
+    df, report = read_csv_optimized(str(path), sample_rows=10, chunk_rows=20)
+
+    assert report["rows"] == rows
+    assert report["chunks"] == 3
+    assert report["category_columns"] == ["label"]
+    assert df["label"].dtype == "category"
+    assert set(df["label"].cat.categories) == {"yes", "no"}
+    expected = pd.read_csv(path)
+    assert df["label"].astype(str).tolist() == expected["label"].tolist()
+    assert df["count"].tolist() == expected["count"].tolist()
+    assert df["score"].tolist() == expected["score"].tolist()
+    assert list(df.columns) == ["label", "count", "score"]
+
+
+def test_header_only_csv_returns_an_empty_frame(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("a,b\n")
+
+    df, report = read_csv_optimized(str(path))
+
+    assert report["rows"] == 0
+    assert list(df.columns) == ["a", "b"]
@@ -0,0 +1,79 @@
+# tests/test_job_queue.py
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.modules.database import AnalysisSession
+from backend.modules.job_queue import AnalysisJobQueue, JobQueueFullError
+
+
+def _add_session(session_factory, **fields) -> str:
+    session_id = str(uuid.uuid4())
+    db = session_factory()
+    try:
+        db.add(AnalysisSession(id=session_id, task_type="classification", target_column="Target", **fields))
+        db.commit()
+    finally:
+        db.close()
+    return session_id
+
+
+def _session(session_factory, session_id: str) -> AnalysisSession:
+    db = session_factory()
+    try:
+        return db.get(AnalysisSession, session_id)
+    finally:
+        db.close()
+
+
+def test_fail_interrupted_jobs_only_fails_stale_jobs(session_factory, db_url):
+    queue = AnalysisJobQueue(session_factory, db_url)
+    now = datetime.utcnow()
+    live = _add_session(session_factory, status="running", job_owner="other-host:1:abcd", heartbeat_at=now)
+    stale = _add_session(session_factory, status="running", job_owner="gone-host:2:abcd",
+                         heartbeat_at=now - timedelta(hours=1))
+    legacy = _add_session(session_factory, status="queued")
+    finished = _add_session(session_factory, status="completed")
+
+    assert queue.fail_interrupted_jobs() == 2
+
+    assert _session(session_factory, live).status == "running"
+    assert _session(session_factory, stale).status == "failed"
+    assert _session(session_factory, legacy).status == "failed"
+    assert _session(session_factory, legacy).error.startswith("Interrupted")
+    assert _session(session_factory, finished).status == "completed"
+
+
+@pytest.mark.anyio
+async def test_job_runs_on_the_pool_and_only_live_jobs_get_heartbeats(session_factory, db_url):
+    queue = AnalysisJobQueue(session_factory, db_url, max_workers=1, max_pending=1)
+    stale_heartbeat = datetime.utcnow() - timedelta(hours=1)
+    submitted = _add_session(session_factory, status="queued", job_owner=queue.owner, heartbeat_at=stale_heartbeat)
+    never_submitted = _add_session(session_factory, status="queued", job_owner=queue.owner,
+                                   heartbeat_at=stale_heartbeat)
+    try:
+        queue.submit("job-1", submitted, time.sleep, 1.0)
+        with pytest.raises(JobQueueFullError):
+            queue.submit("job-2", never_submitted, time.sleep, 1.0)
+
+        deadline = time.monotonic() + 60
+        while _session(session_factory, submitted).status == "queued":
+            assert time.monotonic() < deadline, "the worker never marked the job running"
+            await asyncio.sleep(0.05)
+
+        assert queue.heartbeat() == 1
+        assert _session(session_factory, submitted).heartbeat_at > stale_heartbeat
+        assert _session(session_factory, never_submitted).heartbeat_at == stale_heartbeat
+
+        while queue.pending:
+            assert time.monotonic() < deadline, "the job never finished"
+            await asyncio.sleep(0.05)
+        row = _session(session_factory, submitted)
+        assert row.status == "completed"
+        assert row.completed_at is not None
+    finally:
+        queue.shutdown()
@@ -0,0 +1,114 @@
+# tests/test_llm_cache.py
+
+import httpx
+import pytest
+
+from backend.modules import llm_cache
+from backend.modules.database import LLMCacheEntry
+from backend.modules.enhanced_chat import IntelligentChatEngine
+from backend.modules.llm_cache import LLMResponseCache
+
+
+def _rows(session_factory) -> dict:
+    db = session_factory()
+    try:
+        return {row.key: row for row in db.query(LLMCacheEntry).all()}
+    finally:
+        db.close()
+
+
+def test_key_ignores_whitespace_but_not_sampling_parameters():
+    key = LLMResponseCache.make_key("Describe  the\n data", "model", 0.7, 100)
+
+    assert key == LLMResponseCache.make_key(" Describe the data ", "model", 0.7, 100)
+    assert key != LLMResponseCache.make_key("Describe the data", "model", 0.2, 100)
+    assert key != LLMResponseCache.make_key("Describe the data", "other-model", 0.7, 100)
+
+
+def test_ttl_overrides_apply_per_context_type(session_factory):
+    cache = LLMResponseCache(session_factory, ttl_seconds={"general": 60})
+
+    assert cache.ttl_for("general") == 60
+    assert cache.ttl_for("chart_insights") == 7 * 24 * 3600
+    assert cache.ttl_for("unknown") == 60
+
+
+def test_hits_come_from_memory_then_from_sqlite_in_another_process(session_factory):
+    cache = LLMResponseCache(session_factory)
+    cache.put("key", "answer")
+
+    assert cache.get("key") == "answer"
+    assert cache.get_stats()["memory_hits"] == 1
+
+    other_worker = LLMResponseCache(session_factory)
+    assert other_worker.get("key") == "answer"
+    assert other_worker.get("key") == "answer"
+    assert other_worker.get_stats()["db_hits"] == 1
+    assert other_worker.get_stats()["memory_hits"] == 1
+    assert _rows(session_factory)["key"].hits == 1
+
+
+def test_expired_entries_are_misses_in_both_tiers(session_factory):
+    cache = LLMResponseCache(session_factory, ttl_seconds={"general": 0})
+    cache.put("key", "answer")
+
+    assert cache.get("key") is None
+    assert "key" not in _rows(session_factory)
+    stats = cache.get_stats()
+    assert stats["expired"] == 2
+    assert stats["misses"] == 1
+
+
+def test_storing_a_key_again_replaces_the_row(session_factory):
+    cache = LLMResponseCache(session_factory)
+    cache.put("key", "first")
+    cache.put("key", "second", context_type="chart_insights")
+
+    row = _rows(session_factory)["key"]
+    assert row.response == "second"
+    assert row.context_type == "chart_insights"
+    assert LLMResponseCache(session_factory).get("key") == "second"
+
+
+def test_memory_tier_evicts_least_recently_used(session_factory):
+    cache = LLMResponseCache(session_factory, memory_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["memory_entries"] == 2
+    assert cache.get("b") == "2"  # evicted from memory, still in SQLite
+    assert cache.get_stats()["db_hits"] == 1
+
+
+def test_sqlite_tier_is_pruned_to_its_size_limit(session_factory, monkeypatch):
+    monkeypatch.setattr(llm_cache, "PRUNE_EVERY_STORES", 3)
+    cache = LLMResponseCache(session_factory, db_entries=2)
+    cache.put("old", "1")
+    cache.put("recent", "2")
+    cache.put("newest", "3")
+
+    assert set(_rows(session_factory)) == {"recent", "newest"}
+    assert cache.get_stats()["evictions"] == 1
+
+
+class _BrokenCache(LLMResponseCache):
+    def get(self, key):
+        raise RuntimeError("database is locked")
+
+    def put(self, key, response, context_type="general"):
+        raise RuntimeError("database is locked")
+
+
+@pytest.mark.anyio
+async def test_cache_failures_do_not_fail_the_completion(session_factory):
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"choices": [{"message": {"content": " answer "}}]})
+
+    engine = IntelligentChatEngine("key", "https://llm.test/v1/chat/completions", "test-model",
+                                   response_cache=_BrokenCache(session_factory))
+    engine.client._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+
+    assert await engine._complete("prompt") == "answer"
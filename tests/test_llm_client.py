@@ -0,0 +1,299 @@
+# tests/test_llm_client.py
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from backend.modules import llm_client
+from backend.modules.llm_client import CircuitBreaker, CircuitOpenError, LLMAPIError, LLMClient, SingleFlight
+
+COMPLETION = {"choices": [{"message": {"content": "hello"}}]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    # Only the breaker's clock; the event loop keeps the real one
+    monkeypatch.setattr(llm_client, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+def _client(handler, **kwargs) -> LLMClient:
+    client = LLMClient("https://llm.test/v1/chat/completions", "key", backoff_base=0, **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _replies(*responses):
+    """Handler returning the given responses in order, recording every request"""
+    calls = []
+    queue = list(responses)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return queue.pop(0) if len(queue) > 1 else queue[0]
+
+    return handler, calls
+
+
+def test_breaker_opens_after_the_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.state == "closed"
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_admits_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_and_successful_probe_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+@pytest.mark.anyio
+async def test_transient_errors_are_retried():
+    handler, calls = _replies(httpx.Response(503), httpx.Response(429), httpx.Response(200, json=COMPLETION))
+    client = _client(handler, max_retries=3)
+
+    assert await client.chat_completion({"messages": []}) == COMPLETION
+    assert len(calls) == 3
+    assert client.get_stats()["retries"] == 2
+    assert client.breaker.failures == 0
+
+
+@pytest.mark.anyio
+async def test_client_errors_raise_without_retrying_or_tripping_the_breaker():
+    handler, calls = _replies(httpx.Response(400, text="bad request"))
+    client = _client(handler)
+
+    with pytest.raises(LLMAPIError) as error:
+        await client.chat_completion({"messages": []})
+
+    assert error.value.status_code == 400
+    assert len(calls) == 1
+    assert client.breaker.failures == 0
+
+
+@pytest.mark.anyio
+async def test_open_circuit_fails_fast_without_calling_upstream(clock):
+    handler, calls = _replies(httpx.Response(500))
+    client = _client(handler, max_retries=0)
+    client.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    for _ in range(2):
+        with pytest.raises(LLMAPIError):
+            await client.chat_completion({"messages": []})
+    with pytest.raises(CircuitOpenError):
+        await client.chat_completion({"messages": []})
+
+    assert len(calls) == 2
+    assert client.get_stats()["circuit_state"] == "open"
+    assert client.get_stats()["rejected_open_circuit"] == 1
+
+
+@pytest.mark.anyio
+async def test_probe_with_an_unexpected_error_counts_once_and_releases_the_probe(clock):
+    handler, _ = _replies(httpx.Response(200, text="not json"))
+    client = _client(handler)
+    client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    client.breaker.record_failure()
+    clock.now += 30
+
+    with pytest.raises(json.JSONDecodeError):
+        await client.chat_completion({"messages": []})
+
+    assert client.get_stats()["failures"] == 1
+    assert client.breaker.state == "open"
+    clock.now += 30
+    assert client.breaker.allow()
+
+
+@pytest.mark.anyio
+async def test_concurrent_failures_are_each_counted():
+    gate = asyncio.Event()
+    arrived = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        arrived.append(request)
+        if len(arrived) == 2:
+            gate.set()
+        await gate.wait()
+        return httpx.Response(500)
+
+    client = _client(handler, max_retries=0)
+
+    results = await asyncio.gather(client.chat_completion({"n": 1}), client.chat_completion({"n": 2}),
+                                   return_exceptions=True)
+
+    assert all(isinstance(result, LLMAPIError) for result in results)
+    assert client.breaker.failures == 2
+
+
+def _event(delta: str) -> str:
+    return f"data: {json.dumps({'choices': [{'delta': {'content': delta}}]})}\n\n"
+
+
+def _sse(*deltas: str) -> bytes:
+    events = ": keep-alive\n\n" + "".join(_event(delta) for delta in deltas)
+    return (events + "data: [DONE]\n\n" + _event("after done")).encode()
+
+
+async def _collect(client: LLMClient, deltas: list) -> list:
+    async for delta in client.stream_chat_completion({"messages": []}):
+        deltas.append(delta)
+    return deltas
+
+
+@pytest.mark.anyio
+async def test_stream_yields_content_deltas_until_done():
+    handler, calls = _replies(httpx.Response(200, content=_sse("Hel", "", "lo")))
+    client = _client(handler)
+
+    assert await _collect(client, []) == ["Hel", "lo"]
+    assert json.loads(calls[0].content)["stream"] is True
+
+
+@pytest.mark.anyio
+async def test_stream_retries_before_the_first_delta():
+    handler, calls = _replies(httpx.Response(502), httpx.Response(200, content=_sse("ok")))
+    client = _client(handler, max_retries=2)
+
+    assert await _collect(client, []) == ["ok"]
+    assert len(calls) == 2
+
+
+class _BreaksMidway(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        yield _event("Hel").encode()
+        raise httpx.ReadError("connection reset")
+
+
+@pytest.mark.anyio
+async def test_stream_that_breaks_midway_raises_without_retrying():
+    handler, calls = _replies(httpx.Response(200, stream=_BreaksMidway()))
+    client = _client(handler, max_retries=3)
+    deltas = []
+
+    with pytest.raises(httpx.ReadError):
+        await _collect(client, deltas)
+
+    assert deltas == ["Hel"]
+    assert len(calls) == 1
+    assert client.get_stats()["failures"] == 1
+
+
+class _Upstream:
+    """Call counter whose calls block until release() (or fail with error)"""
+
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.error = error
+        self._released = asyncio.Event()
+
+    def release(self) -> None:
+        self._released.set()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await self._released.wait()
+        if self.error is not None:
+            raise self.error
+        return f"result {self.calls}"
+
+
+@pytest.mark.anyio
+async def test_single_flight_coalesces_concurrent_calls_for_a_key():
+    flight = SingleFlight()
+    upstream = _Upstream()
+
+    waiters = [asyncio.ensure_future(flight.do("key", upstream)) for _ in range(5)]
+    await asyncio.sleep(0)
+    upstream.release()
+
+    assert await asyncio.gather(*waiters) == ["result 1"] * 5
+    assert upstream.calls == 1
+    assert flight.get_stats()["coalesced"] == 4
+    assert flight.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.anyio
+async def test_single_flight_runs_distinct_keys_and_later_calls_separately():
+    flight = SingleFlight()
+    upstream = _Upstream()
+    upstream.release()
+
+    assert await asyncio.gather(flight.do("a", upstream), flight.do("b", upstream)) == ["result 1", "result 2"]
+    assert await flight.do("a", upstream) == "result 3"
+
+
+@pytest.mark.anyio
+async def test_single_flight_propagates_the_error_to_every_waiter_and_forgets_the_key():
+    flight = SingleFlight()
+    failing = _Upstream(error=LLMAPIError(500, "boom"))
+
+    waiters = [asyncio.ensure_future(flight.do("key", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    failing.release()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, LLMAPIError) for result in results)
+    assert failing.calls == 1
+    working = _Upstream()
+    working.release()
+    assert await flight.do("key", working) == "result 1"
+
+
+@pytest.mark.anyio
+async def test_cancelling_one_waiter_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    upstream = _Upstream()
+
+    leader = asyncio.ensure_future(flight.do("key", upstream))
+    follower = asyncio.ensure_future(flight.do("key", upstream))
+    await asyncio.sleep(0)
+    leader.cancel()
+    upstream.release()
+
+    assert await follower == "result 1"
+    assert leader.cancelled()
@@ -0,0 +1,145 @@
+# tests/test_llm_scheduler.py
+
+import asyncio
+
+import pytest
+
+from backend.modules import llm_scheduler
+from backend.modules.llm_scheduler import LLMScheduler
+
+
+class _Calls:
+    """Tasks that take a scheduler slot and hold it until released, recording grant order"""
+
+    def __init__(self, scheduler: LLMScheduler):
+        self.scheduler = scheduler
+        self.granted = []
+        self.running = 0
+        self.peak = 0
+        self._release = {}
+
+    def start(self, name: str, priority: str = "interactive", tokens: int = 0, actual_tokens: int = None):
+        self._release[name] = asyncio.Event()
+        return asyncio.ensure_future(self._hold(name, priority, tokens, actual_tokens))
+
+    async def _hold(self, name, priority, tokens, actual_tokens):
+        async with self.scheduler.slot(priority, tokens) as slot:
+            self.granted.append(name)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await self._release[name].wait()
+            slot.actual_tokens = actual_tokens
+            self.running -= 1
+
+    async def release(self, name: str) -> None:
+        self._release[name].set()
+        await _settle()
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_total_concurrency_is_capped():
+    calls = _Calls(LLMScheduler(concurrency=2, caps={}, tpm_budget=0))
+    tasks = [calls.start(f"c{i}") for i in range(4)]
+    await _settle()
+
+    assert calls.granted == ["c0", "c1"]
+
+    for i in range(4):
+        await calls.release(f"c{i}")
+    await asyncio.gather(*tasks)
+    assert calls.peak == 2
+    assert calls.scheduler.get_stats()["classes"]["interactive"]["completed"] == 4
+
+
+@pytest.mark.anyio
+async def test_batch_cap_leaves_room_for_interactive_calls():
+    calls = _Calls(LLMScheduler(concurrency=3, caps={"batch": 1}, tpm_budget=0))
+    calls.start("b0", "batch")
+    calls.start("b1", "batch")
+    calls.start("i0", "interactive")
+    await _settle()
+
+    assert calls.granted == ["b0", "i0"]
+    stats = calls.scheduler.get_stats()["classes"]
+    assert stats["batch"]["queued"] == 1
+    assert stats["batch"]["running"] == 1
+
+    await calls.release("b0")
+    assert calls.granted == ["b0", "i0", "b1"]
+
+
+@pytest.mark.anyio
+async def test_waiters_are_granted_by_priority_then_arrival():
+    calls = _Calls(LLMScheduler(concurrency=1, caps={}, tpm_budget=0))
+    calls.start("first")
+    await _settle()
+    calls.start("batch", "batch")
+    calls.start("chat-1")
+    calls.start("chat-2")
+    await _settle()
+
+    for name in ("first", "chat-1", "chat-2"):
+        await calls.release(name)
+
+    assert calls.granted == ["first", "chat-1", "chat-2", "batch"]
+
+
+@pytest.mark.anyio
+async def test_token_budget_holds_calls_until_the_window_frees_up(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "TPM_WINDOW_SECONDS", 0.2)
+    calls = _Calls(LLMScheduler(concurrency=4, caps={}, tpm_budget=100))
+    calls.start("big", tokens=80)
+    await _settle()
+    calls.start("over", tokens=50)
+    calls.start("batch", "batch", tokens=10)  # would fit, but may not overtake the waiting chat call
+    await _settle()
+
+    assert calls.granted == ["big"]
+    assert calls.scheduler.get_stats()["tokens_last_minute"] == 80
+
+    await asyncio.sleep(0.3)
+    assert calls.granted == ["big", "over", "batch"]
+
+
+@pytest.mark.anyio
+async def test_actual_usage_replaces_the_estimate():
+    calls = _Calls(LLMScheduler(concurrency=4, caps={}, tpm_budget=100))
+    calls.start("estimated-high", tokens=90, actual_tokens=20)
+    await _settle()
+    calls.start("next", tokens=60)
+    await _settle()
+    assert calls.granted == ["estimated-high"]
+
+    await calls.release("estimated-high")
+
+    assert calls.granted == ["estimated-high", "next"]
+    assert calls.scheduler.get_stats()["tokens_last_minute"] == 80
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiters_do_not_take_a_slot():
+    calls = _Calls(LLMScheduler(concurrency=1, caps={}, tpm_budget=0))
+    calls.start("holder")
+    await _settle()
+    cancelled = calls.start("cancelled")
+    calls.start("next")
+    await _settle()
+
+    cancelled.cancel()
+    await _settle()
+    await calls.release("holder")
+
+    assert calls.granted == ["holder", "next"]
+    assert calls.scheduler.get_stats()["classes"]["interactive"]["running"] == 1
+
+
+@pytest.mark.anyio
+async def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        async with LLMScheduler().slot("urgent"):
+            pass
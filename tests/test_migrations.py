@@ -0,0 +1,128 @@
+# tests/test_migrations.py
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from backend.modules.database import MIGRATIONS, DatabaseManager, apply_migrations, ensure_schema, make_engine
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The tables as the first release created them (server.py's models, which carried chat_history)
+BASELINE_SCHEMA = [
+    "CREATE TABLE analysis_sessions (id VARCHAR NOT NULL, created_at DATETIME, task_type VARCHAR, "
+    "target_column VARCHAR, dataset_info TEXT, results TEXT, chat_history TEXT, PRIMARY KEY (id))",
+    "CREATE TABLE chat_messages (id VARCHAR NOT NULL, session_id VARCHAR, message TEXT, response TEXT, "
+    "timestamp DATETIME, context_type VARCHAR, PRIMARY KEY (id))",
+]
+
+
+def _execute(db_engine, *statements, **params) -> None:
+    with db_engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement), params)
+
+
+def _versions(db_engine) -> list:
+    with db_engine.connect() as conn:
+        return [row[0] for row in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+
+
+def test_a_baseline_database_is_upgraded_in_place(db_url):
+    baseline = create_engine(db_url)
+    _execute(baseline, *BASELINE_SCHEMA)
+    _execute(
+        baseline,
+        "INSERT INTO analysis_sessions (id, created_at, task_type, target_column, dataset_info, results) "
+        "VALUES ('s1', :now, 'classification', 'Churn', '{\"filename\": \"churn.csv\"}', "
+        "'{\"ml\": {\"best_model\": {\"name\": \"XGBoost\"}}}')",
+        "INSERT INTO chat_messages (id, session_id, message, response, timestamp, context_type) "
+        "VALUES ('m1', 's1', 'hi', 'hello', :now, 'general')",
+        now=datetime(2024, 1, 1),
+    )
+    baseline.dispose()
+
+    upgraded = make_engine(db_url)
+    ensure_schema(upgraded)
+
+    inspector = inspect(upgraded)
+    columns = {col["name"] for col in inspector.get_columns("analysis_sessions")}
+    assert {"status", "job_id", "job_owner", "heartbeat_at", "upload_info", "completed_at"} <= columns
+    assert "chat_history" not in columns
+    indexes = {index["name"] for index in inspector.get_indexes("analysis_sessions")}
+    assert {"ix_analysis_sessions_created_at_id", "ix_analysis_sessions_task_type_created_at_id",
+            "ix_analysis_sessions_job_id"} <= indexes
+    assert "ix_analysis_sessions_created_at" not in indexes
+    assert "ix_chat_messages_session_id_timestamp" in {
+        index["name"] for index in inspector.get_indexes("chat_messages")
+    }
+    assert _versions(upgraded) == [version for version, _, _ in MIGRATIONS]
+
+    with Session(bind=upgraded) as db:
+        session = DatabaseManager(upgraded).get_analysis_session(db, "s1")
+    assert session["dataset_info"] == {"filename": "churn.csv"}
+    assert session["results"]["ml"]["best_model"] == {"name": "XGBoost"}
+
+    assert apply_migrations(upgraded) == []
+    upgraded.dispose()
+
+
+def test_result_sections_are_rebuilt_to_reference_blobs(engine):
+    _execute(
+        engine,
+        "DELETE FROM schema_migrations WHERE version >= 4",
+        "DROP TABLE analysis_result_sections",
+        "CREATE TABLE analysis_result_sections (session_id VARCHAR NOT NULL, section VARCHAR NOT NULL, "
+        "data TEXT NOT NULL, size_bytes INTEGER, updated_at DATETIME, PRIMARY KEY (session_id, section))",
+        "INSERT INTO analysis_result_sections (session_id, section, data, size_bytes) "
+        "VALUES ('s1', 'model_summary', '{}', 2)",
+    )
+
+    ensure_schema(engine)
+
+    columns = {col["name"]: col for col in inspect(engine).get_columns("analysis_result_sections")}
+    assert columns["data"]["nullable"]
+    assert "blob_key" in columns
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT data FROM analysis_result_sections")).scalar() == "{}"
+
+
+def test_existing_blobs_get_reference_counts_and_orphans_are_dropped(engine):
+    _execute(
+        engine,
+        "DELETE FROM schema_migrations WHERE version >= 5",
+        "ALTER TABLE blobs DROP COLUMN refcount",
+        "INSERT INTO blobs (key, codec, raw_size, stored_size, chunk_count) VALUES ('shared', 'none', 1, 1, 1)",
+        "INSERT INTO blobs (key, codec, raw_size, stored_size, chunk_count) VALUES ('orphan', 'none', 1, 1, 1)",
+        "INSERT INTO blob_chunks (blob_key, seq, data) VALUES ('shared', 0, x'61')",
+        "INSERT INTO blob_chunks (blob_key, seq, data) VALUES ('orphan', 0, x'62')",
+        "INSERT INTO analysis_result_sections (session_id, section, blob_key) VALUES ('s1', 'visualizations', 'shared')",
+        "INSERT INTO analysis_result_sections (session_id, section, blob_key) VALUES ('s2', 'visualizations', 'shared')",
+    )
+
+    ensure_schema(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT key, refcount FROM blobs")).all() == [("shared", 2)]
+        assert conn.execute(text("SELECT blob_key FROM blob_chunks")).scalars().all() == ["shared"]
+
+
+def test_workers_starting_together_set_up_the_schema_once(db_url):
+    env = {**os.environ, "MONGO_URL": db_url, "PYTHONPATH": REPO_ROOT}
+    workers = [
+        subprocess.Popen([sys.executable, "-c", "import backend.modules.database"], env=env,
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    outputs = [worker.communicate(timeout=120) for worker in workers]
+
+    assert [worker.returncode for worker in workers] == [0] * 4, [stderr for _, stderr in outputs]
+    migration_logs = sum(stdout.count("Applied schema migration") for stdout, _ in outputs)
+    assert migration_logs == len(MIGRATIONS)
+    db_engine = create_engine(db_url)
+    assert _versions(db_engine) == [version for version, _, _ in MIGRATIONS]
+    db_engine.dispose()
@@ -0,0 +1,70 @@
+# tests/test_mock_llm_server.py
+
+import httpx
+import pytest
+
+from backend.benchmarks import mock_llm_server
+from backend.benchmarks.chat_load_test import percentile, summarize
+from backend.modules.llm_client import LLMAPIError, LLMClient
+
+
+@pytest.fixture
+def mock_config(monkeypatch):
+    for key, value in {"latency_ms": 0.0, "jitter_ms": 0.0, "token_delay_ms": 0.0, "tokens": 20,
+                       "error_rate": 0.0, "rate_limit_rate": 0.0}.items():
+        monkeypatch.setitem(mock_llm_server.config, key, value)
+    return mock_llm_server.config
+
+
+def _client(**kwargs) -> LLMClient:
+    """LLMClient talking to the mock server in process"""
+    client = LLMClient("http://mock/v1/chat/completions", "key", backoff_base=0, **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_llm_server.app))
+    return client
+
+
+def _payload(prompt: str) -> dict:
+    return {"model": "mock", "messages": [{"role": "user", "content": prompt}]}
+
+
+@pytest.mark.anyio
+async def test_answers_are_deterministic_per_prompt_and_stream_the_same_text(mock_config):
+    client = _client()
+
+    first = await client.chat_completion(_payload("What drives churn?"))
+    again = await client.chat_completion(_payload("What drives churn?"))
+    other = await client.chat_completion(_payload("Something else"))
+    streamed = [delta async for delta in client.stream_chat_completion(_payload("What drives churn?"))]
+
+    content = first["choices"][0]["message"]["content"]
+    assert again["choices"][0]["message"]["content"] == content
+    assert other["choices"][0]["message"]["content"] != content
+    assert len(streamed) > 1
+    assert "".join(streamed) == content
+
+
+@pytest.mark.anyio
+async def test_injected_rate_limits_carry_retry_after(mock_config, monkeypatch):
+    monkeypatch.setitem(mock_config, "rate_limit_rate", 1.0)
+    monkeypatch.setitem(mock_config, "retry_after", 0)
+    client = _client(max_retries=1)
+
+    with pytest.raises(LLMAPIError) as error:
+        await client.chat_completion(_payload("hi"))
+
+    assert error.value.status_code == 429
+    assert client.get_stats()["retries"] == 1
+
+
+def test_load_test_percentiles_and_summary():
+    latencies = [i / 100 for i in range(1, 101)]
+
+    assert percentile([], 50) is None
+    assert percentile(latencies, 50) == 0.5
+    assert percentile(latencies, 99) == 0.99
+
+    summary = summarize(latencies, errors=2, wall_seconds=2.0, extra={"ttft_seconds": [0.1, 0.2]})
+    assert summary["requests"] == 102
+    assert summary["throughput_rps"] == 50.0
+    assert summary["latency_seconds"]["p95"] == 0.95
+    assert summary["ttft_seconds"]["p50"] == 0.1
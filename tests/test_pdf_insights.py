@@ -0,0 +1,52 @@
+# tests/test_pdf_insights.py
+
+import asyncio
+
+import pytest
+
+from backend import server
+
+
+class _FakeChatEngine:
+    """Answers chart insight requests after a delay, failing for charts of type 'broken'"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def generate_chart_insights(self, chart_type, extracted_data, raise_errors=False):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.05 if extracted_data["index"] % 2 else 0.01)
+            if chart_type == "broken":
+                raise RuntimeError("upstream timeout")
+            return [f"insight {extracted_data['index']}"]
+        finally:
+            self.running -= 1
+
+    async def generate_summary_insights(self, chart_data, dataset_info):
+        return [f"{len(chart_data)} charts"]
+
+
+@pytest.mark.anyio
+async def test_chart_insights_run_concurrently_and_failures_are_counted(monkeypatch):
+    engine = _FakeChatEngine()
+    monkeypatch.setattr(server, "get_engine", lambda name: engine)
+    monkeypatch.setattr(server, "PDF_INSIGHT_CONCURRENCY", 3)
+    charts = [{"type": "broken" if i == 4 else "bar", "data": {"index": i}} for i in range(8)]
+
+    report = await server.analyze_pdf_charts(charts, {"shape": [10, 2]})
+
+    assert 1 < engine.peak <= 3
+    assert [chart["data"]["index"] for chart in report["charts"]] == list(range(8))
+    assert report["charts"][0]["insights"] == ["insight 0"]
+    assert report["charts"][4]["insights"] == []
+    assert report["charts"][4]["insight_error"] == "upstream timeout"
+    assert report["insight_timing"]["failed_charts"] == 1
+    assert report["summary_insights"] == ["8 charts"]
+
+
+@pytest.mark.anyio
+async def test_extraction_errors_pass_through():
+    assert await server.analyze_pdf_charts({"error": "no charts"}, {}) == {"error": "no charts"}
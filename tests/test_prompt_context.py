@@ -0,0 +1,72 @@
+# tests/test_prompt_context.py
+
+from backend.modules.prompt_context import build_session_context, count_tokens
+
+
+def _context(columns: int = 50) -> dict:
+    names = [f"feature_{i}" for i in range(columns)]
+    return {
+        "task_type": "classification",
+        "target_column": "Churn",
+        "results": {
+            "dataset_info": {"filename": "churn.csv", "shape": [10000, columns + 1]},
+            "eda": {
+                "feature_importance": {name: {"score": i / columns, "p_value": 0.01} for i, name in enumerate(names)},
+                "data_quality": {"missing_percentage": {name: 1.5 for name in names[:3]}, "duplicate_rows": 4},
+                "statistics": {
+                    "target": {"class_balance": {"yes": 0.05, "no": 0.95}},
+                    "descriptive": {name: {"mean": 1.23456789, "std": 0.5, "min": 0, "max": 9} for name in names},
+                },
+            },
+            "ml": {
+                "best_model": {"name": "XGBoost", "primary_score": 0.912345, "metrics": {"f1": 0.88},
+                               "confidence_intervals": {"f1": {"lower": 0.86, "upper": 0.9}}},
+                "comparison_table": [{"Model": "XGBoost", "f1": 0.88}, {"Model": "Logistic Regression", "f1": 0.8}],
+            },
+        },
+    }
+
+
+def test_empty_context_renders_a_placeholder():
+    text, report = build_session_context({})
+
+    assert text == "No specific context"
+    assert report["context_tokens"] == 0
+
+
+def test_everything_fits_a_generous_budget():
+    text, report = build_session_context(_context(), budget=100000)
+
+    assert all(section["status"] == "complete" for section in report["sections"].values())
+    assert "class imbalance: class yes is 5.0% of rows" in text
+    assert "f1 95% CI: [0.86, 0.9]" in text
+    assert "primary score: 0.9123" in text
+    assert report["context_tokens"] >= count_tokens(text)
+
+
+def test_a_tight_budget_keeps_high_priority_sections_and_trims_the_rest():
+    full_text, _ = build_session_context(_context(), budget=100000)
+
+    text, report = build_session_context(_context(), "general", budget=200)
+
+    sections = report["sections"]
+    assert sections["overview"]["status"] == "complete"
+    assert sections["best_model"]["status"] == "complete"
+    assert sections["column_statistics"]["status"] != "complete"
+    assert "more omitted" in text
+    assert count_tokens(text) < count_tokens(full_text) / 4
+
+
+def test_top_features_are_ranked_by_score():
+    text, _ = build_session_context(_context(), budget=100000)
+
+    features = [line for line in text.splitlines() if line.startswith("feature_")]
+    assert features[0].startswith("feature_49:")
+
+
+def test_section_order_follows_the_context_type():
+    text, _ = build_session_context(_context(), "model_performance", budget=100000)
+
+    assert text.index("## best model") < text.index("## top features")
+    text, _ = build_session_context(_context(), "eda_analysis", budget=100000)
+    assert text.index("## top features") < text.index("## best model")
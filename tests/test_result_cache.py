@@ -0,0 +1,65 @@
+# tests/test_result_cache.py
+
+import os
+import time
+
+from backend.modules.result_cache import ResultCache
+
+
+def _age(cache: ResultCache, key: str, seconds: float) -> None:
+    path = os.path.join(cache.cache_dir, key)
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_key_depends_on_every_input():
+    key = ResultCache.make_key("abc", "classification", "Target", "2.2.0")
+
+    assert key == ResultCache.make_key("abc", "classification", "Target", "2.2.0")
+    assert key != ResultCache.make_key("abc", "regression", "Target", "2.2.0")
+    assert key != ResultCache.make_key("abc", "classification", "Other", "2.2.0")
+    assert key != ResultCache.make_key("abc", "classification", "Target", "2.3.0")
+
+
+def test_put_get_and_copy_artifact(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    model = tmp_path / "model.pkl"
+    model.write_bytes(b"model bytes")
+
+    cache.put("key", {"eda_results": {"rows": 3}}, artifacts={"model.pkl": str(model)})
+
+    assert cache.get("key") == {"eda_results": {"rows": 3}}
+    dest = tmp_path / "restored" / "model.pkl"
+    assert cache.copy_artifact("key", "model.pkl", str(dest)) == str(dest)
+    assert dest.read_bytes() == b"model bytes"
+    assert cache.copy_artifact("key", "cleaned.parquet", str(tmp_path / "x")) is None
+    assert cache.get("missing") is None
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_entries=2)
+    cache.put("old", {"n": 1})
+    cache.put("used", {"n": 2})
+    _age(cache, "old", 60)
+    _age(cache, "used", 120)
+    assert cache.get("used") == {"n": 2}  # a hit marks the entry as recently used
+
+    cache.put("new", {"n": 3})
+
+    assert cache.get("old") is None
+    assert cache.get("used") == {"n": 2}
+    assert cache.get("new") == {"n": 3}
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_entries_are_evicted_past_the_byte_limit(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=3000)
+    cache.put("first", {"blob": "x" * 2000})
+    _age(cache, "first", 60)
+
+    cache.put("second", {"blob": "y" * 2000})
+
+    assert cache.get("first") is None
+    assert cache.get("second") is not None
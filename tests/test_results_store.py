@@ -0,0 +1,166 @@
+# tests/test_results_store.py
+
+import json
+
+import pytest
+
+from backend.modules import results_store
+from backend.modules.database import AnalysisResultSection, AnalysisSession
+
+RESULTS = {
+    "eda": {
+        "task_type": "regression",
+        "data_quality": {"duplicate_rows": 0},
+        "statistics": {"target": {"mean": 3.5}},
+        "feature_importance": {"x": {"score": 0.9}},
+        "visualizations": {"histogram": "static/charts/h.png"},
+    },
+    "ml": {"best_model": {"name": "Ridge"}, "comparison_table": [{"Model": "Ridge", "r2": 0.8}]},
+    "pdf_insights": {"total_charts": 0},
+}
+
+
+def _add_session(session_factory, results=None, legacy_results=None) -> str:
+    db = session_factory()
+    try:
+        session = AnalysisSession(task_type="regression", target_column="Y", status="completed",
+                                  results=json.dumps(legacy_results) if legacy_results is not None else None)
+        db.add(session)
+        db.flush()
+        if results is not None:
+            results_store.save_sections(db, session.id, results)
+        db.commit()
+        return session.id
+    finally:
+        db.close()
+
+
+def test_split_and_assemble_round_trip():
+    sections = results_store.split_results(RESULTS)
+
+    assert set(sections) == set(results_store.SECTIONS)
+    assert sections["eda_overview"] == {"task_type": "regression"}
+    assert sections["model_comparison"] == [{"Model": "Ridge", "r2": 0.8}]
+    assert results_store.assemble_results(sections) == RESULTS
+
+
+def test_load_only_the_requested_sections(session_factory):
+    session_id = _add_session(session_factory, RESULTS)
+    db = session_factory()
+    try:
+        sections = results_store.load_sections(db, session_id, ["model_summary", "eda_statistics"])
+        sizes = results_store.list_sections(db, session_id)
+    finally:
+        db.close()
+
+    assert sections == {"model_summary": {"best_model": {"name": "Ridge"}}, "eda_statistics": {"target": {"mean": 3.5}}}
+    assert set(sizes) == set(results_store.SECTIONS)
+
+
+def test_saving_again_replaces_every_section(session_factory):
+    session_id = _add_session(session_factory, RESULTS)
+    db = session_factory()
+    try:
+        results_store.save_sections(db, session_id, {"ml": {"best_model": {"name": "Lasso"}}})
+        db.commit()
+        results = results_store.assemble_results(results_store.load_sections(db, session_id))
+    finally:
+        db.close()
+
+    assert results["ml"] == {"best_model": {"name": "Lasso"}, "comparison_table": None}
+    assert results["eda"]["feature_importance"] is None
+
+
+def test_section_names_are_validated():
+    assert results_store.parse_section_names(None) is None
+    assert results_store.parse_section_names("model_summary, eda_quality") == ["model_summary", "eda_quality"]
+    with pytest.raises(ValueError):
+        results_store.parse_section_names("model_summary,secrets")
+
+
+def test_legacy_results_column_is_read_and_then_migrated(session_factory):
+    legacy = _add_session(session_factory, legacy_results=RESULTS)
+    unreadable = _add_session(session_factory)
+    db = session_factory()
+    try:
+        db.query(AnalysisSession).filter(AnalysisSession.id == unreadable).update({"results": "{not json"})
+        db.commit()
+        assert results_store.load_sections(db, legacy, ["model_summary"]) == {
+            "model_summary": {"best_model": {"name": "Ridge"}}
+        }
+    finally:
+        db.close()
+
+    assert results_store.migrate_legacy_results(session_factory, batch_size=1) == 1
+
+    db = session_factory()
+    try:
+        assert db.get(AnalysisSession, legacy).results is None
+        assert db.get(AnalysisSession, unreadable).results == "{not json"
+        assert db.query(AnalysisResultSection).filter(AnalysisResultSection.session_id == legacy).count() == len(
+            results_store.SECTIONS
+        )
+        assert results_store.assemble_results(results_store.load_sections(db, legacy)) == RESULTS
+    finally:
+        db.close()
+
+
+def test_results_endpoint_returns_only_the_requested_sections(client, app_session_factory):
+    session_id = _add_session(app_session_factory, RESULTS)
+
+    response = client.get(f"/api/sessions/{session_id}/results", params={"sections": "model_comparison"})
+
+    assert response.status_code == 200
+    assert response.json()["sections"] == {"model_comparison": [{"Model": "Ridge", "r2": 0.8}]}
+    assert set(response.json()["available"]) == set(results_store.SECTIONS)
+    assert client.get(f"/api/sessions/{session_id}/results", params={"sections": "bogus"}).status_code == 400
+
+
+def test_session_endpoint_assembles_the_requested_sections(client, app_session_factory):
+    session_id = _add_session(app_session_factory, RESULTS)
+
+    response = client.get(f"/api/sessions/{session_id}", params={"sections": "model_summary"})
+
+    assert response.status_code == 200
+    assert response.json()["session"]["results"] == {"ml": {"best_model": {"name": "Ridge"}}}
+    assert client.get("/api/sessions/missing").status_code == 404
+
+
+def test_raw_section_is_streamed_as_stored(client, app_session_factory):
+    big = {**RESULTS, "eda": {**RESULTS["eda"], "visualizations": {f"chart_{i}": "x" * 100 for i in range(50)}}}
+    session_id = _add_session(app_session_factory, big)
+    legacy_id = _add_session(app_session_factory, legacy_results=RESULTS)
+
+    blob_backed = client.get(f"/api/sessions/{session_id}/results/visualizations/raw")
+    inline = client.get(f"/api/sessions/{session_id}/results/model_summary/raw")
+    legacy = client.get(f"/api/sessions/{legacy_id}/results/model_summary/raw")
+
+    assert blob_backed.json() == big["eda"]["visualizations"]
+    assert inline.json() == {"best_model": {"name": "Ridge"}}
+    assert legacy.json() == {"best_model": {"name": "Ridge"}}
+    assert client.get(f"/api/sessions/{legacy_id}/results/nothing/raw").status_code == 400
+
+
+def test_api_router_chat_reads_the_session_from_sections(app_session_factory, session_factory, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend import api
+    from backend.modules.conversation_memory import ConversationMemoryStore
+
+    class _Engine:
+        memory_store = ConversationMemoryStore(session_factory)
+
+        async def generate_response(self, message, context, context_type, session_id=None):
+            return f"{context['target_column']}: {context['results']['ml']['best_model']['name']}"
+
+    monkeypatch.setattr(api, "get_engine", lambda name: _Engine())
+    app = FastAPI()
+    app.include_router(api.router, prefix="/api")
+    session_id = _add_session(app_session_factory, RESULTS)
+
+    response = TestClient(app).post("/api/chat", json={"message": "best model?", "session_id": session_id})
+
+    assert response.status_code == 200
+    assert response.json() == {"response": "Y: Ridge"}
+    assert [turn["response"] for turn in _Engine.memory_store.history(session_id)] == ["Y: Ridge"]
@@ -0,0 +1,133 @@
+# tests/test_retention.py
+
+import os
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+from backend.modules.database import AnalysisSession
+from backend.modules.retention import RetentionService
+
+DAY = 24 * 3600
+OWNER = str(uuid.uuid4())
+OTHER = str(uuid.uuid4())
+
+
+@pytest.fixture
+def dirs(tmp_path) -> dict:
+    paths = {name: tmp_path / name for name in ("uploads", "outputs", "datasets", "charts")}
+    for path in paths.values():
+        path.mkdir()
+    return paths
+
+
+def _service(dirs, **kwargs) -> RetentionService:
+    return RetentionService(str(dirs["uploads"]), str(dirs["outputs"]), str(dirs["datasets"]), str(dirs["charts"]),
+                            **{"min_age": 0, "max_bytes": 0, **kwargs})
+
+
+def _file(path, size=10, age=0.0) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    used = time.time() - age
+    os.utime(path, (used, used))
+    return str(path)
+
+
+def _session_files(dirs, session_id) -> list:
+    return [
+        _file(dirs["uploads"] / f"{session_id}_data.csv"),
+        _file(dirs["outputs"] / f"{session_id}_processed.csv"),
+        _file(dirs["outputs"] / f"model_{session_id}.pkl"),
+        _file(dirs["datasets"] / session_id / "part-0.parquet"),
+    ]
+
+
+def test_sweep_removes_files_past_their_category_ttl(dirs):
+    old_upload = _file(dirs["uploads"] / "data.csv", age=8 * DAY)
+    fresh_upload = _file(dirs["uploads"] / "new.csv", age=DAY)
+    old_chart_upload = _file(dirs["uploads"] / "chart_1.png", age=2 * DAY)
+    model = _file(dirs["outputs"] / "model.pkl", age=2 * DAY)
+    kept_forever = _file(dirs["charts"] / "plot.png", age=365 * DAY)
+    service = _service(dirs, ttl_seconds={"charts": 0})
+
+    summary = service.sweep()
+
+    assert [os.path.exists(path) for path in (old_upload, fresh_upload, old_chart_upload, model, kept_forever)] == [
+        False, True, False, True, True
+    ]
+    assert summary["removed"]["ttl"] == {"files": 2, "bytes": 20}
+    assert summary["total_bytes"] == 30
+    assert service.get_stats()["by_category"]["chart_uploads"]["files"] == 1
+
+
+def test_quota_evicts_least_recently_used_first(dirs):
+    oldest = _file(dirs["charts"] / "a.png", size=100, age=300)
+    older = _file(dirs["outputs"] / "b.csv", size=100, age=200)
+    newest = _file(dirs["uploads"] / "c.csv", size=100, age=100)
+    dataset = _file(dirs["datasets"] / "d" / "part-0.parquet", size=100, age=50)
+    service = _service(dirs, max_bytes=250)
+
+    summary = service.sweep()
+
+    assert [os.path.exists(path) for path in (oldest, older, newest, dataset)] == [False, False, True, True]
+    assert summary["removed"]["quota"] == {"files": 2, "bytes": 200}
+    assert summary["usage_bytes"]["datasets"] == 100
+
+
+def test_young_files_and_active_sessions_are_never_removed(dirs):
+    young = _file(dirs["charts"] / "young.png", size=100, age=10)
+    running = _file(dirs["uploads"] / f"{OWNER}_data.csv", size=100, age=30 * DAY)
+    idle = _file(dirs["uploads"] / f"{OTHER}_data.csv", size=100, age=30 * DAY)
+    service = _service(dirs, max_bytes=1, min_age=60, active_sessions=lambda: {OWNER})
+
+    service.sweep()
+
+    assert [os.path.exists(path) for path in (young, running, idle)] == [True, True, False]
+
+
+def test_deleting_a_session_removes_only_its_files(dirs):
+    owned = _session_files(dirs, OWNER)
+    other = _session_files(dirs, OTHER)
+    shared_model = _file(dirs["outputs"] / "model.pkl")
+    service = _service(dirs)
+
+    removed = service.delete_session_files(OWNER)
+
+    assert removed == {"files": 4, "bytes": 40}
+    assert not any(os.path.exists(path) for path in owned)
+    assert all(os.path.exists(path) for path in other + [shared_model])
+    assert service.get_stats()["by_reason"]["session_delete"]["files"] == 4
+
+
+def test_extra_paths_are_removed_only_inside_managed_directories(dirs, tmp_path):
+    listed = _file(dirs["uploads"] / "unnamed.csv")
+    outside = _file(tmp_path / "elsewhere" / "unnamed.csv")
+
+    removed = _service(dirs).delete_session_files(OWNER, extra_paths=[listed, outside])
+
+    assert removed["files"] == 1
+    assert not os.path.exists(listed)
+    assert os.path.exists(outside)
+
+
+def test_session_delete_endpoint_removes_the_sessions_files(client, app_session_factory):
+    from backend import server
+
+    db = app_session_factory()
+    try:
+        session = AnalysisSession(task_type="regression", target_column="Y", status="completed")
+        db.add(session)
+        db.commit()
+        session_id = session.id
+    finally:
+        db.close()
+    upload = _file(Path(server.UPLOAD_FOLDER) / f"{session_id}_data.csv")
+
+    response = client.delete(f"/api/sessions/{session_id}")
+
+    assert response.status_code == 200
+    assert response.json()["files_removed"] == 1
+    assert not os.path.exists(upload)
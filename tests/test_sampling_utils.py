@@ -0,0 +1,53 @@
+# tests/test_sampling_utils.py
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+
+from backend.utils.sampling_utils import bootstrap_ci, stratified_sample
+
+
+def test_classification_sample_keeps_class_proportions_and_rare_classes():
+    df = pd.DataFrame({"x": range(1001), "y": ["a"] * 800 + ["b"] * 200 + ["rare"]})
+
+    sample = stratified_sample(df, "y", 100, "classification")
+
+    counts = sample["y"].value_counts()
+    assert counts["a"] == 80
+    assert counts["b"] == 20
+    assert counts["rare"] == 1
+    assert sample.index.is_unique
+
+
+def test_regression_sample_covers_every_quantile_bin():
+    df = pd.DataFrame({"y": np.arange(1000, dtype=float)})
+
+    sample = stratified_sample(df, "y", 100, "regression")
+
+    assert len(sample) == 100
+    assert (pd.cut(sample["y"], bins=10).value_counts() == 10).all()
+
+
+def test_sample_larger_than_the_data_returns_it_unchanged():
+    df = pd.DataFrame({"y": [1, 2, 3]})
+
+    assert stratified_sample(df, "y", 10, "classification") is df
+
+
+def test_bootstrap_ci_brackets_the_point_estimate():
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 500)
+    y_pred = np.where(rng.random(500) < 0.8, y_true, 1 - y_true)
+
+    ci = bootstrap_ci(y_true, y_pred, accuracy_score, n_boot=100)
+
+    assert ci["lower"] <= accuracy_score(y_true, y_pred) <= ci["upper"]
+    assert ci["confidence"] == 0.95
+    assert ci["n_boot"] == 100
+
+
+def test_bootstrap_ci_skips_resamples_the_metric_rejects():
+    def metric(y_true, y_pred):
+        raise ValueError("only one class")
+
+    assert bootstrap_ci([0, 1], [0, 1], metric, n_boot=5) == {}
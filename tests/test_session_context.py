@@ -0,0 +1,113 @@
+# tests/test_session_context.py
+
+import json
+from datetime import datetime, timedelta
+
+from backend.modules import results_store
+from backend.modules.database import AnalysisSession
+from backend.modules.session_context import SessionContextCache
+
+RESULTS = {
+    "eda": {
+        "task_type": "classification",
+        "target_column": "Churn",
+        "data_quality": {"missing_percentage": {"age": 2.0}, "duplicate_rows": 1, "per_column": {"age": "..."}},
+        "statistics": {"target": {"class_balance": {"yes": 0.2}}, "descriptive": {"age": {"mean": 40}}},
+        "visualizations": {"histogram": "static/charts/histogram.png"},
+    },
+    "ml": {"best_model": {"name": "XGBoost"}, "comparison_table": [{"Model": "XGBoost"}]},
+    "pdf_insights": {"charts": [{"type": "bar"}]},
+}
+
+
+def _add_session(session_factory, status: str = "completed", completed_at: datetime = None) -> str:
+    db = session_factory()
+    try:
+        session = AnalysisSession(task_type="classification", target_column="Churn", status=status,
+                                  dataset_info=json.dumps({"filename": "churn.csv", "shape": [100, 5]}),
+                                  completed_at=completed_at or datetime.utcnow())
+        db.add(session)
+        db.flush()
+        results_store.save_sections(db, session.id, RESULTS)
+        db.commit()
+        return session.id
+    finally:
+        db.close()
+
+
+def _update(session_factory, session_id: str, **fields) -> None:
+    db = session_factory()
+    try:
+        db.query(AnalysisSession).filter(AnalysisSession.id == session_id).update(fields)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_context_keeps_only_what_prompts_read(session_factory):
+    session_id = _add_session(session_factory)
+
+    context = SessionContextCache(session_factory).get(session_id)
+
+    assert context["task_type"] == "classification"
+    results = context["results"]
+    assert results["dataset_info"] == {"filename": "churn.csv", "shape": [100, 5]}
+    assert results["eda"]["data_quality"] == {"missing_percentage": {"age": 2.0}, "duplicate_rows": 1}
+    assert "visualizations" not in results["eda"]
+    assert "pdf_insights" not in results
+    assert results["ml"]["best_model"] == {"name": "XGBoost"}
+
+
+def test_missing_sessions_have_an_empty_context(session_factory):
+    cache = SessionContextCache(session_factory)
+
+    assert cache.get(None) == {}
+    assert cache.get("missing") == {}
+
+
+def test_finished_sessions_are_served_from_the_cache(session_factory):
+    session_id = _add_session(session_factory)
+    cache = SessionContextCache(session_factory)
+
+    first = cache.get(session_id)
+
+    assert cache.get(session_id) is first
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_a_rerun_on_another_worker_invalidates_the_entry(session_factory):
+    session_id = _add_session(session_factory)
+    cache = SessionContextCache(session_factory)
+    cache.get(session_id)
+
+    _update(session_factory, session_id, target_column="Tenure", completed_at=datetime.utcnow() + timedelta(seconds=1))
+
+    assert cache.get(session_id)["target_column"] == "Tenure"
+    assert cache.get_stats()["stale"] == 1
+
+
+def test_unfinished_sessions_are_not_cached(session_factory):
+    session_id = _add_session(session_factory, status="running")
+    cache = SessionContextCache(session_factory)
+
+    cache.get(session_id)
+    cache.get(session_id)
+
+    assert cache.get_stats()["misses"] == 2
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_entries_are_evicted_past_the_byte_limit(session_factory):
+    first, second = _add_session(session_factory), _add_session(session_factory)
+    probe = SessionContextCache(session_factory)
+    probe.get(first)
+    entry_bytes = probe.get_stats()["bytes"]
+    cache = SessionContextCache(session_factory, max_bytes=int(entry_bytes * 1.5))
+
+    cache.get(first)
+    cache.get(second)
+
+    assert cache.get_stats()["entries"] == 1
+    assert cache.get_stats()["evictions"] == 1
+    cache.get(second)
+    assert cache.get_stats()["hits"] == 1
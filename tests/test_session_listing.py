@@ -0,0 +1,81 @@
+# tests/test_session_listing.py
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.modules.database import AnalysisSession
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def sessions(app_session_factory) -> list:
+    """Eight sessions, newest first; pairs share a created_at so the id breaks the tie"""
+    rows = []
+    for i in range(8):
+        rows.append(AnalysisSession(
+            id=f"session-{i}",
+            created_at=START + timedelta(minutes=i // 2),
+            task_type="classification" if i % 2 else "regression",
+            target_column="Target",
+            status="completed",
+            dataset_info=json.dumps({"filename": f"data_{i}.csv", "shape": [100, i], "columns": ["a"] * 1000}),
+        ))
+    db = app_session_factory()
+    try:
+        db.add_all(rows)
+        db.commit()
+    finally:
+        db.close()
+    # Newest first; within a shared created_at the larger id comes first
+    return [f"session-{i}" for i in reversed(range(8))]
+
+
+def _all_pages(client, **params) -> tuple:
+    ids, pages, cursor = [], 0, None
+    while True:
+        response = client.get("/api/sessions", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        ids += [session["id"] for session in body["sessions"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_pages_cover_every_session_once_newest_first(client, sessions):
+    ids, pages = _all_pages(client, limit=3)
+
+    assert ids == sessions
+    assert pages == 3
+
+
+def test_pages_can_be_filtered_by_task_type_and_time(client, sessions):
+    ids, _ = _all_pages(client, limit=2, task_type="classification")
+    assert ids == [sid for sid in sessions if int(sid[-1]) % 2]
+
+    ids, _ = _all_pages(client, limit=2, created_after=(START + timedelta(minutes=2)).isoformat(),
+                        created_before=(START + timedelta(minutes=3)).isoformat())
+    assert ids == ["session-5", "session-4"]
+
+
+def test_listing_returns_only_summary_fields(client, sessions):
+    session = client.get("/api/sessions", params={"limit": 1}).json()["sessions"][0]
+
+    assert session["id"] == sessions[0]
+    assert session["status"] == "completed"
+    assert session["dataset_info"] == {"filename": "data_7.csv", "shape": [100, 7]}
+
+
+def test_an_exact_final_page_has_no_next_cursor(client, sessions):
+    body = client.get("/api/sessions", params={"limit": 8}).json()
+
+    assert len(body["sessions"]) == 8
+    assert body["next_cursor"] is None
+
+
+def test_invalid_cursors_are_rejected(client, sessions):
+    assert client.get("/api/sessions", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,12 @@
+# tests/test_startup_imports.py
+
+from backend.benchmarks.startup_benchmark import measure_import
+
+
+def test_importing_the_server_defers_heavy_dependencies():
+    # A fresh interpreter, so modules other tests already imported do not count
+    assert measure_import("backend.server", repeat=1)["heavy_modules_loaded"] == []
+
+
+def test_importing_the_worker_defers_heavy_dependencies():
+    assert measure_import("backend.modules.analysis_worker", repeat=1)["heavy_modules_loaded"] == []
@@ -0,0 +1,80 @@
+# tests/test_upload.py
+
+import hashlib
+import io
+import os
+from functools import partial
+
+import pytest
+from fastapi import UploadFile
+
+from backend.utils.upload_utils import UploadTooLargeError, save_upload
+
+CONTENT = b"a,b,target\n" + b"1,2,yes\n" * 100
+
+
+def _upload(content: bytes, size=None) -> UploadFile:
+    return UploadFile(io.BytesIO(content), size=size, filename="data.csv")
+
+
+@pytest.mark.anyio
+async def test_save_upload_copies_and_hashes_in_chunks(tmp_path):
+    dest = tmp_path / "data.csv"
+
+    info = await save_upload(_upload(CONTENT), str(dest), chunk_size=16)
+
+    assert dest.read_bytes() == CONTENT
+    assert info["bytes"] == len(CONTENT)
+    assert info["sha256"] == hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.mark.anyio
+async def test_save_upload_removes_the_partial_file_past_the_limit(tmp_path):
+    dest = tmp_path / "data.csv"
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(_upload(CONTENT), str(dest), max_bytes=100, chunk_size=16)
+
+    assert not dest.exists()
+
+
+@pytest.mark.anyio
+async def test_save_upload_rejects_a_declared_size_before_writing(tmp_path):
+    dest = tmp_path / "data.csv"
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(_upload(CONTENT, size=len(CONTENT)), str(dest), max_bytes=100)
+
+    assert not dest.exists()
+
+
+def _saved_uploads(filename: str) -> list:
+    from backend.server import UPLOAD_FOLDER
+    return [name for name in os.listdir(UPLOAD_FOLDER) if name.endswith(filename)]
+
+
+def test_upload_removes_the_dataset_when_the_target_is_missing(client):
+    response = client.post(
+        "/api/upload-dataset",
+        data={"task_type": "classification", "target_column": "missing"},
+        files={"file": ("no_target.csv", CONTENT, "text/csv")},
+    )
+
+    assert response.status_code == 400
+    assert _saved_uploads("no_target.csv") == []
+
+
+def test_upload_removes_the_dataset_when_the_pdf_is_too_large(client, monkeypatch):
+    from backend import server
+    monkeypatch.setattr(server, "save_upload", partial(save_upload, max_bytes=len(CONTENT)))
+
+    response = client.post(
+        "/api/upload-dataset",
+        data={"task_type": "classification", "target_column": "target"},
+        files={"file": ("big_pdf.csv", CONTENT, "text/csv"),
+               "pdf_file": ("big_pdf.pdf", CONTENT + b"x", "application/pdf")},
+    )
+
+    assert response.status_code == 413
+    assert _saved_uploads("big_pdf.csv") == []
+    assert _saved_uploads("big_pdf.pdf") == []